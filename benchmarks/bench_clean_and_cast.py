@@ -0,0 +1,84 @@
+"""
+Benchmark: clean_and_cast, pandas engine vs the compiled Polars plan.
+
+Builds bronze-shaped frames (all-string columns plus ingested_at/source_file)
+from synthetic PCF and UCF basket files and times both engines with the real
+silver mappings from config, at each null-loss diagnostics level. The frames
+are checked to be equal first.
+
+Run from project root:
+    python -m benchmarks.bench_clean_and_cast --funds 200 2000
+"""
+import argparse
+import logging
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+import config
+from benchmarks.synthetic import write_pcf, write_ucf
+from src.cleaner import DIAGNOSTIC_LEVELS, clean_and_cast
+from src.parsers import extract_pcf, extract_ucf
+
+CASES = {
+    "pcf_inav_baskets": (write_pcf, extract_pcf),
+    "ucf_records": (write_ucf, extract_ucf),
+}
+
+
+def _silver_mapping(bronze_table: str):
+    for mapping in config.INGESTION_MAPPINGS.values():
+        if mapping.bronze_table == bronze_table:
+            return mapping.silver_mapping
+    raise KeyError(bronze_table)
+
+
+def _bronze_frame(df: pd.DataFrame, source_name: str) -> pd.DataFrame:
+    df = df.astype("str")
+    df["ingested_at"] = pd.Timestamp.now(tz="America/New_York")
+    df["source_file"] = source_name
+    return df
+
+
+def run(fund_counts: list[int]) -> list[dict]:
+    logging.disable(logging.INFO)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for funds in fund_counts:
+            for table, (write, extract) in CASES.items():
+                path = write(Path(tmp) / f"{table}_{funds}.csv", funds=funds)
+                df = _bronze_frame(extract(path), path.name)
+                silver_mapping = _silver_mapping(table)
+                pd.testing.assert_frame_equal(
+                    clean_and_cast(df, silver_mapping),
+                    clean_and_cast(df, silver_mapping, engine="polars"))
+                for engine in ("pandas", "polars"):
+                    for level in DIAGNOSTIC_LEVELS:
+                        t0 = time.perf_counter()
+                        clean_and_cast(df, silver_mapping, engine=engine, diagnostics=level)
+                        results.append({
+                            "table": table,
+                            "engine": engine,
+                            "diagnostics": level,
+                            "rows": len(df),
+                            "seconds": round(time.perf_counter() - t0, 3),
+                        })
+    logging.disable(logging.NOTSET)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--funds", type=int, nargs="+", default=[200, 2000])
+    args = parser.parse_args()
+
+    results = run(args.funds)
+    print(f"{'table':>18} {'engine':>8} {'diagnostics':>11} {'rows':>9} {'seconds':>8}")
+    for r in results:
+        print(f"{r['table']:>18} {r['engine']:>8} {r['diagnostics']:>11} {r['rows']:>9} {r['seconds']:>8}")
+
+
+if __name__ == "__main__":
+    main()
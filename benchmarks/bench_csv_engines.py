@@ -0,0 +1,64 @@
+"""
+Benchmark: plain CSV mappings, pandas reader vs the pyarrow/polars engines.
+
+Writes a PLF_Positions-shaped file and times, per engine, the read alone and
+the read plus the bronze write. The pandas path is the one the mappings used
+so far (pd.read_csv(na_values="", keep_default_na=False) into a DataFrame);
+the pyarrow and polars paths use parsers.read_csv, whose Arrow table goes to
+ingest_into_bronze without a pandas copy.
+
+Run from project root:
+    python -m benchmarks.bench_csv_engines --rows 100000 1000000
+"""
+import argparse
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.synthetic import write_positions
+from src.deltalake_writer import ingest_into_bronze
+from src.parsers import read_csv
+
+READERS = {
+    "pandas": partial(pd.read_csv, na_values="", keep_default_na=False),
+    "pyarrow": partial(read_csv, engine="pyarrow"),
+    "polars": partial(read_csv, engine="polars"),
+}
+
+
+def run(row_counts: list[int]) -> list[dict]:
+    results = []
+    now = pd.Timestamp.now(tz="America/New_York")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in row_counts:
+            path = write_positions(Path(tmp) / f"PLF_Positions_{rows}.csv", rows=rows)
+            for engine, reader in READERS.items():
+                t0 = time.perf_counter()
+                data = reader(path)
+                read_s = time.perf_counter() - t0
+                ingest_into_bronze(data, path.name, now, Path(tmp) / f"bronze_{engine}_{rows}", "bench")
+                results.append({
+                    "engine": engine,
+                    "rows": rows,
+                    "read_s": round(read_s, 3),
+                    "read_and_bronze_s": round(time.perf_counter() - t0, 3),
+                })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    results = run(args.rows)
+    print(f"{'engine':>8} {'rows':>9} {'read_s':>8} {'read_and_bronze_s':>18}")
+    for r in results:
+        print(f"{r['engine']:>8} {r['rows']:>9} {r['read_s']:>8} {r['read_and_bronze_s']:>18}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: in-batch dedup of upsert_silver rows with NULL key parts.
+
+Builds batches of positions-like rows where a share of the primary key values
+are NULL (option rows without ISIN/CUSIP, files without a trade date) and
+re-sent rows duplicate keys with later timestamps. Times the previous
+per-pattern dedup (row-wise apply to build a tuple pattern, then a groupby
+loop that sorts and drops duplicates per pattern) against _latest_per_key's
+single lexsort over (bitmask pattern, keys, timestamp). The kept rows are
+checked to be the same first.
+
+Run from project root:
+    python -m benchmarks.bench_dedup_partial_keys --rows 100000 1000000
+"""
+import argparse
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.deltalake_writer import _latest_per_key
+
+PK_COLS = ["trade_date", "fund_ticker", "isin", "cusip"]
+TS_COL = "ingested_at"
+
+
+def make_batch(rows: int, null_share: float = 0.2, seed: int = 0) -> pd.DataFrame:
+    """Rows over ~rows/2 keys, each key part NULL with probability null_share."""
+    rng = np.random.default_rng(seed)
+    keys = max(rows // 2, 1)
+    security = rng.integers(0, keys, rows)
+    df = pd.DataFrame({
+        "trade_date": pd.Timestamp("2026-02-24") + pd.to_timedelta(security % 5, unit="D"),
+        "fund_ticker": pd.Series(security % 40).map(lambda i: f"FND{i:02d}").astype("str"),
+        "isin": pd.Series(security).map(lambda i: f"US{i:010d}").astype("str"),
+        "cusip": pd.Series(security).map(lambda i: f"{i:08d}C").astype("str"),
+        "shares": rng.integers(1, 100_000, rows),
+        TS_COL: pd.Timestamp("2026-02-24", tz="America/New_York")
+                + pd.to_timedelta(rng.integers(0, 8, rows), unit="h"),
+    })
+    for col in PK_COLS:
+        df.loc[rng.random(rows) < null_share, col] = None
+    return df
+
+
+def per_pattern_dedup(df: pd.DataFrame) -> pd.DataFrame:
+    """The dedup upsert_silver ran before _latest_per_key (stable sorts, for comparison)."""
+    full_key_mask = df[PK_COLS].notna().all(axis=1)
+    frames = [df[full_key_mask].sort_values(by=TS_COL, ascending=False, kind="stable")
+              .drop_duplicates(subset=PK_COLS, keep="first")]
+    partial = df[~full_key_mask & df[PK_COLS].notna().any(axis=1)].copy()
+    partial["_null_pattern"] = partial[PK_COLS].isnull().apply(lambda row: tuple(row), axis=1)
+    for null_pattern, group in partial.groupby("_null_pattern"):
+        active_keys = [PK_COLS[i] for i in range(len(PK_COLS)) if not null_pattern[i]]
+        frames.append(group.drop(columns=["_null_pattern"]).sort_values(
+            by=TS_COL, ascending=False, kind="stable").drop_duplicates(subset=active_keys, keep="first"))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _same_rows(a: pd.DataFrame, b: pd.DataFrame) -> bool:
+    order = PK_COLS + [TS_COL, "shares"]
+    a = a.sort_values(order, na_position="last").reset_index(drop=True)
+    b = b.sort_values(order, na_position="last").reset_index(drop=True)
+    return a.equals(b)
+
+
+def run(row_counts: list[int]) -> list[dict]:
+    logging.disable(logging.WARNING)
+    results = []
+    for rows in row_counts:
+        df = make_batch(rows)
+
+        t0 = time.perf_counter()
+        before = per_pattern_dedup(df)
+        per_pattern_seconds = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        after = _latest_per_key(df, PK_COLS, TS_COL, "bench")
+        vectorized_seconds = time.perf_counter() - t0
+
+        if not _same_rows(before, after):
+            raise AssertionError(f"Dedup results differ at {rows} rows")
+        results.append({
+            "rows": rows,
+            "kept": len(after),
+            "patterns": int(df[PK_COLS].isna().drop_duplicates().shape[0]),
+            "per_pattern_seconds": round(per_pattern_seconds, 3),
+            "vectorized_seconds": round(vectorized_seconds, 3),
+        })
+    logging.disable(logging.NOTSET)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    results = run(args.rows)
+    print(f"{'rows':>9} {'kept':>9} {'patterns':>8} {'per_pattern_s':>13} {'vectorized_s':>12}")
+    for r in results:
+        print(f"{r['rows']:>9} {r['kept']:>9} {r['patterns']:>8} "
+              f"{r['per_pattern_seconds']:>13} {r['vectorized_seconds']:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark: PCF/UCF basket parsing, columnar engine vs block-by-block.
+
+Writes synthetic basket files with an increasing number of fund blocks and
+times extract_pcf / extract_ucf (columnar engine) against the block-by-block
+fallback on the same raw frame. The columnar path should scale with rows
+rather than with the number of blocks.
+
+Run from project root:
+    python -m benchmarks.bench_parsers --funds 50 200 800
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.synthetic import write_pcf, write_ucf
+from src.parsers import (
+    extract_pcf, extract_ucf, _extract_pcf_blocks, _extract_ucf_blocks)
+
+SHAPES = {
+    "pcf": (write_pcf, extract_pcf, _extract_pcf_blocks, 25),
+    "ucf": (write_ucf, extract_ucf, _extract_ucf_blocks, 34),
+}
+
+
+def _timed(fn, *args) -> tuple[float, pd.DataFrame]:
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return time.perf_counter() - t0, out
+
+
+def run(fund_counts: list[int], holdings: int) -> list[dict]:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for shape, (writer, extract, by_block, width) in SHAPES.items():
+            for funds in fund_counts:
+                path = writer(Path(tmp) / f"{shape}_{funds}.csv", funds=funds, holdings=holdings)
+                fast_s, fast = _timed(extract, path)
+                # read is included in fast_s, so include it here too
+                t0 = time.perf_counter()
+                slow = by_block(pd.read_csv(path, header=None, names=range(width)))
+                slow_s = time.perf_counter() - t0
+                results.append({
+                    "shape": shape,
+                    "blocks": funds,
+                    "rows": len(fast),
+                    "columnar_s": round(fast_s, 3),
+                    "by_block_s": round(slow_s, 3),
+                    "same": fast.equals(slow),
+                })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--funds", type=int, nargs="+", default=[50, 200, 800])
+    parser.add_argument("--holdings", type=int, default=50)
+    args = parser.parse_args()
+
+    results = run(args.funds, args.holdings)
+    print(f"{'shape':>5} {'blocks':>7} {'rows':>8} {'columnar_s':>11} {'by_block_s':>11} {'same':>5}")
+    for r in results:
+        print(f"{r['shape']:>5} {r['blocks']:>7} {r['rows']:>8} "
+              f"{r['columnar_s']:>11} {r['by_block_s']:>11} {str(r['same']):>5}")
+
+
+if __name__ == "__main__":
+    main()
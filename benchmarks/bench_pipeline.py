@@ -0,0 +1,220 @@
+"""
+Benchmark: the inbox-to-silver pipeline, stage by stage, per file shape.
+
+Writes a synthetic inbox file for each INGESTION_MAPPINGS shape (PCF and UCF
+basket files, the CIL file, flat State Street CSVs and the Excel price file),
+dispatches it through the config mapping the way main.py does and times each
+stage against a temporary warehouse:
+
+    parse      mapping parser (streaming parsers are drained into a list)
+    bronze     ingest_into_bronze / ingest_blocks_into_bronze
+    read       read_bronze_changes
+    clean      clean_and_cast (CLEAN_ENGINE / CLEAN_DIAGNOSTICS)
+    silver     upsert_silver
+
+Each shape runs in a fresh process, so its peak RSS is its own. Results
+(seconds, rows/s, peak RSS after each stage, plus the commit and library
+versions) are written as JSON; --compare prints the change against an
+earlier results file, e.g. one taken on the previous commit.
+
+Run from project root:
+    python -m benchmarks.bench_pipeline --scale 1 10
+    python -m benchmarks.bench_pipeline --compare benchmarks/results/<earlier>.json
+"""
+import argparse
+import json
+import logging
+import platform
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from importlib.metadata import PackageNotFoundError, version
+from multiprocessing import get_context
+from pathlib import Path
+
+from benchmarks import synthetic
+from src.utils.instrumentation import peak_rss_mb
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+STAGES = ["parse", "bronze", "read", "clean", "silver"]
+
+# shape -> (inbox file name, builder, builder arguments at scale 1: about one day's drop)
+CASES = {
+    "pcf_inav_baskets": ("Harvest_INAVBSKT_ALL.20260224.csv", synthetic.write_pcf,
+                         {"funds": 100, "holdings": 50}),
+    "ucf_records": ("Harvest_UCF_ALL.20260224.csv", synthetic.write_ucf,
+                    {"funds": 50, "holdings": 40}),
+    "cash_in_lieu_records": ("Harvest_CIL_ALL.20260224.csv", synthetic.write_cil,
+                             {"funds": 100, "holdings": 20}),
+    "all_positions": ("All_Positions20260224.csv", synthetic.write_positions, {"rows": 20_000}),
+    "inkind_orders": ("Harvest_INKIND.20260224.txt", synthetic.write_inkind, {"rows": 5_000}),
+    "accounting_nav_records": ("Harvest Price File -20260224.xlsx", synthetic.write_price_file,
+                               {"funds": 200}),
+}
+# Builder arguments that grow with --scale
+SCALED = {"funds", "rows"}
+
+
+def run_case(case: str, scale: float, workdir: str) -> dict:
+    """Build one shape's inbox file and push it through every stage; meant to run in its own process."""
+    import pandas as pd
+
+    import config
+    from src.cleaner import clean_and_cast
+    from src.deltalake_writer import (
+        ingest_blocks_into_bronze, ingest_into_bronze, read_bronze_changes, upsert_silver)
+    from src.mapping_index import MappingIndex
+
+    logging.disable(logging.WARNING)
+    file_name, build, kwargs = CASES[case]
+    kwargs = {k: max(1, int(v * scale)) if k in SCALED else v for k, v in kwargs.items()}
+    workdir = Path(workdir)
+    file_path = build(workdir / file_name, **kwargs)
+
+    match = MappingIndex(config.INGESTION_MAPPINGS).match(file_name)
+    if match is None:
+        raise LookupError(f"No INGESTION_MAPPINGS entry matches {file_name}")
+    mapping = match.mapping
+    bronze_path = workdir / "bronze" / mapping.bronze_table
+    silver_path = workdir / "silver" / mapping.silver_mapping.silver_table_name
+
+    result = {
+        "case": case,
+        "bronze_table": mapping.bronze_table,
+        "file_bytes": file_path.stat().st_size,
+        "builder_args": kwargs,
+        "start_rss_mb": peak_rss_mb(),
+        "stages": {},
+    }
+
+    def timed(stage, fn, rows_of):
+        t0 = time.perf_counter()
+        out = fn()
+        seconds = time.perf_counter() - t0
+        rows = rows_of(out)
+        result["stages"][stage] = {
+            "seconds": round(seconds, 4),
+            "rows": rows,
+            "rows_per_second": round(rows / seconds) if seconds else None,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+        return out
+
+    def parse():
+        parsed = mapping.load_parser()(file_path)
+        return list(parsed) if mapping.stream else parsed
+
+    parsed = timed("parse", parse,
+                   lambda out: sum(len(block) for block in out) if mapping.stream else len(out))
+
+    def bronze():
+        kwargs = dict(source_name=file_name, current_time=pd.Timestamp.now(tz="America/New_York"),
+                      target_path=bronze_path, batch_id="bench", write_mode=mapping.load_type,
+                      partition_by=mapping.partition_by)
+        if mapping.stream:
+            return ingest_blocks_into_bronze(blocks=iter(parsed), **kwargs)
+        return ingest_into_bronze(df=parsed, **kwargs).num_rows
+
+    timed("bronze", bronze, lambda rows: rows)
+    bronze_df, _ = timed("read", lambda: read_bronze_changes(bronze_path), lambda out: len(out[0]))
+    cleaned = timed("clean", lambda: clean_and_cast(
+        bronze_df, mapping.silver_mapping, engine=config.CLEAN_ENGINE,
+        diagnostics=config.CLEAN_DIAGNOSTICS), len)
+    timed("silver", lambda: upsert_silver(cleaned, mapping.silver_mapping, silver_path),
+          lambda _: len(cleaned))
+    result["peak_rss_mb"] = peak_rss_mb()
+    logging.disable(logging.NOTSET)
+    return result
+
+
+def run(scales: list[float], cases: list[str]) -> list[dict]:
+    results = []
+    spawn = get_context("spawn")
+    for scale in scales:
+        for case in cases:
+            with tempfile.TemporaryDirectory() as tmp, \
+                    ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                result = pool.submit(run_case, case, scale, tmp).result()
+            results.append({"scale": scale, **result})
+    return results
+
+
+def _run_info() -> dict:
+    """Commit, interpreter and library versions the results were taken with."""
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], capture_output=True, text=True,
+                                  cwd=RESULTS_DIR.parent, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    versions = {}
+    for package in ("pandas", "pyarrow", "polars", "deltalake", "numpy"):
+        try:
+            versions[package] = version(package)
+        except PackageNotFoundError:
+            versions[package] = None
+    import config
+    return {
+        "commit": git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "clean_engine": config.CLEAN_ENGINE,
+        "clean_diagnostics": config.CLEAN_DIAGNOSTICS,
+        "versions": versions,
+    }
+
+
+def compare(results: list[dict], baseline: dict) -> None:
+    """Print seconds per stage against an earlier results file (ratio > 1 is slower now)."""
+    before = {(r["scale"], r["case"], stage): s["seconds"]
+              for r in baseline["results"] for stage, s in r["stages"].items()}
+    print(f"\nvs {baseline['run'].get('commit')} ({baseline['run'].get('started_at')})")
+    print(f"{'case':>22} {'scale':>5} {'stage':>7} {'before_s':>9} {'now_s':>8} {'ratio':>6}")
+    for r in results:
+        for stage, s in r["stages"].items():
+            old = before.get((r["scale"], r["case"], stage))
+            if old is None:
+                continue
+            ratio = f"{s['seconds'] / old:.2f}" if old else "-"
+            print(f"{r['case']:>22} {r['scale']:>5} {stage:>7} {old:>9} {s['seconds']:>8} {ratio:>6}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=float, nargs="+", default=[1.0],
+                        help="multiplier on funds/rows per file (1 = about one day's drop)")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--output", type=Path, default=None,
+                        help="results JSON (default benchmarks/results/pipeline_<time>_<commit>.json)")
+    parser.add_argument("--compare", type=Path, default=None, help="earlier results JSON")
+    args = parser.parse_args()
+
+    info = _run_info()
+    results = run(args.scale, args.cases)
+
+    output = args.output or RESULTS_DIR / (
+        f"pipeline_{datetime.now():%Y%m%d-%H%M%S}_{info['commit'] or 'nogit'}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({"run": info, "results": results}, indent=2))
+
+    print(f"{'case':>22} {'scale':>5} {'rows':>8} " + " ".join(f"{s + '_s':>9}" for s in STAGES)
+          + f" {'rows/s':>9} {'peak_mb':>8}")
+    for r in results:
+        total = sum(s["seconds"] for s in r["stages"].values())
+        rows = r["stages"]["parse"]["rows"]
+        print(f"{r['case']:>22} {r['scale']:>5} {rows:>8} "
+              + " ".join(f"{r['stages'][s]['seconds']:>9}" for s in STAGES)
+              + f" {round(rows / total) if total else '-':>9} {r['peak_rss_mb'] or '-':>8}")
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(results, json.loads(args.compare.read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark: peak memory of loading a basket file into bronze, whole-file vs streamed.
+
+Loads the same synthetic PCF file twice, each in a fresh process:
+extract_pcf + ingest_into_bronze (whole file in memory), and
+iter_pcf_blocks + ingest_blocks_into_bronze (one chunk at a time). Reports
+wall time and the growth of the process's peak RSS during the load.
+
+Run from project root:
+    python -m benchmarks.bench_stream_bronze --funds 800 3200 --chunksize 10000
+"""
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MB."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 2**20
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes elsewhere
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def _load(mode: str, path: Path, target: Path, chunksize: int, queue) -> None:
+    import pandas as pd
+    from src.deltalake_writer import ingest_blocks_into_bronze, ingest_into_bronze
+    from src.parsers import extract_pcf, iter_pcf_blocks
+
+    now = pd.Timestamp.now(tz="America/New_York")
+    before = _peak_rss_mb()
+    t0 = time.perf_counter()
+    if mode == "whole":
+        ingest_into_bronze(extract_pcf(path), path.name, now, target, "bench")
+    else:
+        ingest_blocks_into_bronze(
+            iter_pcf_blocks(path, chunksize=chunksize), path.name, now, target, "bench",
+            batch_rows=chunksize)
+    queue.put((time.perf_counter() - t0, _peak_rss_mb() - before))
+
+
+def run(fund_counts: list[int], holdings: int, chunksize: int) -> list[dict]:
+    from benchmarks.synthetic import write_pcf
+
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for funds in fund_counts:
+            path = write_pcf(Path(tmp) / f"pcf_{funds}.csv", funds=funds, holdings=holdings)
+            for mode in ("whole", "streamed"):
+                queue = ctx.Queue()
+                proc = ctx.Process(target=_load, args=(
+                    mode, path, Path(tmp) / f"bronze_{mode}_{funds}", chunksize, queue))
+                proc.start()
+                seconds, peak_growth = queue.get()
+                proc.join()
+                results.append({
+                    "mode": mode,
+                    "blocks": funds,
+                    "rows": funds * holdings,
+                    "seconds": round(seconds, 3),
+                    "peak_rss_growth_mb": round(peak_growth, 1),
+                })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--funds", type=int, nargs="+", default=[800, 3200])
+    parser.add_argument("--holdings", type=int, default=50)
+    parser.add_argument("--chunksize", type=int, default=10_000)
+    args = parser.parse_args()
+
+    results = run(args.funds, args.holdings, args.chunksize)
+    print(f"{'mode':>9} {'blocks':>7} {'rows':>8} {'seconds':>8} {'peak_rss_growth_mb':>19}")
+    for r in results:
+        print(f"{r['mode']:>9} {r['blocks']:>7} {r['rows']:>8} "
+              f"{r['seconds']:>8} {r['peak_rss_growth_mb']:>19}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark: per-run cost of upsert_silver as silver history grows.
+
+Builds a silver table with increasing amounts of history, then times a single
+daily upsert (one trading day of new rows plus a slice of already-loaded rows)
+against each size. With the MERGE-based upsert the per-run time and bytes
+written should stay roughly flat instead of growing with history.
+
+Run from project root:
+    python -m benchmarks.bench_upsert_silver --history 50000 200000 1000000
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import deltalake
+
+from config import SilverMapping
+from src.deltalake_writer import upsert_silver
+
+MAPPING = SilverMapping(
+    silver_table_name="bench_positions",
+    table_type="fact",
+    primary_keys=("trade_date", "fund_ticker", "ticker"),
+)
+
+
+def make_day(day: pd.Timestamp, rows: int, seed: int = 0) -> pd.DataFrame:
+    """One trading day of basket-like holdings."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "trade_date": day,
+        "fund_ticker": [f"FND{i % 40:02d}" for i in range(rows)],
+        "ticker": [f"SEC{i:06d}" for i in range(rows)],
+        "share_count": pd.array(rng.integers(1, 10_000, rows), dtype="Int64"),
+        "base_market_value": rng.random(rows) * 1e6,
+        "ingested_at": pd.Timestamp.now(tz="America/New_York"),
+    })
+
+
+def _dir_bytes(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*.parquet"))
+
+
+def run(history_sizes: list[int], daily_rows: int) -> list[dict]:
+    results = []
+    for history_rows in history_sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            silver_path = Path(tmp) / "silver"
+            days = max(1, history_rows // daily_rows)
+            start = pd.Timestamp("2020-01-01", tz="America/New_York")
+            history = pd.concat(
+                [make_day(start + pd.Timedelta(days=d), daily_rows, seed=d)
+                 for d in range(days)], ignore_index=True)
+            upsert_silver(history, MAPPING, silver_path)
+
+            # New day plus a replayed slice of the last loaded day
+            new_day = make_day(
+                start + pd.Timedelta(days=days), daily_rows, seed=days)
+            replay = history.tail(daily_rows // 10)
+            incoming = pd.concat([new_day, replay], ignore_index=True)
+
+            bytes_before = _dir_bytes(silver_path)
+            t0 = time.perf_counter()
+            upsert_silver(incoming, MAPPING, silver_path)
+            elapsed = time.perf_counter() - t0
+            written = _dir_bytes(silver_path) - bytes_before
+
+            total_rows = deltalake.DeltaTable(silver_path).count()
+            results.append({
+                "history_rows": len(history),
+                "incoming_rows": len(incoming),
+                "seconds": round(elapsed, 3),
+                "bytes_written": written,
+                "rows_after": total_rows,
+            })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--history", type=int, nargs="+",
+                        default=[20_000, 100_000, 500_000])
+    parser.add_argument("--daily-rows", type=int, default=5_000)
+    args = parser.parse_args()
+
+    results = run(args.history, args.daily_rows)
+    print(f"{'history_rows':>14} {'incoming':>9} {'seconds':>8} {'bytes_written':>14}")
+    for r in results:
+        print(f"{r['history_rows']:>14} {r['incoming_rows']:>9} "
+              f"{r['seconds']:>8} {r['bytes_written']:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Synthetic State Street file builders for benchmarks and tests.
+
+Each builder writes a file shaped like the real drop so the matching parser in
+src.parsers (or the pandas reader configured in INGESTION_MAPPINGS) can read
+it. Values are random but deterministic for a given seed.
+"""
+import csv
+import random
+from pathlib import Path
+
+PCF_HOLDINGS_HEADER = [
+    "CUSIP", "TICKER", "SEDOL", "ISIN", "DESCRIPTION", "SHARES", "ORIGINAL_FACE",
+    "INTEREST", "LOCAL_PRICE", "LOCAL_MV", "FOREX", "BASE_PRICE", "BASE_MV",
+    "WEIGHT", "CIL", "EST_DIVIDEND", "LOT", "NEW", "SHARE_CHANGE", "SUPPLEMENTAL_ID_1 ",
+]
+PCF_METRIC_KEYS = [
+    "ESTIMATED_DIVIDENDS", "ESTIMATED_EXPENSE", "ESTIMATED_CASH_COMPONENT", "NAV",
+    "UNDISTRIBUTED_NET_INCOME_PER_SHARE", "BASKET_MARKET_VALUE", "ACTUAL_CASH_COMPONENT",
+    "NAV_PER_CREATION_UNIT", "UNDISTRIBUTED_NET_INCOME_PER_CREATION_UNIT", "BASKET_SHARES",
+    "NAV_LESS_UNDISTRIBUTED_NET_INCOME", "ACTUAL_CASH_IN_LIEU", "ESTIMATED_CASH_IN_LIEU",
+    "ETF_SHARES_OUTSTANDING", "EXPENSE_RATIO", "TOTAL_NET_ASSETS", "ACTUAL_TOTAL_CASH",
+    "ESTIMATED_TOTAL_CASH",
+]
+UCF_HOLDINGS_HEADER = [
+    "FUND", "CUSIP", "ISIN", "SEDOL", "TICKER", "DESCRIPTION", "SHARES", "FOREX",
+    "LOCAL_PRICE", "BASE_PRICE", "ORIGINAL_FACE", "CIL", "SETTLEMENT_DATE",
+    "SUPPLEMENTAL_ID_1 ", "BASE_NET_AMOUNT", "LOCAL_ACCRUED_INTEREST",
+    "BASE_ACCRUED_INTEREST", "PAR_ADJUSTMENT_FACTOR", "FACTORABLE",
+]
+UCF_METRIC_KEYS = [
+    "TOTAL_CREATIONS/REDEMPTIONS", "NAV", "NAV_PER_CREATION/REDEMPTION", "TOTAL_ETF_SHARES",
+    "TOTAL_ETF_VALUE", "BASKET_SHARES", "DIVIDEND_CASH", "CASH_COMPONENT", "CASH_IN_LIEU",
+    "TOTAL_DUE", "SETTLE_DATE",
+]
+
+POSITIONS_HEADER = [
+    "FundID", "ISIN", "CUSIP", "Ticker", "SEDOL", "Basket Shares", "Currency",
+    "Country Restriction", "Trade Country", "IDENTIFIER", "CIN", "SSC_ASSET_ID", "ROUND LOT",
+    "TIP FACTOR", "PAR", "INTEREST RATE", "MATURITY DATE", "FUND TICKER", "FUND NAME",
+    "BASKET DATE", "CORPORATE ACTION FACTOR", "INTEREST FACTOR", "SUPPRESSPRICE",
+    "SUPPLEMENTAL_ID_1", "SUPPLEMENTAL_ID_2", "RIC", "BBG", "DERIV_TYPE",
+]
+CIL_HEADER = [
+    "BASKET_CODE", "BASKET_TICKER", "CUSIP", "TICKER", "SEDOL", "ISIN", "DESCRIPTION", "SHARES",
+    "LOCAL_PRICE", "FOREX", "BASE_PRICE", "BASE_INTEREST", "BASE_MV", "INT_FACTOR",
+    "PAR_ADJUSTMENT_FACTOR",
+]
+INKIND_HEADER = [
+    "FUND", "CUSIP", "ISIN", "SEDOL", "TICKER", "DESCRIPTION", "SHARES", "FOREX", "LOCAL_PRICE",
+    "LOCAL_NET_AMOUNT", "BASE_PRICE", "BASE_NET_AMOUNT", "LOCAL_ACCRUED_INTEREST",
+    "BASE_ACCRUED_INTEREST", "ORIGINAL_FACE", "PAR_ADJUSTMENT_FACTOR", "CIL", "TRADE_DATE",
+    "SETTLEMENT_DATE", "CIL_FEE", "ORDER_NUMBER", "FACTORABLE", "SUPPLEMENTAL_ID_1 ",
+    "SUPPLEMENTAL_ID_2",
+]
+PRICE_FILE_HEADER = [
+    "Fund ID", "Vendor Fund Name", "NAV", "Prior NAV", "NAV Change", "NAV Pct Change",
+    "Capital Stock Shares Outstanding", "Total Net Assets", "Prior Total Net Assets",
+    "Total Net Assets Change (Current TNA-Prior TNA)", "Periodic Income Div Rate",
+    "Cap Gains Distribution Factor (Net Rate)", "FX Rate USD/CAD", "FX Rate CAD/USD",
+]
+
+
+def _pad(row: list, width: int) -> list:
+    return row + [""] * (width - len(row))
+
+
+def _header(names: list, width: int) -> list:
+    """Holdings header padded with placeholder names, so no column is unnamed."""
+    return names + [f"FIELD_{i}" for i in range(len(names) + 1, width + 1)]
+
+
+def _pairs(keys: list, rng: random.Random, per_row: int) -> list[list]:
+    """Lay key/value pairs out per_row to a line."""
+    rows = []
+    for i in range(0, len(keys), per_row):
+        row = []
+        for key in keys[i:i + per_row]:
+            row += [key, f"{rng.uniform(0, 1e6):.2f}"]
+        rows.append(row)
+    return rows
+
+
+def _security(rng: random.Random, i: int) -> dict:
+    return {
+        "CUSIP": f"{rng.randrange(10**8):08d}C",
+        "TICKER": f"SEC{i:05d}",
+        "SEDOL": f"B{rng.randrange(10**6):06d}",
+        "ISIN": f"US{rng.randrange(10**10):010d}",
+        "DESCRIPTION": f"SECURITY {i} INC",
+    }
+
+
+def write_pcf(path: Path, funds: int = 100, holdings: int = 50, trade_date: str = "20260224",
+              seed: int = 0) -> Path:
+    """Harvest_INAVBSKT_ALL / Harvest_BSKT_ALL basket file: one block per fund."""
+    rng = random.Random(seed)
+    width = 25
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        for fund in range(funds):
+            writer.writerow(_pad([
+                "TRADE_DATE", trade_date, f"HR{fund:02d}ABCD", "", f"HARVEST FUND {fund} ETF",
+                f"'H{fund:03d}", f"H{fund:03d}/U", "CAD", "CREATION_UNIT_SIZE", "50000",
+            ], width))
+            metric_rows = _pairs(PCF_METRIC_KEYS, rng, per_row=3)
+            metric_rows += [[""]] * (7 - len(metric_rows))
+            for row in metric_rows:
+                writer.writerow(_pad(row, width))
+            writer.writerow(_header(PCF_HOLDINGS_HEADER, width))
+            for i in range(holdings):
+                sec = _security(rng, i)
+                shares = rng.randrange(1, 100_000)
+                price = rng.uniform(1, 500)
+                writer.writerow(_pad([
+                    sec["CUSIP"], sec["TICKER"], sec["SEDOL"], sec["ISIN"], sec["DESCRIPTION"],
+                    f"{shares:,}", "", "", f"{price:.4f}", f"{shares * price:,.2f}", "1.0",
+                    f"{price:.4f}", f"{shares * price:,.2f}", f"{rng.uniform(0, 5):.4f}%",
+                    rng.choice(["Y", "N"]), "0", "100", rng.choice(["Y", "N"]),
+                    str(rng.randrange(-500, 500)), str(shares * 10),
+                ], width))
+    return path
+
+
+def write_ucf(path: Path, funds: int = 50, holdings: int = 40, trade_date: str = "20260224",
+              seed: int = 0) -> Path:
+    """Harvest_UCF_ALL order file: 7 header rows, holdings, then 16 metric rows per block."""
+    rng = random.Random(seed)
+    width = 34
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        for fund in range(funds):
+            writer.writerow(_pad(["FUND_NAME", f"HARVEST FUND {fund} ETF"], width))
+            writer.writerow(_pad(["FUND", f"HR{fund:02d}", "FUND_TICKER", f"H{fund:03d}"], width))
+            writer.writerow(_pad(["TRADE_DATE", trade_date], width))
+            writer.writerow(_pad(["BROKER", "", f"BROKER {fund % 7}", "", "ORDER_ID",
+                                  f"{rng.randrange(10**6)}"], width))
+            writer.writerow(_pad(["SETTLEMENT_DATE", "20260226"], width))
+            writer.writerow(_pad(["CURRENCY", "CAD"], width))
+            writer.writerow(_pad([rng.choice(["CREATE", "REDEEM"])], width))
+            writer.writerow(_header(UCF_HOLDINGS_HEADER, width))
+            for i in range(holdings):
+                sec = _security(rng, i)
+                shares = rng.randrange(1, 100_000)
+                price = rng.uniform(1, 500)
+                writer.writerow(_pad([
+                    f"HR{fund:02d}", sec["CUSIP"], sec["ISIN"], sec["SEDOL"], sec["TICKER"],
+                    sec["DESCRIPTION"], f"{shares:,}", "1.0", f"{price:.4f}", f"{price:.4f}", "",
+                    rng.choice(["Y", "N"]), "20260226", str(shares * 10),
+                    f"{shares * price:,.2f}", "0", "0", "1", "N",
+                ], width))
+            metric_rows = _pairs(UCF_METRIC_KEYS, rng, per_row=1)
+            metric_rows += [[""]] * (16 - len(metric_rows))
+            for row in metric_rows:
+                writer.writerow(_pad(row, width))
+    return path
+
+
+def write_positions(path: Path, rows: int = 100_000, seed: int = 0) -> Path:
+    """All_Positions / PLF_Positions file: one header row, mostly empty columns,
+    a mix of stock rows and option rows (no ISIN/CUSIP, negative shares)."""
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(POSITIONS_HEADER)
+        for i in range(rows):
+            fund = f"HR{i // 500 % 100:02d}"
+            country = rng.choice(["US", "CA"])
+            currency = "USD" if country == "US" else "CAD"
+            sec = _security(rng, i)
+            row = [""] * len(POSITIONS_HEADER)
+            row[0], row[3], row[6], row[7], row[8] = fund, sec["TICKER"], currency, "N", country
+            if rng.random() < 0.3:
+                row[5] = str(-rng.randrange(1, 500))
+                row[23] = f"EO.{country}.US.{sec['TICKER']}..C{rng.randrange(10, 500)}.20260417"
+                row[25] = f"{sec['TICKER']:<6}260417C00255000"
+                row[26] = f"{sec['TICKER']} {country} 04/17/26 C255 EQUITY"
+                row[27] = "OP"
+            else:
+                row[1], row[2], row[4] = sec["ISIN"], sec["CUSIP"], sec["SEDOL"]
+                row[5] = str(rng.randrange(1, 200_000))
+                row[23] = f"ST.{country}.US.{sec['TICKER']}"
+            writer.writerow(row)
+    return path
+
+
+def write_cil(path: Path, funds: int = 100, holdings: int = 20, record_date: str = "20260224",
+              seed: int = 0) -> Path:
+    """Harvest_CIL_ALL file: a DATE row, one header row, then cash-in-lieu lines for every fund."""
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["DATE", record_date])
+        writer.writerow(CIL_HEADER)
+        for fund in range(funds):
+            for i in range(holdings):
+                sec = _security(rng, i)
+                shares = rng.randrange(1, 100_000)
+                price = rng.uniform(1, 500)
+                writer.writerow([
+                    f"HR{fund:02d}ABCD", f"H{fund:03d}", sec["CUSIP"], sec["TICKER"], sec["SEDOL"],
+                    sec["ISIN"], sec["DESCRIPTION"], str(shares), f"{price:.4f}", "1.0",
+                    f"{price:.4f}", "0", f"{shares * price:.2f}", "1", "1",
+                ])
+    return path
+
+
+def write_inkind(path: Path, rows: int = 20_000, trade_date: str = "20260224", seed: int = 0) -> Path:
+    """Harvest_INKIND / Harvest_Preburst_INKIND_ALL order file: a title line, then a flat table."""
+    rng = random.Random(seed)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([f"IN-KIND ORDERS {trade_date}"])
+        writer.writerow(INKIND_HEADER)
+        for i in range(rows):
+            sec = _security(rng, i)
+            shares = rng.randrange(1, 100_000)
+            price = rng.uniform(1, 500)
+            amount = f"{shares * price:.2f}"
+            writer.writerow([
+                f"HR{i // 200 % 100:02d}", sec["CUSIP"], sec["ISIN"], sec["SEDOL"], sec["TICKER"],
+                sec["DESCRIPTION"], str(shares), "1.0", f"{price:.4f}", amount, f"{price:.4f}",
+                amount, "0", "0", "", "1", rng.choice(["Y", "N"]), trade_date, "20260226", "0",
+                str(rng.randrange(10**6)), "N", str(shares * 10), f"BBG{rng.randrange(10**9):09d}",
+            ])
+    return path
+
+
+def write_price_file(path: Path, funds: int = 200, record_date: str = "02/24/2026",
+                     seed: int = 0) -> Path:
+    """Harvest Price File workbook (.xlsx): a title, the date in G2:H2, the header on row 4."""
+    from openpyxl import Workbook
+
+    rng = random.Random(seed)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Price File")
+    sheet.append(["HARVEST PRICE FILE"])
+    sheet.append(["", "", "", "", "", "", "Date:", record_date])
+    sheet.append(["Accounting NAVs"])
+    sheet.append(PRICE_FILE_HEADER)
+    for fund in range(funds):
+        nav, prior = rng.uniform(5, 50), rng.uniform(5, 50)
+        units = rng.randrange(10_000, 10_000_000)
+        sheet.append([
+            f"HR{fund:02d}", f"HARVEST FUND {fund} ETF", round(nav, 4), round(prior, 4),
+            round(nav - prior, 4), round((nav - prior) / prior, 6), units, round(nav * units, 2),
+            round(prior * units, 2), round((nav - prior) * units, 2), round(rng.uniform(0, 0.2), 4),
+            0, 1.3612, 0.7346,
+        ])
+    workbook.save(path)
+    return path
@@ -1,16 +1,15 @@
 # Configuration file for ETL pipeline. Contains constants, maps, file paths, and settings.
 # Serves as a single source of truth for configuration values used across the project.
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import date, datetime
-from typing import Optional, Type, Union
+from typing import Callable, Optional, Type, Union
+import importlib
 import os
 import re
-import pandas as pd
 from pathlib import Path
 from dotenv import load_dotenv
-import src.parsers
-from functools import partial
+from functools import lru_cache, partial
 
 # Custom type for percentage values
 
@@ -24,8 +23,9 @@ class Percentage:
 load_dotenv()
 # ===== Directory Paths =====
 ROOT_DIR = Path(__file__).resolve().parent
-WAREHOUSE_DIR = Path(r"C:\Users\mmoin\PYTHON PROJECTS\DataWareHouse")
-LOG_DIR = Path(r"C:\Users\mmoin\PYTHON PROJECTS\logs")
+WAREHOUSE_DIR = Path(os.getenv(
+    "WAREHOUSE_DIR", r"C:\Users\mmoin\PYTHON PROJECTS\DataWareHouse"))
+LOG_DIR = Path(os.getenv("LOG_DIR", r"C:\Users\mmoin\PYTHON PROJECTS\logs"))
 RAW_DATA_DIR = WAREHOUSE_DIR / "data" / "0_raw data"
 INBOX_DIR = WAREHOUSE_DIR / "bronze" / "inbox"
 PROCESSED_DIR = WAREHOUSE_DIR / "bronze" / "processed"
@@ -34,6 +34,10 @@ QUARANTINE_DIR = WAREHOUSE_DIR / "data" / "quarantine"
 BRONZE_DIR = WAREHOUSE_DIR / "bronze" / "staging_area"
 SILVER_DIR = WAREHOUSE_DIR / "silver"
 GOLD_DIR = WAREHOUSE_DIR / "gold"
+# Content hashes of ingested inbox files (src.ledger.IngestionLedger)
+LEDGER_FILE = WAREHOUSE_DIR / "bronze" / "ingestion_ledger.duckdb"
+# Per-stage timings and row counts of every run (src.utils.instrumentation)
+RUN_METRICS_TABLE = WAREHOUSE_DIR / "metrics" / "pipeline_runs"
 
 # ===== Database Configuration =====
 DUCKDB_FILE = ROOT_DIR / "data" / "FundOperations.duckdb"
@@ -49,16 +53,67 @@ MFT_USERNAME = os.getenv("MFT_USERNAME")
 MFT_PASSWORD = os.getenv("MFT_PASSWORD")
 MFT_CERT_PATH = ROOT_DIR.parent/"mmoinclient.crt"
 MFT_KEY_PATH = ROOT_DIR.parent/"mmoinclient.key"
+# Size/mtime of every MFT file already synced into the inbox (StateStreetMFTClient.sync)
+MFT_MANIFEST_FILE = WAREHOUSE_DIR / "bronze" / "mft_manifest.json"
+# Folder main.py --mft ingests from
+MFT_REMOTE_FOLDER = os.getenv("MFT_REMOTE_FOLDER", "/ETFGlobalHarvest/fromSSC")
 
 # ===== API Configuration =====
 FIGI_API_KEY = os.getenv("FIGI_API_KEY")
 
+# ===== Bloomberg Cache (src.services.bloomberg_cache) =====
+BLOOMBERG_CACHE_FILE = WAREHOUSE_DIR / "bronze" / "bloomberg_cache.duckdb"
+# Hours a cached BDP value stays valid, per field ("default" for fields not listed).
+# None: never expires (static reference data); 0: never served from the cache.
+BLOOMBERG_REFERENCE_TTL_HOURS = {
+    "default": 24,
+    "NAME": None,
+    "SECURITY_DES": None,
+    "ID_ISIN": None,
+    "ID_CUSIP": None,
+    "ID_SEDOL1": None,
+    "ID_BB_GLOBAL": None,
+    "CRNCY": None,
+    "COUNTRY_ISO": None,
+    "GICS_SECTOR_NAME": 24 * 30,
+    "GICS_INDUSTRY_NAME": 24 * 30,
+    "PX_LAST": 0,
+}
+
+# ===== Silver Configuration =====
+# clean_and_cast engine: "pandas" (column by column) or "polars" (compiled cast plan)
+CLEAN_ENGINE = os.getenv("CLEAN_ENGINE", "pandas")
+# null-loss diagnostics per cast column: "off", "counts", or "sampled" (counts + sample values)
+CLEAN_DIAGNOSTICS = os.getenv("CLEAN_DIAGNOSTICS", "sampled")
+
+# ===== Bronze Streaming =====
+# Files of mappings with a stream_parser are streamed into bronze block by block from this
+# size up: far lower peak memory, but about 3x the wall time of the whole-file parse
+STREAM_MIN_FILE_SIZE = int(os.getenv("STREAM_MIN_FILE_SIZE", 512 * 1024 * 1024))
+
+# ===== Delta Maintenance (main.py --maintain) =====
+COMPACT_TARGET_SIZE = 128 * 1024 * 1024       # bytes per data file after compaction
+COMPACT_SMALL_FILE_SIZE = 16 * 1024 * 1024    # files below this count as small
+COMPACT_MIN_SMALL_FILES = 16                  # compact only once this many small files exist
+CHECKPOINT_INTERVAL = 20                      # commits since the last checkpoint before a new one
+VACUUM_RETENTION_HOURS = None                 # None: the table's own retention (7 days by default)
+
+# ===== Watch Mode (main.py --watch) =====
+WATCH_SETTLE_SECONDS = 5      # a file is ingested once its size/mtime are unchanged this long
+WATCH_POLL_INTERVAL = 10      # seconds between inbox rescans when no notification arrives
+WATCH_MAX_BATCH_FILES = 200   # most files per micro-batch
+
 
 # ===== Ingestion Mappings =====
 # Defines the ingestion workflow: when a file is discovered, its filename is matched against
 # this mapping to determine (1) which parser to use, (2) write mode, and (3) target bronze table.
 #
 # One file → One parser → One DataFrame → One bronze table
+#
+# Parsers are given by dotted path and imported on first use, so loading this config does
+# not pull in pandas or the parsers. Plain CSVs can use "src.parsers.read_csv" with
+# parser_kwargs={"engine": "pyarrow" | "polars"} instead of pandas.read_csv: a multi-threaded
+# read with every column kept as a string, written to bronze as Arrow.
 @dataclass
 class ColumnMapping:
     # int, str, float, bool, datetime, or "pct" for percentage
@@ -67,6 +122,16 @@ class ColumnMapping:
     datetime_format: str = None       # for datetime parsing, e.g. "%m/%d/%Y"
 
 
+@dataclass
+class PartitionSpec:
+    # Delta partition column derived from a date column, e.g. "trade_month" = "2026-02".
+    # Silver tables should derive it from a primary key column so upserts can prune partitions.
+    name: str                         # partition column added to the table
+    source_column: str                # column the value is derived from (bronze or silver name)
+    granularity: str = "month"        # "day" | "month" | "year" | "value" (source as-is)
+    datetime_format: str = None       # for string source columns, e.g. "%Y%m%d"
+
+
 @dataclass
 class SilverMapping:
     silver_table_name: str            # target silver table name
@@ -74,6 +139,7 @@ class SilverMapping:
     primary_keys: Union[str, tuple]
     columns: dict[str, ColumnMapping] = field(default_factory=dict)
     dedup_timestamp: str = "ingested_at"
+    partition_by: Optional[PartitionSpec] = None
 
     def __post_init__(self):
         """Normalize primary_keys to always be a tuple."""
@@ -83,22 +149,53 @@ class SilverMapping:
 
 @dataclass
 class IngestionMapping:
-    parser: object                    # Callable parser function
+    parser: object                    # parser callable, or its dotted path e.g. "src.parsers.extract_cil"
     bronze_table: str                 # target bronze table name
     rename: bool = False              # rename file with timestamp
     load_type: str = "append"         # "append" or "overwrite"
+    # parser yields one DataFrame per block; bronze is written as a stream
+    stream: bool = False
+    # block parser (see stream) used instead of parser for files of STREAM_MIN_FILE_SIZE or more
+    stream_parser: object = None
+    # optional bronze partitioning (applies when the table is created)
+    partition_by: Optional[PartitionSpec] = None
     # optional silver transformation
     silver_mapping: Optional[SilverMapping] = None
+    # keyword arguments passed to the parser, e.g. {"na_values": "", "keep_default_na": False}
+    parser_kwargs: dict = field(default_factory=dict)
+    # parser reads file objects: main.py --mft parses the MFT download stream directly
+    remote_stream: bool = False
+
+    def for_file(self, file_size: Optional[int]) -> "IngestionMapping":
+        """The mapping to ingest a file of file_size bytes with: streamed through stream_parser when large."""
+        if self.stream_parser is not None and file_size is not None and file_size >= STREAM_MIN_FILE_SIZE:
+            return replace(self, parser=self.stream_parser, parser_kwargs={}, stream=True)
+        return self
+
+    def load_parser(self) -> Callable:
+        """The parser callable with parser_kwargs bound; a dotted path is imported on first use."""
+        parser = _import_object(self.parser) if isinstance(self.parser, str) else self.parser
+        return partial(parser, **self.parser_kwargs) if self.parser_kwargs else parser
+
+
+@lru_cache(maxsize=None)
+def _import_object(dotted_path: str):
+    """Object named by "package.module.attribute"."""
+    module, _, name = dotted_path.rpartition(".")
+    return getattr(importlib.import_module(module), name)
 
 
 INGESTION_MAPPINGS = {
     # Harvest PCF Files
     re.compile(r"Harvest_INAVBSKT_ALL\.\d{8}\.csv", re.IGNORECASE): IngestionMapping(
-        parser=src.parsers.extract_pcf,
+        parser="src.parsers.extract_pcf",
+        stream_parser="src.parsers.iter_pcf_blocks",
         bronze_table="pcf_inav_baskets",
+        partition_by=PartitionSpec("trade_month", "TRADE_DATE", datetime_format="%Y%m%d"),
         silver_mapping=SilverMapping(
             silver_table_name="pcf_inav_baskets",
             table_type="fact",
+            partition_by=PartitionSpec("trade_month", "trade_date"),
             primary_keys=("trade_date", "fund_ticker",
                           "description", "ticker"),
             columns={
@@ -146,11 +243,14 @@ INGESTION_MAPPINGS = {
         ),
     ),
     re.compile(r"Harvest_BSKT_ALL\.\d{8}\.csv", re.IGNORECASE): IngestionMapping(
-        parser=src.parsers.extract_pcf,
+        parser="src.parsers.extract_pcf",
+        stream_parser="src.parsers.iter_pcf_blocks",
         bronze_table="pcf_creation_baskets",
+        partition_by=PartitionSpec("trade_month", "TRADE_DATE", datetime_format="%Y%m%d"),
         silver_mapping=SilverMapping(
             silver_table_name="pcf_creation_baskets",
             table_type="fact",
+            partition_by=PartitionSpec("trade_month", "trade_date"),
             primary_keys=("trade_date", "fund_ticker",
                           "description", "ticker"),
             columns={
@@ -199,7 +299,9 @@ INGESTION_MAPPINGS = {
     ),
     # Position Files
     re.compile(r"All_Positions\d{8}\.csv", re.IGNORECASE): IngestionMapping(
-        parser=partial(pd.read_csv, na_values="", keep_default_na=False),
+        parser="src.parsers.read_csv",
+        parser_kwargs={"engine": "pyarrow"},
+        remote_stream=True,
         bronze_table="all_positions",
         silver_mapping=SilverMapping(
             silver_table_name="all_positions",
@@ -221,7 +323,9 @@ INGESTION_MAPPINGS = {
         ),
     ),
     re.compile(r"PLF_Positions\d{8}\.csv", re.IGNORECASE): IngestionMapping(
-        parser=partial(pd.read_csv, na_values="", keep_default_na=False),
+        parser="src.parsers.read_csv",
+        parser_kwargs={"engine": "pyarrow"},
+        remote_stream=True,
         bronze_table="plf_positions",
         silver_mapping=SilverMapping(
             silver_table_name="plf_positions",
@@ -243,11 +347,13 @@ INGESTION_MAPPINGS = {
         ),
     ),
     re.compile(r"Harvest_CIL_ALL\.\d{8}\.(csv|txt)", re.IGNORECASE): IngestionMapping(
-        parser=src.parsers.extract_cil,
+        parser="src.parsers.extract_cil",
         bronze_table="cash_in_lieu_records",
+        partition_by=PartitionSpec("record_month", "DATE", datetime_format="%Y%m%d"),
         silver_mapping=SilverMapping(
             silver_table_name="cash_in_lieu_records",
             table_type="fact",
+            partition_by=PartitionSpec("record_month", "record_date"),
             primary_keys=("record_date", "fund_ticker", "description"),
             columns={
                 "BASKET_CODE": ColumnMapping(str, "ss_id_class"),
@@ -269,12 +375,14 @@ INGESTION_MAPPINGS = {
         ),
     ),
     re.compile(r"Harvest_INKIND\.\d{8}\.txt", re.IGNORECASE): IngestionMapping(
-        parser=partial(pd.read_csv, na_values="",
-                       keep_default_na=False, skiprows=1),
+        parser="pandas.read_csv",
+        parser_kwargs={"na_values": "", "keep_default_na": False, "skiprows": 1},
         bronze_table="inkind_orders",
+        partition_by=PartitionSpec("trade_month", "TRADE_DATE", datetime_format="%Y%m%d"),
         silver_mapping=SilverMapping(
             silver_table_name="inkind_orders",
             table_type="fact",
+            partition_by=PartitionSpec("trade_month", "trade_date"),
             primary_keys=("trade_date", "ss_id", "description", "ticker"),
             columns={
                 "FUND": ColumnMapping(str, "ss_id"),
@@ -304,11 +412,13 @@ INGESTION_MAPPINGS = {
         ),
     ),
     re.compile(r"Harvest_NAV_ALL\.\d{8}\.csv", re.IGNORECASE): IngestionMapping(
-        parser=src.parsers.extract_cil,
+        parser="src.parsers.extract_cil",
         bronze_table="pcf_nav_records",
+        partition_by=PartitionSpec("record_month", "DATE", datetime_format="%Y%m%d"),
         silver_mapping=SilverMapping(
             silver_table_name="pcf_nav_records",
             table_type="fact",
+            partition_by=PartitionSpec("record_month", "record_date"),
             primary_keys=("record_date", "fund_ticker"),
             columns={
                 "BASKET_CODE": ColumnMapping(str, "ss_id_class"),
@@ -342,12 +452,14 @@ INGESTION_MAPPINGS = {
         ),
     ),
     re.compile(r"Harvest_Preburst_INKIND_ALL\.\d{8}\.txt", re.IGNORECASE): IngestionMapping(
-        parser=partial(pd.read_csv, na_values="",
-                       keep_default_na=False, skiprows=1),
+        parser="pandas.read_csv",
+        parser_kwargs={"na_values": "", "keep_default_na": False, "skiprows": 1},
         bronze_table="preburst_inkind_orders",
+        partition_by=PartitionSpec("trade_month", "TRADE_DATE", datetime_format="%Y%m%d"),
         silver_mapping=SilverMapping(
             silver_table_name="preburst_inkind_orders",
             table_type="fact",
+            partition_by=PartitionSpec("trade_month", "trade_date"),
             primary_keys=("trade_date", "ss_id", "description", "ticker"),
             columns={
                 "FUND": ColumnMapping(str, "ss_id"),
@@ -377,11 +489,13 @@ INGESTION_MAPPINGS = {
         ),
     ),
     re.compile(r"Harvest Price File -\d{8}\.(xls|xlsx)", re.IGNORECASE): IngestionMapping(
-        parser=src.parsers.extract_accounting_navs,
+        parser="src.parsers.extract_accounting_navs",
         bronze_table="accounting_nav_records",
+        partition_by=PartitionSpec("record_month", "Date:", datetime_format="%m/%d/%Y"),
         silver_mapping=SilverMapping(
             silver_table_name="accounting_nav_records",
             table_type="fact",
+            partition_by=PartitionSpec("record_month", "record_date"),
             primary_keys=("record_date", "ss_id", "fund_name"),
             columns={
                 "Fund ID": ColumnMapping(str, "ss_id"),
@@ -403,13 +517,16 @@ INGESTION_MAPPINGS = {
         ),
     ),
     re.compile(r"Accounting_Cash_Statement\.csv", re.IGNORECASE): IngestionMapping(
-        parser=partial(pd.read_csv, na_values="", keep_default_na=False),
+        parser="pandas.read_csv",
+        parser_kwargs={"na_values": "", "keep_default_na": False},
         rename=True,
         load_type="overwrite",
         bronze_table="accounting_cash_statements",
+        partition_by=PartitionSpec("record_month", "Report Date", datetime_format="%m/%d/%Y"),
         silver_mapping=SilverMapping(
             silver_table_name="accounting_cash_statements",
             table_type="fact",
+            partition_by=PartitionSpec("record_month", "record_date"),
             primary_keys=("record_date", "ss_id",
                           "cash_post_description", "cusip_id"),
             columns={
@@ -428,13 +545,16 @@ INGESTION_MAPPINGS = {
         ),
     ),
     re.compile(r"All_Corporate_Actions\.csv", re.IGNORECASE): IngestionMapping(
-        parser=partial(pd.read_csv, na_values="", keep_default_na=False),
+        parser="pandas.read_csv",
+        parser_kwargs={"na_values": "", "keep_default_na": False},
         rename=True,
         load_type="overwrite",
         bronze_table="all_corporate_actions",
+        partition_by=PartitionSpec("notification_month", "Notification Delivery Date", datetime_format="%Y-%m-%d"),
         silver_mapping=SilverMapping(
             silver_table_name="all_corporate_actions",
             table_type="fact",
+            partition_by=PartitionSpec("notification_month", "notification_date"),
             primary_keys=("notification_date", "ss_id", "event_id"),
             columns={
                 "Fund Number": ColumnMapping(str, "ss_id"),
@@ -454,13 +574,16 @@ INGESTION_MAPPINGS = {
         ),
     ),
     re.compile(r"Cash_Forecast_Transactions\.csv", re.IGNORECASE): IngestionMapping(
-        parser=partial(pd.read_csv, na_values="", keep_default_na=False),
+        parser="pandas.read_csv",
+        parser_kwargs={"na_values": "", "keep_default_na": False},
         rename=True,
         load_type="overwrite",
         bronze_table="cash_forecast_transactions",
+        partition_by=PartitionSpec("record_month", "Mainframe Time Stamp", datetime_format="%d %b %Y %H:%M:%S"),
         silver_mapping=SilverMapping(
             silver_table_name="cash_forecast_transactions",
             table_type="fact",
+            partition_by=PartitionSpec("record_month", "record_datetime"),
             primary_keys=("record_datetime", "ss_id", "isin_id"),
             columns={
                 "Mainframe Time Stamp": ColumnMapping(datetime, "record_datetime", "%d %b %Y %H:%M:%S"),
@@ -476,7 +599,9 @@ INGESTION_MAPPINGS = {
         ),
     ),
     re.compile(r"Custody_Positions\.csv", re.IGNORECASE): IngestionMapping(
-        parser=partial(pd.read_csv, na_values="", keep_default_na=False),
+        parser="pandas.read_csv",
+        parser_kwargs={"na_values": "", "keep_default_na": False},
+        remote_stream=True,
         rename=True,
         bronze_table="custody_positions",
         silver_mapping=SilverMapping(
@@ -499,13 +624,17 @@ INGESTION_MAPPINGS = {
         ),
     ),
     re.compile(r"Custody_Transactions\.csv", re.IGNORECASE): IngestionMapping(
-        parser=partial(pd.read_csv, na_values="", keep_default_na=False),
+        parser="pandas.read_csv",
+        parser_kwargs={"na_values": "", "keep_default_na": False},
+        remote_stream=True,
         rename=True,
         load_type="overwrite",
         bronze_table="custody_transactions",
+        partition_by=PartitionSpec("record_month", "Mainframe Time Stamp", datetime_format="%d %b %Y %H:%M:%S"),
         silver_mapping=SilverMapping(
             silver_table_name="custody_transactions",
             table_type="fact",
+            partition_by=PartitionSpec("record_month", "record_datetime"),
             primary_keys=("record_datetime", "ss_id", "ss_trade_id"),
             columns={
                 "Fund": ColumnMapping(str, "ss_id"),
@@ -525,12 +654,15 @@ INGESTION_MAPPINGS = {
         ),
     ),
     re.compile(r"Daily_Model_Holdings\.csv", re.IGNORECASE): IngestionMapping(
-        parser=partial(pd.read_csv, na_values="", keep_default_na=False),
+        parser="pandas.read_csv",
+        parser_kwargs={"na_values": "", "keep_default_na": False},
         rename=True,
         bronze_table="daily_model_holdings",
+        partition_by=PartitionSpec("record_month", "Period End Date", datetime_format="%m/%d/%Y"),
         silver_mapping=SilverMapping(
             silver_table_name="daily_model_holdings",
             table_type="fact",
+            partition_by=PartitionSpec("record_month", "record_date"),
             primary_keys=("record_date", "ss_id", "security_name"),
             columns={
                 "Period End Date": ColumnMapping(datetime, "record_date", "%m/%d/%Y"),
@@ -566,12 +698,15 @@ INGESTION_MAPPINGS = {
         ),
     ),
     re.compile(r"Daily_Net_Asset_Values\.csv", re.IGNORECASE): IngestionMapping(
-        parser=partial(pd.read_csv, na_values="", keep_default_na=False),
+        parser="pandas.read_csv",
+        parser_kwargs={"na_values": "", "keep_default_na": False},
         rename=True,
         bronze_table="daily_net_asset_values",
+        partition_by=PartitionSpec("record_month", "Price Date", datetime_format="%m/%d/%Y"),
         silver_mapping=SilverMapping(
             silver_table_name="daily_net_asset_values",
             table_type="fact",
+            partition_by=PartitionSpec("record_month", "record_date"),
             primary_keys=("record_date", "ss_id", "fund_class"),
             columns={
                 "Price Date": ColumnMapping(datetime, "record_date", "%m/%d/%Y"),
@@ -586,12 +721,15 @@ INGESTION_MAPPINGS = {
         ),
     ),
     re.compile(r"Distribution_Liability\.CSV", re.IGNORECASE): IngestionMapping(
-        parser=partial(pd.read_csv, na_values="", keep_default_na=False),
+        parser="pandas.read_csv",
+        parser_kwargs={"na_values": "", "keep_default_na": False},
         rename=True,
         bronze_table="distribution_liabilities",
+        partition_by=PartitionSpec("record_month", "Period End Date", datetime_format="%m/%d/%Y"),
         silver_mapping=SilverMapping(
             silver_table_name="distribution_liabilities",
             table_type="fact",
+            partition_by=PartitionSpec("record_month", "record_date"),
             primary_keys=("record_date", "ss_id", "gl_account_number"),
             columns={
                 "Period End Date": ColumnMapping(datetime, "record_date", "%m/%d/%Y"),
@@ -602,12 +740,15 @@ INGESTION_MAPPINGS = {
         ),
     ),
     re.compile(r"Loan_Balances\.csv", re.IGNORECASE): IngestionMapping(
-        parser=partial(pd.read_csv, na_values="", keep_default_na=False),
+        parser="pandas.read_csv",
+        parser_kwargs={"na_values": "", "keep_default_na": False},
         rename=True,
         bronze_table="loan_balances",
+        partition_by=PartitionSpec("record_month", "Period End Date", datetime_format="%m/%d/%Y"),
         silver_mapping=SilverMapping(
             silver_table_name="loan_balances",
             table_type="fact",
+            partition_by=PartitionSpec("record_month", "record_date"),
             primary_keys=("record_date", "ss_id", "gl_account_number"),
             columns={
                 "Period End Date": ColumnMapping(datetime, "record_date", "%m/%d/%Y"),
@@ -620,12 +761,15 @@ INGESTION_MAPPINGS = {
         ),
     ),
     re.compile(r"Opening_Cash_Balances\.csv", re.IGNORECASE): IngestionMapping(
-        parser=partial(pd.read_csv, na_values="", keep_default_na=False),
+        parser="pandas.read_csv",
+        parser_kwargs={"na_values": "", "keep_default_na": False},
         rename=True,
         bronze_table="opening_cash_balances",
+        partition_by=PartitionSpec("record_month", "As of Date", datetime_format="%d %b %Y"),
         silver_mapping=SilverMapping(
             silver_table_name="opening_cash_balances",
             table_type="fact",
+            partition_by=PartitionSpec("record_month", "record_date"),
             primary_keys=("record_date", "ss_id"),
             columns={
                 "As of Date": ColumnMapping(datetime, "record_date", "%d %b %Y"),
@@ -635,12 +779,15 @@ INGESTION_MAPPINGS = {
         ),
     ),
     re.compile(r"Pending_FX_Accounting\.csv", re.IGNORECASE): IngestionMapping(
-        parser=partial(pd.read_csv, na_values="", keep_default_na=False),
+        parser="pandas.read_csv",
+        parser_kwargs={"na_values": "", "keep_default_na": False},
         rename=True,
         bronze_table="pending_fx_accounting_records",
+        partition_by=PartitionSpec("record_month", "Period End Date", datetime_format="%m/%d/%Y"),
         silver_mapping=SilverMapping(
             silver_table_name="pending_fx_accounting_records",
             table_type="fact",
+            partition_by=PartitionSpec("record_month", "record_date"),
             primary_keys=("record_date", "ss_id", "trade_id"),
             columns={
                 "Period End Date": ColumnMapping(datetime, "record_date", "%m/%d/%Y"),
@@ -657,12 +804,15 @@ INGESTION_MAPPINGS = {
         ),
     ),
     re.compile(r"Top10_FX_Pending\.csv", re.IGNORECASE): IngestionMapping(
-        parser=partial(pd.read_csv, na_values="", keep_default_na=False),
+        parser="pandas.read_csv",
+        parser_kwargs={"na_values": "", "keep_default_na": False},
         rename=True,
         bronze_table="top10_fx_pending_records",
+        partition_by=PartitionSpec("record_month", "Accounting Period End Date", datetime_format="%m/%d/%Y"),
         silver_mapping=SilverMapping(
             silver_table_name="top10_fx_pending_records",
             table_type="fact",
+            partition_by=PartitionSpec("record_month", "record_date"),
             primary_keys=("record_date", "ss_id", "trade_id"),
             columns={
                 "Accounting Period End Date": ColumnMapping(datetime, "record_date", "%m/%d/%Y"),
@@ -679,12 +829,15 @@ INGESTION_MAPPINGS = {
         )
     ),
     re.compile(r"Top10_Net_Asset_Value\.csv", re.IGNORECASE): IngestionMapping(
-        parser=partial(pd.read_csv, na_values="", keep_default_na=False),
+        parser="pandas.read_csv",
+        parser_kwargs={"na_values": "", "keep_default_na": False},
         rename=True,
         bronze_table="top10_net_asset_values",
+        partition_by=PartitionSpec("record_month", "Price Date", datetime_format="%m/%d/%Y"),
         silver_mapping=SilverMapping(
             silver_table_name="top10_net_asset_values",
             table_type="fact",
+            partition_by=PartitionSpec("record_month", "record_date"),
             primary_keys=("record_date", "ss_id", "dual_pricing_basis"),
             columns={
                 "Price Date": ColumnMapping(datetime, "record_date", "%m/%d/%Y"),
@@ -697,11 +850,14 @@ INGESTION_MAPPINGS = {
         )
     ),
     re.compile(r"Harvest_UCF", re.IGNORECASE): IngestionMapping(
-        parser=src.parsers.extract_ucf,
+        parser="src.parsers.extract_ucf",
+        stream_parser="src.parsers.iter_ucf_blocks",
         bronze_table="ucf_records",
+        partition_by=PartitionSpec("trade_month", "TRADE_DATE", datetime_format="%Y%m%d"),
         silver_mapping=SilverMapping(
             silver_table_name="ucf_records",
             table_type="fact",
+            partition_by=PartitionSpec("trade_month", "trade_date"),
             primary_keys=("trade_date", "fund_ticker",
                           "description", "ticker"),
             columns={
@@ -739,8 +895,8 @@ INGESTION_MAPPINGS = {
         )
     ),
     re.compile(r"FPTRAD_report\.csv", re.IGNORECASE): IngestionMapping(
-        parser=partial(pd.read_csv, na_values="",
-                       keep_default_na=False, on_bad_lines="skip"),
+        parser="pandas.read_csv",
+        parser_kwargs={"na_values": "", "keep_default_na": False, "on_bad_lines": "skip"},
         rename=True,
         bronze_table="daily_net_sales",
         silver_mapping=SilverMapping(
@@ -761,7 +917,8 @@ INGESTION_MAPPINGS = {
     ),
     # Reference Data (exact match patterns)
     re.compile(r"^securities\.csv$", re.IGNORECASE): IngestionMapping(
-        parser=partial(pd.read_csv, na_values="", keep_default_na=False),
+        parser="pandas.read_csv",
+        parser_kwargs={"na_values": "", "keep_default_na": False},
         rename=True,
         bronze_table="all_securities",
         silver_mapping=SilverMapping(
@@ -779,7 +936,8 @@ INGESTION_MAPPINGS = {
         )
     ),
     re.compile(r"^exchanges\.csv$", re.IGNORECASE): IngestionMapping(
-        parser=partial(pd.read_csv, na_values="", keep_default_na=False),
+        parser="pandas.read_csv",
+        parser_kwargs={"na_values": "", "keep_default_na": False},
         rename=True,
         bronze_table="all_exchanges_codes",
         silver_mapping=SilverMapping(
@@ -794,11 +952,14 @@ INGESTION_MAPPINGS = {
     ),
     # CDS Monthly Participant Reports
     re.compile(r"Harvest Canadian ETF\.xlsx", re.IGNORECASE): IngestionMapping(
-        parser=partial(pd.read_excel, sheet_name="Harvest Canadian ETF"),
+        parser="pandas.read_excel",
+        parser_kwargs={"sheet_name": "Harvest Canadian ETF"},
         bronze_table="cds_monthly_participant_reports",
+        partition_by=PartitionSpec("report_month", "Date", datetime_format="%m/%d/%Y"),
         silver_mapping=SilverMapping(
             silver_table_name="cds_monthly_participant_reports",
             table_type="fact",
+            partition_by=PartitionSpec("report_month", "report_date"),
             primary_keys=("report_date", "isin_id", "cuid_id"),
             columns={
                 "Shares": ColumnMapping(int, "quantity_held"),
@@ -809,7 +970,8 @@ INGESTION_MAPPINGS = {
         ),
     ),
     re.compile(r"harvest_fund_identifiers\.csv", re.IGNORECASE): IngestionMapping(
-        parser=partial(pd.read_csv, na_values="", keep_default_na=False),
+        parser="pandas.read_csv",
+        parser_kwargs={"na_values": "", "keep_default_na": False},
         rename=True,
         bronze_table="harvest_fund_identifiers",
         silver_mapping=SilverMapping(
@@ -823,12 +985,15 @@ INGESTION_MAPPINGS = {
         ),
     ),
     re.compile(r"history_all_distributions\.csv", re.IGNORECASE): IngestionMapping(
-        parser=partial(pd.read_csv, na_values="", keep_default_na=False),
+        parser="pandas.read_csv",
+        parser_kwargs={"na_values": "", "keep_default_na": False},
         rename=True,
         bronze_table="bbg_history_all_distributions",
+        partition_by=PartitionSpec("ex_month", "Ex-Date", datetime_format="%Y-%m-%d"),
         silver_mapping=SilverMapping(
             silver_table_name="bbg_history_all_distributions",
             table_type="fact",
+            partition_by=PartitionSpec("ex_month", "ex_date"),
             primary_keys=("ex_date", "ticker"),
             columns={
                 "Declared Date": ColumnMapping(datetime, "declared_date", "%Y-%m-%d"),
@@ -840,17 +1005,18 @@ INGESTION_MAPPINGS = {
         ),
     ),
     re.compile(r"bbg_history_all_funds_monthly_navs\.csv", re.IGNORECASE): IngestionMapping(
-        parser=partial(pd.read_csv, na_values="", keep_default_na=False),
+        parser="pandas.read_csv",
+        parser_kwargs={"na_values": "", "keep_default_na": False},
         rename=True,
         bronze_table="bbg_history_all_funds_monthly_navs",
     ),
     # NBF Wealth Changes - matches Harvest_YYYY-MM-DD.xlsx or Harvest_YYYY_MM_DD.xlsx
     re.compile(r"Harvest_\d{4}[-_]\d{2}[-_]\d{2}\.xlsx", re.IGNORECASE): IngestionMapping(
-        parser=src.parsers.extract_nbf_sales_qq,
+        parser="src.parsers.extract_nbf_sales_qq",
         bronze_table="nbf_wealth_changes_qq",
     ),
     re.compile(r"BMO_Q\d{1}_\d{4}\.xlsx", re.IGNORECASE): IngestionMapping(
-        parser=src.parsers.extract_bmo_sales_qq,
+        parser="src.parsers.extract_bmo_sales_qq",
         bronze_table="bmo_wealth_changes_qq",
         silver_mapping=SilverMapping(
             silver_table_name="bmo_wealth_changes_qq",
@@ -859,7 +1025,8 @@ INGESTION_MAPPINGS = {
         )
     ),
     re.compile(r"Branch_Mapping\.csv", re.IGNORECASE): IngestionMapping(
-        parser=partial(pd.read_csv, na_values="", keep_default_na=False),
+        parser="pandas.read_csv",
+        parser_kwargs={"na_values": "", "keep_default_na": False},
         bronze_table="branch_mappings",
         silver_mapping=SilverMapping(
             silver_table_name="ref_branch_mappings",
@@ -874,3 +1041,43 @@ INGESTION_MAPPINGS = {
         ),
     ),
 }
+
+# Real file names as delivered, at least one per INGESTION_MAPPINGS pattern. MappingIndex
+# checks them against every pattern at startup to find patterns that take each other's files.
+SAMPLE_FILE_NAMES = [
+    "Harvest_INAVBSKT_ALL.20260224.csv",
+    "Harvest_BSKT_ALL.20260224.csv",
+    "All_Positions20260224.csv",
+    "PLF_Positions20260224.csv",
+    "Harvest_CIL_ALL.20260224.csv",
+    "Harvest_CIL_ALL.20260224.txt",
+    "Harvest_INKIND.20260224.txt",
+    "Harvest_NAV_ALL.20260224.csv",
+    "Harvest_Preburst_INKIND_ALL.20260224.txt",
+    "Harvest Price File -20260224.xls",
+    "Harvest Price File -20260224.xlsx",
+    "Accounting_Cash_Statement.csv",
+    "All_Corporate_Actions.csv",
+    "Cash_Forecast_Transactions.csv",
+    "Custody_Positions.csv",
+    "Custody_Transactions.csv",
+    "Daily_Model_Holdings.csv",
+    "Daily_Net_Asset_Values.csv",
+    "Distribution_Liability.CSV",
+    "Loan_Balances.csv",
+    "Opening_Cash_Balances.csv",
+    "Pending_FX_Accounting.csv",
+    "Top10_FX_Pending.csv",
+    "Top10_Net_Asset_Value.csv",
+    "Harvest_UCF_ALL.20260224.csv",
+    "FPTRAD_report.csv",
+    "securities.csv",
+    "exchanges.csv",
+    "Harvest Canadian ETF.xlsx",
+    "harvest_fund_identifiers.csv",
+    "history_all_distributions.csv",
+    "bbg_history_all_funds_monthly_navs.csv",
+    "Harvest_2026-02-24.xlsx",
+    "BMO_Q1_2026.xlsx",
+    "Branch_Mapping.csv",
+]
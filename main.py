@@ -3,29 +3,235 @@ Main entry point: Configure and run the ingestion pipeline.
 Orchestrates file discovery, parsing, and loading to Bronze layer.
 Silver transformations applied directly to the parsed DataFrame.
 """
+from collections import defaultdict
+from contextvars import copy_context
 from datetime import datetime
+from itertools import chain
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional
 from uuid import uuid4
-import re
-import pandas as pd
-import duckdb
-import deltalake
-
-from src.deltalake_writer import ingest_into_bronze, upsert_silver
-from src.cleaner import clean_and_cast
+from zoneinfo import ZoneInfo
+import threading
+
+# pandas, pyarrow, polars, deltalake and duckdb (via src.deltalake_writer, src.cleaner and
+# src.maintenance) are imported inside the functions that use them, so a run that finds an
+# empty inbox starts in a fraction of the time. tests/test_startup.py holds the budget.
+from src.ledger import IngestionLedger, fingerprint_hash
+from src.mapping_index import MappingIndex
+from src.utils.instrumentation import adopt, collected, recording, span, traced
 from src.utils.logger import get_logger
-from config import INBOX_DIR, PROCESSED_DIR, FAILED_DIR, BRONZE_DIR, SILVER_DIR, INGESTION_MAPPINGS
+from config import INBOX_DIR, PROCESSED_DIR, FAILED_DIR, BRONZE_DIR, SILVER_DIR, LEDGER_FILE, RUN_METRICS_TABLE, \
+    INGESTION_MAPPINGS, CLEAN_ENGINE, \
+    CLEAN_DIAGNOSTICS, COMPACT_TARGET_SIZE, COMPACT_SMALL_FILE_SIZE, COMPACT_MIN_SMALL_FILES, \
+    CHECKPOINT_INTERVAL, VACUUM_RETENTION_HOURS, WATCH_SETTLE_SECONDS, WATCH_POLL_INTERVAL, \
+    WATCH_MAX_BATCH_FILES, MFT_REMOTE_FOLDER, SAMPLE_FILE_NAMES
 
 logger = get_logger(__name__)
 
 
-def main() -> None:
-    """Run ETL pipeline: discover files, parse, ingest to bronze, then transform to silver."""
+def main(full_refresh: bool = False, workers: int = 1, reingest: bool = False) -> None:
+    """
+    Run ETL pipeline: discover files, parse, ingest to bronze, then transform to silver.
+
+    Files for the same append-mode bronze table are coalesced into one batch:
+    one bronze commit and one silver upsert per table instead of per file.
+    Files whose content was already ingested into the same bronze table (see
+    src.ledger) are skipped before parsing and moved to processed. Stage
+    timings of the run are appended to RUN_METRICS_TABLE.
+
+    Args:
+        full_refresh: Re-read full bronze tables for silver instead of only new rows.
+        workers: Number of parallel workers. 1 processes files one at a time;
+                 more parses files in a process pool and writes different
+                 bronze tables concurrently.
+        reingest: Ingest files even if the ledger has seen their content.
+    """
     batch_id = f"{uuid4()}"
+    files = [file_path for file_path in INBOX_DIR.iterdir() if file_path.is_file()]
+    if not files:
+        logger.info("Inbox is empty | batch=%s | inbox=%s", batch_id, INBOX_DIR)
+        return
+    with recording(batch_id, "main", RUN_METRICS_TABLE), span("run"), \
+            IngestionLedger(LEDGER_FILE) as ledger:
+        jobs = _collect_inbox(batch_id, ledger, reingest, files=files)
+        _run_jobs(jobs, batch_id, full_refresh, workers, ledger)
+
+
+def watch(full_refresh: bool = False, workers: int = 1, reingest: bool = False,
+          settle_seconds: float = WATCH_SETTLE_SECONDS, poll_interval: float = WATCH_POLL_INTERVAL,
+          max_batch_files: int = WATCH_MAX_BATCH_FILES) -> None:
+    """
+    Long-running pipeline: ingest inbox files as they arrive, until interrupted.
+
+    Files are picked up by src.inbox_watcher.InboxWatcher once stable and
+    sent through the same mapping/parse/ingest path as main(), one
+    micro-batch (with its own batch_id) per wake-up. The process keeps its
+    imports, the ingestion ledger connection and open Delta table handles
+    (deltalake_writer.open_table) between batches. A failing micro-batch is
+    logged and the watch goes on.
+
+    Args:
+        full_refresh: Re-read full bronze tables for silver instead of only new rows.
+        workers: Parallel workers per micro-batch, as for main().
+        reingest: Ingest files even if the ledger has seen their content.
+        settle_seconds: Seconds a file's size and mtime must stay unchanged.
+        poll_interval: Seconds between inbox rescans without a notification.
+        max_batch_files: Most files taken into one micro-batch.
+    """
+    from src.inbox_watcher import InboxWatcher
+
+    with IngestionLedger(LEDGER_FILE) as ledger, \
+            InboxWatcher(INBOX_DIR, settle_seconds, poll_interval) as watcher:
+        while True:
+            files = watcher.next_batch(max_files=max_batch_files)
+            batch_id = f"{uuid4()}"
+            try:
+                with recording(batch_id, "watch", RUN_METRICS_TABLE), span("run"):
+                    jobs = _collect_inbox(batch_id, ledger, reingest, files=files)
+                    _run_jobs(jobs, batch_id, full_refresh, workers, ledger)
+            except Exception as e:
+                logger.error("Watch batch failed | batch_id=%s | files=%s | error=%s",
+                             batch_id, [p.name for p in files], str(e), exc_info=True)
+                # Files left claimed but unrecorded can be dropped in again
+                ledger.release(files)
+
+
+def ingest_from_mft(remote_folder: str = MFT_REMOTE_FOLDER, full_refresh: bool = False) -> None:
+    """
+    Ingest new or restated files of an MFT folder into bronze without going through the inbox.
+
+    Files are picked as in StateStreetMFTClient.sync (against the MFT
+    manifest). For mappings with remote_stream the download stream goes
+    straight into the parser while an archive copy is written to
+    RAW_DATA_DIR as the bytes pass, hashed for the ingestion ledger on the
+    way; other files (and files large enough to be streamed into bronze block
+    by block) are downloaded to RAW_DATA_DIR first and parsed from there.
+    Either way the archive is checked against the listed size and checksum
+    and claimed in the ledger before anything is written to bronze: a payload
+    already ingested into the same table is skipped. A streamed file whose
+    size the table has seen before may be such a duplicate, so it is only
+    archived while streaming, and parsed from the archive if it turns out
+    to be new. Files are ingested one at a time; each touched silver
+    table is then updated once. A file is marked synced (and recorded in the
+    ledger) only once its bronze write succeeds or it is skipped as a
+    duplicate, so failures are picked up by the next run.
+
+    Args:
+        remote_folder: MFT folder to ingest.
+        full_refresh: Re-read full bronze tables for silver instead of only new rows.
+    """
+    from src.services.statestreet_mft_client import StateStreetMFTClient, listed_checksum, listed_size
+
+    batch_id = f"{uuid4()}"
+    with recording(batch_id, "mft", RUN_METRICS_TABLE), span("run"), \
+            StateStreetMFTClient() as client, IngestionLedger(LEDGER_FILE) as ledger:
+        synced, silver = [], {}
+        for entry in client.changes(remote_folder):
+            remote_path = f"{remote_folder.rstrip('/')}/{entry['filename']}"
+            mapping = _get_mapping(entry["filename"])
+            if not mapping:
+                logger.warning("No mapping found | batch=%s | file=%s", batch_id, entry["filename"])
+                continue
+            mapping = mapping.for_file(listed_size(entry))
+            file_name = _timestamped_name(entry["filename"]) if mapping.rename else entry["filename"]
+            archive_path = client.download_dir / file_name
+            size = listed_size(entry)
+            try:
+                fingerprint, parsed = None, None
+                if mapping.remote_stream and not mapping.stream:
+                    # Hashed for the ledger as the bytes pass. Only a payload of a size the table
+                    # has seen can be a duplicate: that one is streamed to the archive unparsed.
+                    digest = fingerprint_hash()
+                    with client.open_stream(remote_path, archive_path, size, listed_checksum(entry),
+                                            fingerprint=digest) as stream:
+                        if size is not None and not ledger.has_size(size, mapping.bronze_table):
+                            parsed = _parse_file(stream, mapping, file_name)
+                    # The archive is verified and renamed into place once the block has exited
+                    fingerprint = (digest.hexdigest(), archive_path.stat().st_size)
+                else:
+                    client.download(remote_path, file_name, expected_size=size,
+                                    checksum=listed_checksum(entry))
+
+                previous = ledger.claim(archive_path, mapping.bronze_table, fingerprint)
+                if previous is not None:
+                    logger.info(
+                        "Skipping already-ingested file | batch=%s | file=%s | table=%s | "
+                        "first_file=%s | first_batch=%s",
+                        batch_id, file_name, mapping.bronze_table,
+                        previous["file_name"], previous["batch_id"] or batch_id)
+                    ledger.release([archive_path])
+                    synced.append(entry)
+                    continue
+
+                if parsed is None:
+                    parsed = _parse_file(archive_path, mapping)
+                _write_bronze(mapping, [(archive_path, parsed)], batch_id)
+            except Exception as e:
+                logger.error("Bronze ingestion failed | batch_id=%s | file=%s | error=%s",
+                             batch_id, remote_path, str(e))
+                ledger.release([archive_path])
+                continue
+
+            ledger.record([archive_path], batch_id)
+            synced.append(entry)
+            if mapping.silver_mapping:
+                silver[mapping.bronze_table] = mapping.silver_mapping
+        client.mark_synced(remote_folder, synced)
+
+        for bronze_table, silver_mapping in silver.items():
+            try:
+                _bronze_to_silver(bronze_table, silver_mapping, full_refresh)
+            except Exception as e:
+                logger.error("Silver upsert failed | table=%s | error=%s", bronze_table, str(e), exc_info=True)
+        logger.info("MFT ingestion complete | batch_id=%s | folder=%s | files=%d | tables=%d",
+                    batch_id, remote_folder, len(synced), len(silver))
+
+
+def _run_jobs(jobs: list[tuple[Path, object]], batch_id: str, full_refresh: bool, workers: int,
+              ledger: Optional[IngestionLedger] = None) -> None:
+    """Plan collected jobs into batches, then parse and ingest them, serially or concurrently."""
+    batches = _plan_batches(jobs)
 
-    # 1) Bronze ingestion
-    for file_path in INBOX_DIR.iterdir():
+    if workers > 1 and len(jobs) > 1:
+        _run_concurrent(batches, batch_id, full_refresh, workers, ledger)
+        return
+
+    for batch in batches:
+        parsed = []
+        for file_path, mapping in batch:
+            try:
+                parsed.append((file_path, _parse_file(file_path, mapping)))
+            except Exception as e:
+                logger.error("Bronze ingestion failed | batch_id=%s | file=%s | error=%s",
+                             batch_id, file_path.name, str(e))
+                if ledger is not None:
+                    ledger.release([file_path])
+                _move_to_failed(file_path)
+        if parsed:
+            _ingest_batch(batch[0][1], parsed, batch_id, full_refresh, ledger)
+
+
+def _collect_inbox(batch_id: str, ledger: Optional[IngestionLedger] = None,
+                   reingest: bool = False, files: Optional[Iterable[Path]] = None) -> list[tuple[Path, object]]:
+    """
+    Match inbox files to their IngestionMapping.
+
+    Unmapped files are moved to failed; files whose mapping asks for it are
+    renamed with a timestamp. With a ledger, every file is claimed by content
+    hash, and files already ingested into the same bronze table (in an
+    earlier run, or earlier in this inbox) are moved to processed unparsed.
+
+    Args:
+        batch_id: Unique identifier for this ingestion run.
+        ledger: IngestionLedger to check and claim files in.
+        reingest: Keep files the ledger has already seen.
+        files: Inbox files to collect (default: everything in INBOX_DIR).
+
+    Returns:
+        List of (file_path, mapping) to ingest.
+    """
+    jobs = []
+    for file_path in INBOX_DIR.iterdir() if files is None else files:
         if not file_path.is_file():
             continue
 
@@ -37,81 +243,242 @@ def main() -> None:
             continue
 
         if mapping.rename:
-            new_name = f"{file_path.stem}_{datetime.now().strftime('%Y%m%d_%H%M')}{file_path.suffix}"
-            new_path = file_path.parent / new_name
+            new_path = file_path.parent / _timestamped_name(file_path.name)
             file_path.rename(new_path)
             file_path = new_path
+        mapping = mapping.for_file(file_path.stat().st_size)
+
+        if ledger is not None:
+            previous = ledger.claim(file_path, mapping.bronze_table)
+            if previous is not None and not reingest:
+                logger.info(
+                    "Skipping already-ingested file | batch=%s | file=%s | table=%s | "
+                    "first_file=%s | first_batch=%s",
+                    batch_id, file_path.name, mapping.bronze_table,
+                    previous["file_name"], previous["batch_id"] or batch_id)
+                ledger.release([file_path])
+                _move_to_processed(file_path)
+                continue
+
+        jobs.append((file_path, mapping))
+    return jobs
+
+
+def _timestamped_name(file_name: str) -> str:
+    """File name with the current time appended, for mappings with rename=True."""
+    file_path = Path(file_name)
+    return f"{file_path.stem}_{datetime.now().strftime('%Y%m%d_%H%M')}{file_path.suffix}"
+
+
+def _plan_batches(jobs: list[tuple[Path, object]]) -> list[list[tuple[Path, object]]]:
+    """
+    Group inbox jobs into write batches.
+
+    Append-mode files are grouped by bronze_table (and whether they are
+    streamed) so a backfill of many files becomes a single commit.
+    Overwrite-mode files stay one batch per file, since each is a full
+    snapshot that silver must see in turn.
+    """
+    batches = []
+    append_batches = {}
+    for file_path, mapping in jobs:
+        key = (mapping.bronze_table, mapping.stream)
+        if mapping.load_type != "append":
+            batches.append([(file_path, mapping)])
+        elif key in append_batches:
+            append_batches[key].append((file_path, mapping))
+        else:
+            append_batches[key] = [(file_path, mapping)]
+            batches.append(append_batches[key])
+    return batches
+
+
+def _ingest_batch(mapping, parsed: list[tuple[Path, object]], batch_id: str, full_refresh: bool = False,
+                  ledger: Optional[IngestionLedger] = None) -> None:
+    """
+    Write parsed files for one bronze table as a single commit, run the silver
+    step once, then move the files.
+
+    With several files, each row is tagged with its own source_file before the
+    frames are concatenated. Streaming mappings pass their block iterators
+    straight to the bronze writer instead, so parse errors surface here and
+    fail the whole batch. Files go to processed once bronze succeeds (even if
+    the silver upsert fails), otherwise to failed.
+
+    Args:
+        mapping: IngestionMapping shared by all files in the batch.
+        parsed: List of (file_path, parsed DataFrame or block iterator).
+        batch_id: Unique identifier for this ingestion run.
+        full_refresh: Re-read the full bronze table for silver.
+        ledger: IngestionLedger to record the files in once bronze succeeds.
+    """
+    file_paths = [file_path for file_path, _ in parsed]
+    try:
+        # 1) Bronze ingestion
+        _write_bronze(mapping, parsed, batch_id)
+    except Exception as e:
+        logger.error("Bronze ingestion failed | batch_id=%s | files=%s | error=%s",
+                     batch_id, [p.name for p in file_paths], str(e))
+        if ledger is not None:
+            ledger.release(file_paths)
+        for file_path in file_paths:
+            _move_to_failed(file_path)
+        return
+
+    if ledger is not None:
+        ledger.record(file_paths, batch_id)
 
+    # 2) Silver transformation: only if bronze ingestion succeeded
+    if mapping.silver_mapping:
         try:
-            parsed_df = _parse_file(file_path, mapping)
-            target_path = BRONZE_DIR / mapping.bronze_table
-            ingest_into_bronze(
-                df=parsed_df,
-                source_name=file_path.name,
-                target_path=target_path,
-                batch_id=batch_id,
-                current_time=pd.Timestamp.now(tz="America/New_York"),
-                write_mode=mapping.load_type
+            _bronze_to_silver(mapping.bronze_table,
+                              mapping.silver_mapping, full_refresh)
+        except Exception as e:
+            logger.error(
+                "Silver upsert failed | table=%s | error=%s",
+                mapping.bronze_table, str(e), exc_info=True
             )
 
-            bronze_ingestion_successful = True
-
-            # 2) Silver transformation: only if bronze ingestion succeeded
-            if bronze_ingestion_successful and mapping.silver_mapping:
-                try:
-                    # TEMPORARY: When load_type="append", read full bronze table
-                    # When load_type="overwrite", use only parsed_df
-                    if mapping.load_type == "append":
-                        bronze_path = BRONZE_DIR / mapping.bronze_table
-                        delta_log = bronze_path / "_delta_log"
-                        if delta_log.exists():
-                            logger.info(
-                                "Reading full bronze table for append mode | table=%s", mapping.bronze_table)
-                            transform_df = deltalake.DeltaTable(
-                                str(bronze_path)).to_pandas()
-                        else:
-                            logger.info(
-                                "Bronze table not yet created, using parsed_df | table=%s", mapping.bronze_table)
-                            transform_df = parsed_df
-                    else:
-                        # overwrite mode: use only parsed_df (latest version)
-                        logger.info(
-                            "Using parsed_df for overwrite mode | table=%s", mapping.bronze_table)
-                        transform_df = parsed_df
-
-                    cleaned_df = clean_and_cast(
-                        transform_df, mapping.silver_mapping)
-                    silver_path = SILVER_DIR / mapping.silver_mapping.silver_table_name
-                    upsert_silver(
-                        cleaned_df=cleaned_df,
-                        silver_mapping=mapping.silver_mapping,
-                        silver_path=silver_path
-                    )
-                    logger.info(
-                        "Upserted to silver | table=%s | silver_table=%s | rows=%s",
-                        mapping.bronze_table, mapping.silver_mapping.silver_table_name, len(
-                            cleaned_df)
-                    )
-                except Exception as e:
-                    logger.error(
-                        "Silver upsert failed | table=%s | error=%s",
-                        mapping.bronze_table, str(e), exc_info=True
-                    )
-
-            # File successfully processed (even if silver upsert failed, bronze succeeded)
-            _move_to_processed(file_path)
+    # Files successfully processed (even if silver upsert failed, bronze succeeded)
+    for file_path in file_paths:
+        _move_to_processed(file_path)
 
-        except Exception as e:
-            logger.error("Bronze ingestion failed | batch_id=%s | file=%s | error=%s",
-                         batch_id, file_path.name, str(e))
-            _move_to_failed(file_path)
+
+def _write_bronze(mapping, parsed: list[tuple[Path, object]], batch_id: str) -> None:
+    """Write parsed files for one bronze table in one commit (block iterators are streamed)."""
+    import pandas as pd
+    from src.deltalake_writer import ingest_into_bronze
+
+    if mapping.stream:
+        _stream_batch(mapping, parsed, batch_id)
+        return
+    if len(parsed) == 1:
+        bronze_df, source_name = parsed[0][1], parsed[0][0].name
+    else:
+        bronze_df = _concat_with_source(parsed)
+        source_name = None
+        logger.info("Coalesced %s files into one bronze write | table=%s | files=%s",
+                    len(parsed), mapping.bronze_table, [p.name for p, _ in parsed])
+
+    ingest_into_bronze(
+        df=bronze_df,
+        source_name=source_name,
+        target_path=BRONZE_DIR / mapping.bronze_table,
+        batch_id=batch_id,
+        current_time=pd.Timestamp.now(tz="America/New_York"),
+        write_mode=mapping.load_type,
+        partition_by=mapping.partition_by
+    )
+
+
+def _concat_with_source(parsed: list[tuple[Path, object]]):
+    """Concatenate parsed files (DataFrames or Arrow tables), tagging each row with its source_file."""
+    import pandas as pd
+    import pyarrow as pa
+
+    if all(isinstance(data, pa.Table) for _, data in parsed):
+        return pa.concat_tables(
+            [data.append_column("source_file", pa.repeat(pa.scalar(file_path.name), data.num_rows))
+             for file_path, data in parsed],
+            promote_options="permissive")
+    return pd.concat(
+        [df.assign(source_file=file_path.name) for file_path, df in parsed],
+        ignore_index=True)
+
+
+def _stream_batch(mapping, parsed: list[tuple[Path, object]], batch_id: str) -> int:
+    """Write the block iterators of a streaming batch to bronze in one pass."""
+    import pandas as pd
+    from src.deltalake_writer import ingest_blocks_into_bronze
+
+    if len(parsed) == 1:
+        blocks, source_name = parsed[0][1], parsed[0][0].name
+    else:
+        blocks = chain.from_iterable(
+            (block.assign(source_file=file_path.name) for block in file_blocks)
+            for file_path, file_blocks in parsed)
+        source_name = None
+    return ingest_blocks_into_bronze(
+        blocks=blocks,
+        source_name=source_name,
+        target_path=BRONZE_DIR / mapping.bronze_table,
+        batch_id=batch_id,
+        current_time=pd.Timestamp.now(tz="America/New_York"),
+        write_mode=mapping.load_type,
+        partition_by=mapping.partition_by
+    )
+
+
+def _run_concurrent(batches: list, batch_id: str, full_refresh: bool, workers: int,
+                    ledger: Optional[IngestionLedger] = None) -> None:
+    """
+    Parse files in a process pool and write batches from a thread pool.
+
+    A batch is written once all of its files are parsed. Writes to different
+    bronze tables run in parallel; batches that target the same bronze table
+    (overwrite snapshots, and therefore the same silver table) are serialized
+    with a per-table lock, since Delta commits to one table must not race.
+    Streaming mappings are not sent to the process pool: their files are
+    parsed lazily by the writer thread as the blocks are written.
+    """
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+    table_locks = defaultdict(threading.Lock)
+
+    def write(mapping, parsed):
+        with table_locks[mapping.bronze_table]:
+            _ingest_batch(mapping, parsed, batch_id, full_refresh, ledger)
+
+    logger.info("Concurrent ingestion | batch=%s | batches=%s | workers=%s",
+                batch_id, len(batches), workers)
+    with ProcessPoolExecutor(max_workers=workers) as parse_pool, \
+            ThreadPoolExecutor(max_workers=workers) as write_pool:
+        parse_futures = {}
+        write_futures = []
+        for batch_index, batch in enumerate(batches):
+            mapping = batch[0][1]
+            if mapping.stream:
+                ready = [(file_path, _parse_file(file_path, mapping))
+                         for file_path, _ in batch]
+                write_futures.append(write_pool.submit(copy_context().run, write, mapping, ready))
+                continue
+            for position, (file_path, mapping) in enumerate(batch):
+                future = parse_pool.submit(collected, _parse_file, file_path, mapping)
+                parse_futures[future] = (batch_index, position, file_path)
+
+        pending = {i: len(batch) for i, batch in enumerate(batches)}
+        parsed = defaultdict(list)
+        for future in as_completed(parse_futures):
+            batch_index, position, file_path = parse_futures[future]
+            try:
+                df, spans = future.result()
+                adopt(spans)
+                parsed[batch_index].append((position, file_path, df))
+            except Exception as e:
+                logger.error("Bronze ingestion failed | batch_id=%s | file=%s | error=%s",
+                             batch_id, file_path.name, str(e))
+                if ledger is not None:
+                    ledger.release([file_path])
+                _move_to_failed(file_path)
+
+            pending[batch_index] -= 1
+            if pending[batch_index] == 0 and parsed[batch_index]:
+                # Keep inbox order within the batch regardless of parse completion order
+                mapping = batches[batch_index][0][1]
+                ready = [(file_path, df) for _, file_path, df
+                         in sorted(parsed.pop(batch_index), key=lambda item: item[0])]
+                write_futures.append(write_pool.submit(copy_context().run, write, mapping, ready))
+
+        for future in write_futures:
+            future.result()
 
 
 def _get_mapping(filename: str):
     """
     Find mapping for a given filename by pattern matching.
 
-    Supports regex patterns (re.Pattern).
+    Supports regex patterns (re.Pattern); the first pattern in
+    INGESTION_MAPPINGS order that matches wins (see src.mapping_index).
 
     Args:
         filename: Name of the file to match against patterns.
@@ -119,26 +486,40 @@ def _get_mapping(filename: str):
     Returns:
         IngestionMapping object if found, None otherwise.
     """
-    for pattern, mapping in INGESTION_MAPPINGS.items():
-        # Handle compiled regex patterns
-        if isinstance(pattern, re.Pattern):
-            if pattern.search(filename):
-                return mapping
-    return None
+    match = _mapping_index().match(filename)
+    return match.mapping if match else None
 
 
-def _parse_file(file_path: Path, mapping):
+_MAPPING_INDEX: Optional[MappingIndex] = None
+
+
+def _mapping_index() -> MappingIndex:
+    """MappingIndex over INGESTION_MAPPINGS, built on first use and kept for the process."""
+    global _MAPPING_INDEX
+    if _MAPPING_INDEX is None or _MAPPING_INDEX.mappings is not INGESTION_MAPPINGS:
+        _MAPPING_INDEX = MappingIndex(INGESTION_MAPPINGS, SAMPLE_FILE_NAMES)
+    return _MAPPING_INDEX
+
+
+def _parse_file(file_path: Path, mapping, file_name: Optional[str] = None):
     """
     Parse file using the specified parser from IngestionMapping.
 
     Args:
-        file_path: Path to the file to parse.
+        file_path: Path to the file to parse, or a binary stream for
+                   mappings with remote_stream.
         mapping: IngestionMapping with parser function.
+        file_name: Name of the file when file_path is a stream.
     """
+    file_name = file_name or file_path.name
     if not mapping.parser:
         raise ValueError(
-            f"Parser not defined in mapping for file {file_path.name}")
-    return mapping.parser(file_path)
+            f"Parser not defined in mapping for file {file_name}")
+    with span("parse", table_name=mapping.bronze_table, file_name=file_name) as s:
+        parsed = mapping.load_parser()(file_path)
+        # Streaming parsers return a lazy block iterator: their parse time lands in bronze_write
+        s.rows_out = len(parsed) if hasattr(parsed, "__len__") else None
+    return parsed
 
 
 def _move_to_processed(file_path: Path) -> None:
@@ -150,7 +531,7 @@ def _move_to_processed(file_path: Path) -> None:
     """
     PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
     # Organize processed files into year/month/day subdirectories
-    now = pd.Timestamp.now(tz="US/Eastern")
+    now = datetime.now(ZoneInfo("US/Eastern"))
     subdir = PROCESSED_DIR / f"{now.year}" / \
         f"{now.strftime('%B')}" / f"{now.day:02d}"
     subdir.mkdir(parents=True, exist_ok=True)
@@ -166,7 +547,7 @@ def _move_to_failed(file_path: Path) -> None:
         file_path: Path to the file to move.
     """
     FAILED_DIR.mkdir(parents=True, exist_ok=True)
-    now = pd.Timestamp.now(tz="US/Eastern")
+    now = datetime.now(ZoneInfo("US/Eastern"))
     # format month as name instead of number
     subdir = FAILED_DIR
     subdir.mkdir(parents=True, exist_ok=True)
@@ -174,14 +555,66 @@ def _move_to_failed(file_path: Path) -> None:
     file_path.rename(new_path)
 
 
-def process_bronze_to_silver() -> None:
+@traced("silver", table_name=lambda a: a["silver_mapping"].silver_table_name, rows_out=int)
+def _bronze_to_silver(bronze_table: str, silver_mapping, full_refresh: bool = False) -> int:
+    """
+    Feed bronze rows not yet seen by a silver table through clean_and_cast/upsert_silver.
+
+    Uses the silver table's bronze watermark (last processed bronze Delta version)
+    to read only rows added since the previous run. The watermark only advances
+    after a successful upsert.
+
+    Args:
+        bronze_table: Bronze table name under BRONZE_DIR.
+        silver_mapping: SilverMapping config for the target silver table.
+        full_refresh: Ignore the watermark and re-read the whole bronze table.
+
+    Returns:
+        Number of bronze rows processed.
+    """
+    from src.cleaner import clean_and_cast
+    from src.deltalake_writer import read_bronze_changes, read_watermark, upsert_silver, write_watermark
+
+    bronze_path = BRONZE_DIR / bronze_table
+    silver_path = SILVER_DIR / silver_mapping.silver_table_name
+
+    since_version = None if full_refresh else read_watermark(silver_path)
+    transform_df, bronze_version = read_bronze_changes(
+        bronze_path, since_version)
+    logger.info(
+        "Read bronze changes | table=%s | since_version=%s | to_version=%s | rows=%s",
+        bronze_table, since_version, bronze_version, len(transform_df))
+
+    if not transform_df.empty:
+        cleaned_df = clean_and_cast(transform_df, silver_mapping, engine=CLEAN_ENGINE,
+                                    diagnostics=CLEAN_DIAGNOSTICS)
+        upsert_silver(
+            cleaned_df=cleaned_df,
+            silver_mapping=silver_mapping,
+            silver_path=silver_path
+        )
+        logger.info(
+            "Upserted to silver | table=%s | silver_table=%s | rows=%s",
+            bronze_table, silver_mapping.silver_table_name, len(cleaned_df)
+        )
+
+    write_watermark(silver_path, bronze_table, bronze_version)
+    return len(transform_df)
+
+
+def process_bronze_to_silver(full_refresh: bool = False) -> None:
     """
     Process existing bronze tables that have silver mappings configured.
     Reads bronze data and applies transformations directly without requiring new inbox files.
-    Useful for testing silver logic independently.
+    Only bronze rows added since each silver table's watermark are processed,
+    unless full_refresh is set. Stage timings are recorded under a fresh batch_id.
+
+    Args:
+        full_refresh: Re-read every bronze table in full instead of incrementally.
     """
     logger.info(
-        "Starting bronze-to-silver transformation for all configured tables")
+        "Starting bronze-to-silver transformation for all configured tables | full_refresh=%s",
+        full_refresh)
 
     # Find all mappings that have silver transformations defined
     silver_mappings = [
@@ -196,55 +629,123 @@ def process_bronze_to_silver() -> None:
 
     logger.info("Found %d tables with silver mappings", len(silver_mappings))
 
-    for bronze_table_name, silver_mapping in silver_mappings:
-        try:
-            bronze_path = BRONZE_DIR / bronze_table_name
-
-            # Check if bronze table exists
-            delta_log = bronze_path / "_delta_log"
-            if not delta_log.exists():
-                logger.warning("Bronze table not found | table=%s | path=%s",
-                               bronze_table_name, bronze_path)
-                continue
-
-            logger.info("Reading bronze table | table=%s", bronze_table_name)
-            transform_df = deltalake.DeltaTable(str(bronze_path)).to_pandas()
-
-            if transform_df.empty:
-                logger.warning(
-                    "Bronze table is empty | table=%s", bronze_table_name)
-                continue
-
-            logger.info("Transforming and upserting to silver | bronze_table=%s | rows=%s",
-                        bronze_table_name, len(transform_df))
-
-            cleaned_df = clean_and_cast(transform_df, silver_mapping)
-            silver_path = SILVER_DIR / silver_mapping.silver_table_name
-            upsert_silver(
-                cleaned_df=cleaned_df,
-                silver_mapping=silver_mapping,
-                silver_path=silver_path
-            )
+    batch_id = f"{uuid4()}"
+    with recording(batch_id, "silver", RUN_METRICS_TABLE), span("run"):
+        for bronze_table_name, silver_mapping in silver_mappings:
+            try:
+                bronze_path = BRONZE_DIR / bronze_table_name
+
+                # Check if bronze table exists
+                delta_log = bronze_path / "_delta_log"
+                if not delta_log.exists():
+                    logger.warning("Bronze table not found | table=%s | path=%s",
+                                   bronze_table_name, bronze_path)
+                    continue
+
+                rows = _bronze_to_silver(
+                    bronze_table_name, silver_mapping, full_refresh=full_refresh)
+
+                logger.info(
+                    "[SUCCESS] Bronze to silver | bronze_table=%s | silver_table=%s | rows=%s",
+                    bronze_table_name, silver_mapping.silver_table_name, rows
+                )
+
+            except Exception as e:
+                logger.error(
+                    "[FAILED] Silver upsert failed | table=%s | error=%s",
+                    bronze_table_name, str(e), exc_info=True
+                )
+
+
+def run_maintenance(z_order: bool = False) -> list[dict]:
+    """
+    Compact, checkpoint and vacuum every configured bronze and silver table
+    that needs it (see src.maintenance.maintain_table and the thresholds in
+    config). Run it between pipeline runs, not alongside one.
 
-            logger.info(
-                "[SUCCESS] Upserted to silver | bronze_table=%s | silver_table=%s | rows=%s",
-                bronze_table_name, silver_mapping.silver_table_name, len(
-                    cleaned_df)
-            )
+    Args:
+        z_order: Z-order silver tables on their primary keys when compacting.
 
+    Returns:
+        One maintain_table report per existing table.
+    """
+    from src.maintenance import maintain_table
+
+    tables = {}
+    for mapping in INGESTION_MAPPINGS.values():
+        tables[BRONZE_DIR / mapping.bronze_table] = None
+        if mapping.silver_mapping:
+            tables[SILVER_DIR / mapping.silver_mapping.silver_table_name] = \
+                list(mapping.silver_mapping.primary_keys) if z_order else None
+
+    reports = []
+    for table_path, z_order_columns in tables.items():
+        if not (table_path / "_delta_log").exists():
+            continue
+        try:
+            reports.append(maintain_table(
+                table_path,
+                z_order_columns=z_order_columns,
+                target_size=COMPACT_TARGET_SIZE,
+                small_file_size=COMPACT_SMALL_FILE_SIZE,
+                min_small_files=COMPACT_MIN_SMALL_FILES,
+                checkpoint_interval=CHECKPOINT_INTERVAL,
+                vacuum_retention_hours=VACUUM_RETENTION_HOURS,
+            ))
         except Exception as e:
-            logger.error(
-                "[FAILED] Silver upsert failed | table=%s | error=%s",
-                bronze_table_name, str(e), exc_info=True
-            )
+            logger.error("[FAILED] Maintenance failed | table=%s | error=%s",
+                         table_path.name, str(e), exc_info=True)
+
+    acted = [r for r in reports if r["actions"]]
+    logger.info(
+        "Maintenance complete | tables=%d | maintained=%d | files=%d->%d | seconds=%.2f",
+        len(reports), len(acted), sum(r["before"]["files"] for r in reports),
+        sum(r["after"]["files"] for r in reports), sum(r["seconds"] for r in reports))
+    return reports
 
 
 if __name__ == "__main__":
-    import sys
-
-    if len(sys.argv) > 1 and sys.argv[1] == "--silver":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the ingestion pipeline.")
+    parser.add_argument("--silver", action="store_true",
+                        help="Only run bronze-to-silver for existing bronze tables.")
+    parser.add_argument("--full-refresh", action="store_true",
+                        help="Ignore silver watermarks and re-read full bronze tables.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Parallel workers for parsing and per-table writes (default: 1).")
+    parser.add_argument("--maintain", action="store_true",
+                        help="Only compact, checkpoint and vacuum fragmented Delta tables.")
+    parser.add_argument("--z-order", action="store_true",
+                        help="With --maintain, Z-order silver tables on their primary keys.")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and ingest inbox files as they arrive.")
+    parser.add_argument("--reingest", action="store_true",
+                        help="Ingest inbox files even if their content was ingested before.")
+    parser.add_argument("--mft", nargs="?", const=MFT_REMOTE_FOLDER, metavar="FOLDER",
+                        help="Ingest new MFT files straight into bronze (default folder: MFT_REMOTE_FOLDER).")
+    parser.add_argument("--batch-files", metavar="BATCH_ID",
+                        help="Only list the inbox files ingested by a batch_id.")
+    args = parser.parse_args()
+
+    if args.batch_files:
+        with IngestionLedger(LEDGER_FILE) as ledger:
+            print(ledger.files_for_batch(args.batch_files).to_string(index=False))
+    elif args.maintain:
+        logger.info("Mode: Delta table maintenance")
+        run_maintenance(z_order=args.z_order)
+    elif args.mft:
+        logger.info("Mode: MFT ingestion (MFT -> bronze -> silver, no inbox)")
+        ingest_from_mft(args.mft, full_refresh=args.full_refresh)
+    elif args.watch:
+        logger.info("Mode: Watch inbox (inbox -> bronze -> silver per arrival)")
+        try:
+            watch(full_refresh=args.full_refresh, workers=args.workers, reingest=args.reingest)
+        except KeyboardInterrupt:
+            logger.info("Stopped watching inbox")
+    elif args.silver:
         logger.info("Mode: Bronze-to-Silver transformation")
-        process_bronze_to_silver()
+        process_bronze_to_silver(full_refresh=args.full_refresh)
     else:
         logger.info("Mode: Full ETL pipeline (inbox -> bronze -> silver)")
-        main()
+        main(full_refresh=args.full_refresh, workers=args.workers, reingest=args.reingest)
@@ -1,12 +1,40 @@
+from dataclasses import dataclass, field
 from datetime import datetime, date
 import logging
+import numpy as np
 import pandas as pd
 
+from src.utils.instrumentation import traced
+
 logger = logging.getLogger(__name__)
 
 
-def clean_and_cast(df: pd.DataFrame, silver_mapping) -> pd.DataFrame:
-    """Clean, rename, and cast DataFrame per SilverMapping config."""
+@traced("clean", table_name=lambda a: a["silver_mapping"].silver_table_name,
+        rows_in=lambda a: len(a["df"]), rows_out=len)
+def clean_and_cast(df: pd.DataFrame, silver_mapping, engine: str = "pandas",
+                   diagnostics=None) -> pd.DataFrame:
+    """Clean, rename, and cast DataFrame per SilverMapping config.
+
+    Args:
+        df: Bronze rows.
+        silver_mapping: SilverMapping with the column casts.
+        engine: "pandas" casts column by column. "polars" runs the mapping's
+                compiled cast plan (see _compile_plan) over the whole frame in
+                one pass and returns the same frame and null diagnostics; it
+                falls back to pandas for frames the plan does not cover.
+        diagnostics: CastDiagnostics collector, or a level ("off", "counts",
+                     "sampled") for a throwaway one. Defaults to sampled.
+    """
+    if not isinstance(diagnostics, CastDiagnostics):
+        diagnostics = CastDiagnostics(diagnostics or "sampled")
+
+    if engine == "polars":
+        result = _clean_and_cast_polars(df, silver_mapping, diagnostics)
+        if result is not None:
+            return result
+    elif engine != "pandas":
+        raise ValueError(f"Unknown engine '{engine}'. Use 'pandas' or 'polars'.")
+
     df = df.copy()
 
     # Deduplicate exact row matches first (before any transformations)
@@ -44,28 +72,10 @@ def clean_and_cast(df: pd.DataFrame, silver_mapping) -> pd.DataFrame:
             logger.warning(f"Column '{source_col}' not found")
             continue
 
-        # Track how many empty strings will be converted to null
-        empty_str_count = (df[target_col].astype(
-            str).str.strip().str.lstrip("'") == "").sum()
-        before = df[target_col].notna().sum()
-
-        # Capture sample of non-empty values that will be lost (for diagnostics)
-        lost_before = df[target_col].copy()
-
+        original = df[target_col]
         df[target_col] = TYPE_CONVERTERS[col_map.source_dtype](
-            df[target_col], col_map)
-
-        after = df[target_col].notna().sum()
-        lost_count = before - after
-
-        if lost_count > 0:
-            # Log as info since quote-only values are intentionally nulled
-            lost_values = lost_before[(lost_before.notna()) & (
-                df[target_col].isna())].unique()
-            lost_sample = str(list(lost_values[:5]))
-            logger.info(
-                f"Column '{target_col}': {lost_count} values nulled ({empty_str_count} empty, {lost_count - empty_str_count} quote-only). "
-                f"Samples: {lost_sample}")
+            original, col_map)
+        diagnostics.measure(target_col, source_col, original, df[target_col])
 
     # Cast unmapped to string, except ingested_at (preserve as datetime)
     for original_col in unmapped:
@@ -80,6 +90,353 @@ def clean_and_cast(df: pd.DataFrame, silver_mapping) -> pd.DataFrame:
     return df
 
 
+# ===== Null-loss diagnostics =====
+
+DIAGNOSTIC_LEVELS = ("off", "counts", "sampled")
+
+
+@dataclass
+class ColumnDiagnostics:
+    """Null-loss figures for one silver column, summed over every frame recorded."""
+    source: str
+    before: int = 0                   # non-null values going into the cast
+    after: int = 0                    # non-null values coming out
+    empty: int = 0                    # lost values that were empty or quote-only strings
+    samples: list = field(default_factory=list)
+    lost_seen: int = 0                # lost values offered to the sample reservoir
+
+    @property
+    def lost(self) -> int:
+        return self.before - self.after
+
+
+class CastDiagnostics:
+    """
+    Collects what clean_and_cast nulls out, per target column.
+
+    Levels:
+        off:     nothing is measured or logged.
+        counts:  before/after/empty counts per column.
+        sampled: counts plus a uniform sample of at most sample_size lost
+                 values per column, kept with reservoir sampling so the cost
+                 is bounded however many values are lost (across frames too).
+
+    One collector can be passed to several clean_and_cast calls; report holds
+    {target column: ColumnDiagnostics}.
+    """
+
+    def __init__(self, level: str = "sampled", sample_size: int = 5, seed=None):
+        if level not in DIAGNOSTIC_LEVELS:
+            raise ValueError(f"Unknown diagnostics level '{level}'. Use one of {DIAGNOSTIC_LEVELS}.")
+        self.level = level
+        self.sample_size = sample_size
+        self.report: dict[str, ColumnDiagnostics] = {}
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def enabled(self) -> bool:
+        return self.level != "off"
+
+    def record(self, target: str, source: str, before: int, after: int, empty: int,
+               lost_positions: np.ndarray = None, take=None) -> None:
+        """
+        Add one frame's counts for a column, and log them if anything was lost.
+
+        Args:
+            target: Silver column name.
+            source: Bronze column it was cast from.
+            before, after, empty: Counts for this frame.
+            lost_positions: Row positions of the lost values (sampled level).
+            take: Callable mapping positions to the original values.
+        """
+        if not self.enabled:
+            return
+        entry = self.report.setdefault(target, ColumnDiagnostics(source))
+        entry.before += int(before)
+        entry.after += int(after)
+        entry.empty += int(empty)
+        lost_count = int(before - after)
+        if lost_count <= 0:
+            return
+
+        message = (f"Column '{target}': {lost_count} values nulled "
+                   f"({int(empty)} empty, {lost_count - int(empty)} quote-only).")
+        if self.level == "sampled" and lost_positions is not None:
+            self._sample(entry, lost_positions, take)
+            message += f" Samples: {entry.samples}"
+        # Logged as info since quote-only values are intentionally nulled
+        logger.info(message)
+
+    def measure(self, target: str, source: str, original: pd.Series, converted: pd.Series) -> None:
+        """record() for a pandas column before and after its converter."""
+        if not self.enabled:
+            return
+        before, after = original.notna().sum(), converted.notna().sum()
+        if before == after:
+            self.record(target, source, before, after, 0)
+            return
+        positions = np.flatnonzero((original.notna() & converted.isna()).to_numpy())
+        # Every empty or quote-only string is nulled, so only lost values need checking
+        empty = _normalize_str(original.iloc[positions]).isna().sum()
+        self.record(target, source, before, after, empty,
+                    positions, lambda chosen: original.iloc[chosen].tolist())
+
+    def _sample(self, entry: ColumnDiagnostics, positions: np.ndarray, take) -> None:
+        """Algorithm R over this frame's lost positions; only the kept values are fetched."""
+        k = self.sample_size
+        fill = min(k - len(entry.samples), len(positions))
+        slots = list(range(len(entry.samples), len(entry.samples) + fill))
+        chosen = list(positions[:fill])
+        rest = positions[fill:]
+        if len(rest):
+            seen = entry.lost_seen + fill + np.arange(1, len(rest) + 1)
+            draws = self._rng.integers(0, seen)
+            hits = draws < k
+            # Later hits on a slot overwrite earlier ones, as in the sequential algorithm
+            last = {}
+            for slot, position in zip(draws[hits], rest[hits]):
+                last[int(slot)] = position
+            slots += list(last)
+            chosen += list(last.values())
+        entry.lost_seen += len(positions)
+        if not chosen:
+            return
+        entry.samples.extend([None] * fill)
+        for slot, value in zip(slots, take(np.asarray(chosen, dtype=np.int64))):
+            entry.samples[slot] = value
+
+
+# ===== Polars engine =====
+# A SilverMapping is compiled once into a plan (rename map, per-target cast
+# spec); each call turns the plan into Polars expressions for that frame's
+# columns and dtypes, and evaluates the casts and the null diagnostics
+# together. Casts mirror the pandas converters below value for value.
+
+_PLANS = {}
+_STR_DTYPE = pd.StringDtype(storage="pyarrow", na_value=np.nan)
+_BOOL_MAP = {"true": True, "false": False,
+             "1": True, "0": False, "yes": True, "no": False, "y": True, "n": False}
+_INT_PATTERN = r"^[+-]?[0-9]+$"
+
+
+def _compile_plan(silver_mapping) -> dict:
+    """Validate a SilverMapping and precompute what every call needs; cached per mapping."""
+    cached = _PLANS.get(id(silver_mapping))
+    if cached is not None and cached["mapping"] is silver_mapping:
+        return cached
+
+    columns_map = silver_mapping.columns
+    for source_col, col_map in columns_map.items():
+        if col_map.source_dtype not in TYPE_CONVERTERS:
+            raise ValueError(
+                f"Column '{source_col}': unknown type {col_map.source_dtype}")
+
+    targets = {}
+    for source_col, col_map in columns_map.items():
+        targets.setdefault(col_map.target_name, []).append((source_col, col_map))
+    plan = {
+        "mapping": silver_mapping,
+        "rename": {source_col: col_map.target_name for source_col, col_map in columns_map.items()},
+        "targets": targets,
+    }
+    _PLANS[id(silver_mapping)] = plan
+    return plan
+
+
+def _clean_and_cast_polars(df: pd.DataFrame, silver_mapping, diagnostics: CastDiagnostics):
+    """
+    Polars engine for clean_and_cast.
+
+    Returns None when the frame needs the pandas path: empty frames,
+    duplicate column names (before or after renaming), several mappings
+    casting the same column, datetime mappings without a format, and
+    unmapped columns whose snake_case name lands on a non-string cast.
+    """
+    import polars as pl
+
+    plan = _compile_plan(silver_mapping)
+    if df.empty or df.columns.duplicated().any():
+        return None
+    rename = plan["rename"]
+    out_names = [rename[c] if c in rename else _to_snake_case(c) for c in df.columns]
+    if len(set(out_names)) < len(out_names):
+        return None
+
+    # Per output column: (input column, cast spec or None, normalize afterwards)
+    steps = []
+    for col, out in zip(df.columns, out_names):
+        casts = plan["targets"].get(out, [])
+        if len(casts) > 1:
+            return None
+        col_map = casts[0][1] if casts else None
+        normalize_after = col not in rename and out != "ingested_at"
+        if col_map is not None and normalize_after and col_map.source_dtype is not str:
+            return None
+        if col_map is not None and col_map.source_dtype is datetime and not col_map.datetime_format:
+            return None
+        steps.append((col, out, col_map, normalize_after))
+
+    # Columns that go through string normalization are stringified by pandas
+    # first unless already str, so every value renders exactly as in the pandas path
+    prepared = {}
+    kinds = {}
+    for col, out, col_map, normalize_after in steps:
+        series = df[col]
+        kind = _cast_kind(series, col_map, normalize_after)
+        kinds[out] = kind
+        if kind not in ("keep", "passthrough") and not isinstance(series.dtype, pd.StringDtype):
+            series = series.astype(str)
+        prepared[col] = series
+    # Dedup, then normalize every string column once; casts and counts read the staged frame
+    staged = (pl.from_pandas(pd.DataFrame(prepared), nan_to_null=True)
+              .with_row_index("__row").lazy()
+              .unique(subset=list(df.columns), keep="first", maintain_order=True)
+              .with_columns(_pl_normalize(pl.col(col)).alias(f"{col}|norm")
+                            for col, out, _, _ in steps if kinds[out] not in ("keep", "passthrough"))
+              .collect())
+
+    exprs, stats = [pl.col("__row")], [pl.len().alias("__rows")]
+    for col, out, col_map, normalize_after in steps:
+        kind = kinds[out]
+        if kind in ("keep", "passthrough"):
+            expr = pl.col(col)
+        else:
+            expr = _pl_cast(pl.col(f"{col}|norm"), col_map, kind)
+            if normalize_after and col_map is not None:
+                expr = _pl_normalize(expr)
+        exprs.append(expr.alias(out))
+        if col_map is None:
+            continue
+        if diagnostics.enabled:
+            stats.append(pl.col(col).is_not_null().sum().alias(f"{out}|before"))
+        if diagnostics.enabled and kind != "passthrough":
+            stats.append((pl.col(col).is_not_null() & pl.col(f"{col}|norm").is_null())
+                         .sum().alias(f"{out}|empty"))
+        if kind == "float":
+            stats.append(_pl_digits(pl.col(f"{col}|norm")).str.contains(_INT_PATTERN)
+                         .fill_null(False).all().alias(f"{out}|all_int"))
+
+    result, counts = pl.collect_all([staged.lazy().select(exprs), staged.lazy().select(stats)])
+    counts = counts.row(0, named=True)
+    if diagnostics.enabled:
+        after = result.select(pl.all().is_not_null().sum()).row(0, named=True)
+
+    duplicates_removed = len(df) - counts["__rows"]
+    if duplicates_removed > 0:
+        logger.info(
+            f"Deduplicated {duplicates_removed} duplicate rows (kept {counts['__rows']})")
+
+    sources = {out: col for col, out, _, _ in steps}
+    for source_col, col_map in plan["mapping"].columns.items():
+        out = col_map.target_name
+        if out not in sources:
+            logger.warning(f"Column '{source_col}' not found")
+            continue
+        col = sources[out]
+        if diagnostics.enabled:
+            before, positions = counts[f"{out}|before"], None
+            if diagnostics.level == "sampled" and before > after[out]:
+                positions = np.flatnonzero(
+                    (staged[col].is_not_null() & result[out].is_null()).to_numpy())
+            diagnostics.record(out, source_col, before, after[out], counts.get(f"{out}|empty", 0),
+                               positions, lambda chosen, values=staged[col]: values.gather(chosen).to_list())
+        if counts.get(f"{out}|all_int"):
+            # pd.to_numeric keeps all-integer columns as int64
+            result = result.with_columns(
+                staged.select(_pl_digits(pl.col(f"{col}|norm")).cast(pl.Int64).alias(out)))
+
+    return _to_pandas(result, df.index, kinds, counts)
+
+
+def _cast_kind(series: pd.Series, col_map, normalize_after: bool) -> str:
+    """How a column is handled: keep, normalize, passthrough, or the cast type name."""
+    if col_map is None:
+        return "normalize" if normalize_after else "keep"
+    dtype = col_map.source_dtype
+    if dtype is float and pd.api.types.is_float_dtype(series):
+        return "passthrough"
+    if dtype is int and series.dtype == "Int64":
+        return "passthrough"
+    if dtype is bool and series.dtype == "bool":
+        return "passthrough"
+    if dtype is datetime and pd.api.types.is_datetime64_any_dtype(series):
+        return "passthrough"
+    return {datetime: "datetime", str: "str", float: "float", int: "int",
+            bool: "bool", "pct": "pct"}[dtype]
+
+
+def _pl_normalize(expr):
+    """Polars _normalize_str: strip, drop leading quotes, empty to null."""
+    return expr.str.strip_chars().str.strip_chars_start("'").replace("", None)
+
+
+def _pl_digits(norm):
+    return norm.str.replace_all(",", "", literal=True)
+
+
+def _pl_cast(norm, col_map, kind: str):
+    """Polars counterpart of TYPE_CONVERTERS for one column, from its normalized strings."""
+    import polars as pl
+    if kind in ("normalize", "str"):
+        return norm
+    if kind == "float":
+        return _pl_digits(norm).cast(pl.Float64, strict=False).fill_nan(None)
+    if kind == "int":
+        return (_pl_digits(norm).cast(pl.Float64, strict=False).fill_nan(None)
+                .round(0, mode="half_to_even").cast(pl.Int64, strict=False))
+    if kind == "pct":
+        return (_pl_digits(norm.str.replace_all("%", "", literal=True))
+                .cast(pl.Float64, strict=False).fill_nan(None) / 100)
+    if kind == "bool":
+        return norm.str.to_lowercase().replace_strict(
+            _BOOL_MAP, default=None, return_dtype=pl.Boolean)
+    if kind == "datetime":
+        fmt = col_map.datetime_format
+        return norm.map_batches(
+            lambda s: _parse_datetimes(s, fmt),
+            return_dtype=pl.Datetime("us", "America/New_York"))
+    raise ValueError(f"Unknown cast kind '{kind}'")
+
+
+def _parse_datetimes(series, fmt: str):
+    """Parse each distinct value once with pd.to_datetime, so results match the pandas path exactly."""
+    import polars as pl
+    distinct = series.drop_nulls().unique()
+    parsed = pd.to_datetime(pd.Series(distinct.to_list(), dtype="str"), format=fmt, errors="coerce")
+    parsed = pl.Series(parsed.dt.tz_localize("America/New_York").astype(
+        "datetime64[us, America/New_York]"))
+    return series.replace_strict(
+        distinct, parsed, default=None, return_dtype=pl.Datetime("us", "America/New_York"))
+
+
+def _to_pandas(result, index: pd.Index, kinds: dict, counts: dict) -> pd.DataFrame:
+    """Convert the plan output to the dtypes the pandas path produces."""
+    import pyarrow as pa
+
+    def pandas_type(arrow_type):
+        if arrow_type in (pa.string(), pa.large_string(), pa.string_view()):
+            return _STR_DTYPE
+        if arrow_type == pa.int64():
+            return pd.Int64Dtype()
+        return None
+
+    rows = result["__row"].to_numpy()
+    out = result.drop("__row").to_arrow().to_pandas(types_mapper=pandas_type)
+    out.index = index[rows]
+    for name, kind in kinds.items():
+        column = out[name]
+        if kind == "float" and counts.get(f"{name}|all_int"):
+            out[name] = column.astype("int64")
+        if kind == "bool":
+            # map() gives bool without misses, object with NaN otherwise
+            out[name] = column.astype(bool) if column.notna().all() else \
+                column.astype(object).where(column.notna(), np.nan)
+        elif kind == "datetime" and column.isna().all():
+            # pd.to_datetime falls back to second resolution when nothing parses
+            out[name] = column.astype("datetime64[s, America/New_York]")
+    return out
+
+
 def _normalize_str(series):
     """String-first: convert to string, strip, replace empty with NA."""
     return series.astype(str).str.strip().str.lstrip("'").replace("", pd.NA)
@@ -1,68 +1,579 @@
-import polars
-
+from src.utils.instrumentation import traced
 from src.utils.logger import get_logger
 from pathlib import Path
-from typing import Union, Optional
+from typing import TYPE_CHECKING, Iterable, Union, Optional
 from datetime import datetime
+from itertools import chain
+from urllib.parse import unquote
+import json
+import sys
+import threading
 
 import deltalake
-import duckdb
+import numpy as np
 import pandas as pd
-import polars as pl
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as pads
+
+if TYPE_CHECKING:
+    import polars as pl
 
 logger = get_logger(__name__)
 
+WATERMARK_FILE = "_bronze_watermark.json"
+ROW_HASH = "row_hash"
+# Bronze lineage and SCD2 bookkeeping; not part of a row's content
+ROW_HASH_EXCLUDED = {"ingested_at", "source_file", "batch_id", "is_current", ROW_HASH}
+
+# Open DeltaTable handles by resolved path (see open_table)
+_TABLES: dict[str, deltalake.DeltaTable] = {}
+_TABLES_LOCK = threading.Lock()
+
+
+def open_table(table_path: Union[str, Path]) -> deltalake.DeltaTable:
+    """
+    DeltaTable for a path at its latest version, reusing an open handle.
+
+    Opening a table replays its log from the last checkpoint; a cached
+    handle only reads the commits made since it was last used
+    (update_incremental), which matters for a long-running --watch process
+    touching the same tables every few seconds. Callers must not hold on to
+    a handle across commits made by someone else without calling this again.
 
+    Args:
+        table_path: Delta table directory (must exist).
+
+    Returns:
+        The table's DeltaTable.
+    """
+    key = str(Path(table_path).resolve())
+    with _TABLES_LOCK:
+        dt = _TABLES.get(key)
+    if dt is not None:
+        try:
+            dt.update_incremental()
+            return dt
+        except Exception as e:
+            # e.g. the table was deleted and recreated
+            logger.warning("Reopening Delta table | path=%s | error=%s", key, str(e))
+    dt = deltalake.DeltaTable(key)
+    with _TABLES_LOCK:
+        _TABLES[key] = dt
+    return dt
+
+
+@traced("bronze_write", table_name=lambda a: Path(a["target_path"]).name,
+        rows_in=lambda a: len(a["df"]), rows_out=lambda out: out if isinstance(out, int) else out.num_rows)
 def ingest_into_bronze(
-    df: pd.DataFrame,
-        source_name: str,
+    df: Union[pd.DataFrame, "pl.DataFrame", pa.Table, pa.RecordBatchReader],
+        source_name: Optional[str],
         current_time: pd.Timestamp,
         target_path: Union[str, Path],
         batch_id: str,
         write_mode: str = "append",
-        merge_schema: bool = True) -> pd.DataFrame:
+        merge_schema: bool = True,
+        partition_by=None) -> Union[pa.Table, int]:
     """
-    Load a DataFrame to the bronze Delta table. Adds metadata columns
+    Load data to the bronze Delta table. Adds metadata columns
     and writes data in append or overwrite mode.
 
+    Everything is written as Arrow: Arrow tables (e.g. from parsers.read_csv)
+    and Polars frames go through without a pandas round trip, pandas frames
+    are converted once, and a RecordBatchReader is streamed batch by batch in
+    one commit. Columns are cast to the types the existing table already has
+    for them. The constant metadata columns are one-entry dictionary arrays
+    rather than a value repeated per row.
+
     Args:
-        df:            Input DataFrame.
-        source_name:   Source file name.
+        df:            Input DataFrame, Arrow table or RecordBatchReader.
+        source_name:   Source file name. Pass None when df already carries a
+                       per-row source_file column (coalesced multi-file batch).
         current_time:  Timestamp for ingestion.
         target_path:   Destination Delta table path.
         batch_id:      Unique identifier for this ingestion batch.
         write_mode:    "overwrite" or "append" (default: "append").
         merge_schema:  Allow new columns in incoming data (default: True).
-    """
-    if not isinstance(df, (pd.DataFrame, pl.DataFrame)):
-        raise TypeError("df must be a pandas or polars DataFrame.")
+        partition_by:  Optional PartitionSpec; its column is added to the data
+                       and a new table is partitioned by it.
 
-    if isinstance(df, pl.DataFrame):
-        df = df.to_pandas()
+    Returns:
+        The written Arrow table with metadata columns, or the number of rows
+        written for a RecordBatchReader (whose batches are not kept).
+    """
+    if not (isinstance(df, (pd.DataFrame, pa.Table, pa.RecordBatchReader)) or _is_polars_frame(df)):
+        raise TypeError(
+            "df must be a pandas or polars DataFrame, an Arrow table or a RecordBatchReader.")
 
     if write_mode not in ["overwrite", "append"]:
         raise ValueError("write_mode must be 'overwrite' or 'append'.")
 
-    # Add metadata columns
-    out = df.copy()
-    out["ingested_at"] = current_time
-    out["source_file"] = source_name
-    out["batch_id"] = batch_id
+    if _is_polars_frame(df):
+        df = df.to_arrow()
+    elif isinstance(df, pd.DataFrame):
+        df = pa.Table.from_pandas(df, preserve_index=False)
 
     target_path = Path(target_path)
     target_path.mkdir(parents=True, exist_ok=True)
-
+    table_types = _bronze_table_types(target_path)
     # Enable schema evolution: "merge" allows new columns, "overwrite" replaces schema
     schema_mode = "merge" if merge_schema else "overwrite"
+
+    if isinstance(df, pa.RecordBatchReader):
+        schema = _bronze_schema(_with_metadata(
+            df.schema.empty_table(), source_name, current_time, batch_id, partition_by).schema, table_types)
+        rows = 0
+
+        def batches():
+            nonlocal rows
+            for batch in df:
+                table = _with_metadata(
+                    pa.Table.from_batches([batch]), source_name, current_time, batch_id, partition_by)
+                rows += table.num_rows
+                yield from _conform(table, schema).to_batches()
+
+        out = pa.RecordBatchReader.from_batches(schema, batches())
+    else:
+        out = _with_metadata(df, source_name, current_time, batch_id, partition_by)
+        out = _conform(out, _bronze_schema(out.schema, table_types))
+
     deltalake.write_deltalake(
-        target_path, out.reset_index(drop=True), mode=write_mode, schema_mode=schema_mode)
+        target_path, out, mode=write_mode, schema_mode=schema_mode,
+        partition_by=_partition_columns(target_path, partition_by))
+
+    streamed = isinstance(out, pa.RecordBatchReader)
     logger.info(
         "Loaded into bronze | batch=%s | source=%s | mode=%s | schema_mode=%s | rows=%s | target=%s",
-        batch_id, source_name, write_mode, schema_mode, len(out), target_path
+        batch_id,
+        source_name or ("multiple files" if streamed else f"{len(out.column('source_file').unique())} files"),
+        write_mode, schema_mode, rows if streamed else out.num_rows, target_path
+    )
+    return rows if streamed else out
+
+
+@traced("bronze_write", table_name=lambda a: Path(a["target_path"]).name, rows_out=int)
+def ingest_blocks_into_bronze(
+        blocks: Iterable[pd.DataFrame],
+        source_name: Optional[str],
+        current_time: pd.Timestamp,
+        target_path: Union[str, Path],
+        batch_id: str,
+        write_mode: str = "append",
+        merge_schema: bool = True,
+        batch_rows: int = 50_000,
+        partition_by=None) -> int:
+    """
+    Stream DataFrames (e.g. one per fund block of a basket file) into the
+    bronze Delta table without materializing them all at once.
+
+    Blocks are gathered into record batches of about batch_rows rows, get the
+    same metadata columns as ingest_into_bronze and are handed to
+    write_deltalake through a RecordBatchReader, so at most one batch is held
+    in memory and the stream lands in a single commit. Data columns are
+    written as strings unless the existing table already has a type for
+    them. A block that brings columns not seen earlier in the stream closes
+    the current commit and the rest is written in another one with the
+    widened schema.
+
+    Args:
+        blocks:        Iterable of DataFrames sharing (mostly) the same columns.
+        source_name:   Source file name, or None when every block already
+                       carries a source_file column.
+        current_time:  Timestamp for ingestion.
+        target_path:   Destination Delta table path.
+        batch_id:      Unique identifier for this ingestion batch.
+        write_mode:    "overwrite" or "append" (default: "append"). Only the
+                       first commit overwrites.
+        merge_schema:  Allow new columns in incoming data (default: True).
+        batch_rows:    Rows gathered per Arrow record batch (default: 50,000).
+        partition_by:  Optional PartitionSpec, as for ingest_into_bronze.
+
+    Returns:
+        Number of rows written.
+    """
+    if write_mode not in ["overwrite", "append"]:
+        raise ValueError("write_mode must be 'overwrite' or 'append'.")
+
+    target_path = Path(target_path)
+    target_path.mkdir(parents=True, exist_ok=True)
+    schema_mode = "merge" if merge_schema else "overwrite"
+
+    table_types = _bronze_table_types(target_path)
+    blocks = iter(blocks)
+    pending = next(blocks, None)
+    rows, commits = 0, 0
+    while pending is not None:
+        first_block, columns = pending, set(pending.columns)
+        pending = None
+
+        def same_schema():
+            nonlocal pending
+            yield first_block
+            for block in blocks:
+                if not set(block.columns) <= columns:
+                    pending = block
+                    return
+                yield block
+
+        tables = (_bronze_block(df, source_name, current_time, batch_id, partition_by)
+                  for df in _gather(same_schema(), batch_rows))
+        first = next(tables)
+        schema = _bronze_schema(first.schema, table_types)
+
+        def batches(first=first, tables=tables, schema=schema):
+            nonlocal rows
+            for table in chain([first], tables):
+                rows += table.num_rows
+                yield from _conform(table, schema).to_batches()
+
+        deltalake.write_deltalake(
+            target_path, pa.RecordBatchReader.from_batches(schema, batches()),
+            mode=write_mode if commits == 0 else "append", schema_mode=schema_mode,
+            partition_by=_partition_columns(target_path, partition_by))
+        commits += 1
+        # Types chosen so far stay fixed for later commits
+        table_types.update({f.name: f.type for f in schema})
+
+    logger.info(
+        "Streamed into bronze | batch=%s | source=%s | mode=%s | schema_mode=%s | rows=%s | commits=%s | target=%s",
+        batch_id, source_name or "multiple files", write_mode, schema_mode, rows, commits, target_path
     )
-    return out
+    return rows
+
+
+def _is_polars_frame(df) -> bool:
+    """isinstance(df, polars.DataFrame) without importing polars: a polars frame means it is loaded."""
+    polars = sys.modules.get("polars")
+    return polars is not None and isinstance(df, polars.DataFrame)
+
+
+def _gather(frames: Iterable[pd.DataFrame], batch_rows: int) -> Iterable[pd.DataFrame]:
+    """Concatenate consecutive small frames into frames of about batch_rows rows."""
+    buffer, buffered = [], 0
+    for frame in frames:
+        buffer.append(frame)
+        buffered += len(frame)
+        if buffered >= batch_rows:
+            yield pd.concat(buffer, ignore_index=True) if len(buffer) > 1 else buffer[0]
+            buffer, buffered = [], 0
+    if buffer:
+        yield pd.concat(buffer, ignore_index=True) if len(buffer) > 1 else buffer[0]
+
+
+def _bronze_block(
+        df: pd.DataFrame,
+        source_name: Optional[str],
+        current_time: pd.Timestamp,
+        batch_id: str,
+        partition_by=None) -> pa.Table:
+    """One streamed block as Arrow: data columns as strings plus bronze metadata."""
+    if df.columns.duplicated().any():
+        raise ValueError(
+            f"Duplicate column names found: {list(df.columns[df.columns.duplicated()])}")
+    table = pa.Table.from_arrays(
+        [_string_array(df[name]) for name in df.columns],
+        names=[str(name) for name in df.columns])
+    return _with_metadata(table, source_name, current_time, batch_id, partition_by)
+
+
+def _with_metadata(
+        table: pa.Table,
+        source_name: Optional[str],
+        current_time: pd.Timestamp,
+        batch_id: str,
+        partition_by=None) -> pa.Table:
+    """Append the bronze metadata columns (ingested_at, source_file, batch_id) and the partition column."""
+    rows = table.num_rows
+    if source_name is not None:
+        source = _constant(source_name, pa.large_string(), rows)
+    elif "source_file" in table.column_names:
+        source = table.column("source_file")
+    else:
+        raise ValueError(
+            "source_name is required when the data has no source_file column.")
+    if "source_file" in table.column_names:
+        table = table.drop_columns(["source_file"])
+    current_time = pd.Timestamp(current_time)
+    if current_time.tzinfo is not None:
+        # Delta stores timestamps as UTC; a dictionary is not converted on write
+        current_time = current_time.tz_convert("UTC")
+    table = (table
+             .append_column("ingested_at", _constant(current_time, pa.timestamp("us", tz=current_time.tz), rows))
+             .append_column("source_file", source)
+             .append_column("batch_id", _constant(batch_id, pa.large_string(), rows)))
+    if partition_by is None:
+        return table
+    if partition_by.name in table.column_names:
+        table = table.drop_columns([partition_by.name])
+    return table.append_column(partition_by.name, _partition_source(table, partition_by))
+
 
+def _constant(value, type: pa.DataType, rows: int) -> pa.DictionaryArray:
+    """rows copies of value as a one-entry dictionary array (one byte per row)."""
+    return pa.DictionaryArray.from_arrays(
+        pa.array(np.zeros(rows, dtype=np.int8)), pa.array([value], type=type))
 
+
+# ===== Partitioning =====
+
+PARTITION_FORMATS = {"day": "%Y-%m-%d", "month": "%Y-%m", "year": "%Y"}
+
+
+def partition_values(values: pd.Series, partition_by) -> pd.Series:
+    """
+    Partition column for a PartitionSpec from its source column.
+
+    Dates become "2026-02-24" / "2026-02" / "2026" strings for day / month /
+    year granularity; string sources are parsed with the spec's
+    datetime_format (each distinct value once). Values that do not parse
+    give a null partition.
+
+    Args:
+        values: Source column (datetime or strings).
+        partition_by: PartitionSpec from config.
+
+    Returns:
+        Series of partition strings, NaN where there is no partition value.
+    """
+    if partition_by.granularity == "value":
+        return values.astype("str")
+    if partition_by.granularity not in PARTITION_FORMATS:
+        raise ValueError(
+            f"Unknown partition granularity '{partition_by.granularity}'. "
+            f"Use one of {list(PARTITION_FORMATS) + ['value']}.")
+    fmt = PARTITION_FORMATS[partition_by.granularity]
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.dt.strftime(fmt)
+    distinct = values.dropna().unique()
+    parsed = pd.to_datetime(
+        pd.Series(distinct, dtype="str").str.strip().str.lstrip("'"),
+        format=partition_by.datetime_format, errors="coerce")
+    return values.map(dict(zip(distinct, parsed.dt.strftime(fmt))))
+
+
+def _partition_source(table: pa.Table, partition_by) -> pa.ChunkedArray:
+    """partition_values for an Arrow table, computed on its distinct source values; null if it lacks the column."""
+    name = partition_by.source_column
+    if name not in table.column_names:
+        return pa.chunked_array([pa.nulls(table.num_rows, pa.large_string())])
+    column = table.column(name)
+    distinct = pc.unique(column)
+    # Partition columns stay plain strings: Delta cannot partition by a dictionary column
+    values = pa.array(partition_values(distinct.to_pandas(), partition_by),
+                      type=pa.large_string(), from_pandas=True)
+    return pc.take(values, pc.index_in(column, value_set=distinct))
+
+
+def _partition_columns(target_path: Path, partition_by) -> Optional[list[str]]:
+    """
+    partition_by argument for write_deltalake.
+
+    A new table is partitioned by the spec's column. An existing table keeps
+    its partitioning (None lets deltalake use it); a mismatch is logged, as
+    changing it takes a full rewrite.
+    """
+    if partition_by is None:
+        return None
+    if not (Path(target_path) / "_delta_log").exists():
+        return [partition_by.name]
+    existing = open_table(target_path).metadata().partition_columns
+    if existing != [partition_by.name]:
+        logger.warning(
+            "Table partitioning %s differs from configured %s, keeping the table's | target=%s",
+            existing, [partition_by.name], target_path)
+    return None
+
+
+def _bronze_table_types(target_path: Path) -> dict:
+    """Column types of an existing bronze table, or {} if there is none yet."""
+    if not (target_path / "_delta_log").exists():
+        return {}
+    # Columns only ever written empty have null type and take any type
+    return {f.name: f.type for f in pa.schema(
+        open_table(target_path).schema().to_arrow())
+        if not pa.types.is_null(f.type)}
+
+
+def _bronze_schema(schema: pa.Schema, table_types: dict) -> pa.Schema:
+    """
+    Write schema: the table's existing types where it has them; all-missing
+    columns as strings. Dictionary columns (the constant metadata) stay
+    encoded when their values already have the table's type; Delta stores
+    them as that type.
+    """
+    fields = []
+    for f in schema:
+        existing = table_types.get(f.name)
+        if pa.types.is_dictionary(f.type) and (
+                existing is None or _same_type(existing, f.type.value_type)):
+            fields.append(f)
+        elif existing is not None:
+            fields.append(pa.field(f.name, existing))
+        else:
+            fields.append(pa.field(f.name, pa.large_string() if pa.types.is_null(f.type) else f.type))
+    return pa.schema(fields)
+
+
+def _same_type(a: pa.DataType, b: pa.DataType) -> bool:
+    """Equal Arrow types, counting string and large_string as the same."""
+    text = (pa.types.is_string, pa.types.is_large_string)
+    return a == b or (any(t(a) for t in text) and any(t(b) for t in text))
+
+
+def _string_array(series: pd.Series) -> pa.Array:
+    """Column as an Arrow string array, missing values as nulls."""
+    try:
+        array = pa.array(series, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed Python objects: let pandas render them
+        array = pa.array(series.astype("str"), from_pandas=True)
+    if pa.types.is_large_string(array.type) or pa.types.is_null(array.type):
+        return array
+    return array.cast(pa.large_string())
+
+
+def _conform(table: pa.Table, schema: pa.Schema) -> pa.Table:
+    """Reorder/cast table to schema, filling columns it lacks with nulls, as one record batch."""
+    columns = []
+    for field in schema:
+        idx = table.schema.get_field_index(field.name)
+        if idx == -1:
+            columns.append(pa.nulls(table.num_rows, field.type))
+        else:
+            columns.append(table.column(idx).cast(field.type))
+    return pa.Table.from_arrays(columns, schema=schema).combine_chunks()
+
+
+@traced("bronze_read", table_name=lambda a: Path(a["bronze_path"]).name,
+        rows_out=lambda out: len(out[0]))
+def read_bronze_changes(
+    bronze_path: Union[str, Path],
+    since_version: Optional[int] = None,
+) -> tuple[pd.DataFrame, int]:
+    """
+    Read rows written to a bronze table after a given Delta version.
+
+    Scans the commit log for versions after since_version and reads only the
+    data files those commits added, so appends cost O(new rows) instead of
+    O(table). Files rewritten without a data change (e.g. compaction) are
+    ignored. Falls back to a full read when since_version is None or the log
+    for that range is no longer available.
+
+    Args:
+        bronze_path: Path to the bronze delta table.
+        since_version: Last bronze version already processed, or None.
+
+    Returns:
+        (rows added after since_version, current bronze version)
+    """
+    bronze_path = Path(bronze_path)
+    dt = open_table(bronze_path)
+    current_version = dt.version()
+
+    if since_version is None:
+        return dt.to_pandas(), current_version
+    if since_version >= current_version:
+        return pd.DataFrame(), current_version
+
+    added = _files_added_since(bronze_path, since_version, current_version)
+    if added is None:
+        logger.warning(
+            "Commit log not available since version %s, reading full table | table=%s",
+            since_version, bronze_path.name)
+        return dt.to_pandas(), current_version
+    if not added:
+        return pd.DataFrame(), current_version
+
+    dataset = dt.to_pyarrow_dataset()
+    fragments = [
+        dataset.format.make_fragment(
+            path, dataset.filesystem,
+            partition_expression=_partition_expression(partition_values, dataset.schema))
+        for path, partition_values in added.items()
+    ]
+    changes = pads.FileSystemDataset(
+        fragments, dataset.schema, dataset.format, dataset.filesystem)
+    try:
+        return changes.to_table().to_pandas(), current_version
+    except FileNotFoundError:
+        # Files were compacted and vacuumed since the watermark
+        logger.warning(
+            "Data files since version %s were vacuumed, reading full table | table=%s",
+            since_version, bronze_path.name)
+        return dt.to_pandas(), current_version
+
+
+def _files_added_since(bronze_path: Path, since_version: int, to_version: int) -> Optional[dict]:
+    """
+    Collect files holding rows written in commits (since_version, to_version].
+
+    Only data-changing adds count; files later removed by a data-changing
+    commit (overwrite/delete) are dropped. Files removed by compaction are
+    kept, as they still hold the original rows until vacuumed.
+
+    Returns:
+        {relative file path: partition values}, or None if a commit is missing.
+    """
+    log_dir = bronze_path / "_delta_log"
+    added = {}
+    for version in range(since_version + 1, to_version + 1):
+        commit_file = log_dir / f"{version:020d}.json"
+        if not commit_file.exists():
+            return None
+        for line in commit_file.read_text(encoding="utf-8").splitlines():
+            if not line.strip():
+                continue
+            action = json.loads(line)
+            if "add" in action and action["add"].get("dataChange", True):
+                add = action["add"]
+                added[unquote(add["path"])] = add.get("partitionValues") or {}
+            elif "remove" in action and action["remove"].get("dataChange", True):
+                added.pop(unquote(action["remove"]["path"]), None)
+    return added
+
+
+def _partition_expression(partition_values: dict, schema: pa.Schema):
+    """Build the dataset filter expression for a file's partition values."""
+    expression = pads.scalar(True)
+    for column, value in partition_values.items():
+        field = pads.field(column)
+        if value is None:
+            expression = expression & field.is_null()
+        else:
+            expression = expression & (
+                field == pa.scalar(value).cast(schema.field(column).type))
+    return expression
+
+
+def read_watermark(silver_path: Union[str, Path]) -> Optional[int]:
+    """Return the last bronze version merged into a silver table, if recorded."""
+    watermark_path = Path(silver_path) / WATERMARK_FILE
+    if not watermark_path.exists():
+        return None
+    return json.loads(watermark_path.read_text())["bronze_version"]
+
+
+def write_watermark(silver_path: Union[str, Path], bronze_table: str, bronze_version: int) -> None:
+    """
+    Record the bronze version a silver table is caught up to.
+
+    Stored as a sidecar file in the silver table directory (underscore-prefixed
+    so Delta readers and vacuum ignore it).
+    """
+    silver_path = Path(silver_path)
+    silver_path.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "bronze_table": bronze_table,
+        "bronze_version": bronze_version,
+        "updated_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    tmp_path = silver_path / f"{WATERMARK_FILE}.tmp"
+    tmp_path.write_text(json.dumps(payload, indent=2))
+    tmp_path.replace(silver_path / WATERMARK_FILE)
+
+
+@traced("silver_merge", table_name=lambda a: a["silver_mapping"].silver_table_name,
+        rows_in=lambda a: len(a["cleaned_df"]))
 def upsert_silver(
     cleaned_df: pd.DataFrame,
     silver_mapping,
@@ -73,7 +584,11 @@ def upsert_silver(
 
     Uses is_current flag to track active records and prevent duplicates:
     - Deduplicates within incoming batch (on PK + timestamp)
-    - Checks against existing table: skips identical records, updates changed ones
+    - Stores a row_hash of each row's content (everything but the bronze
+      metadata) and compares incoming rows by (PK, row_hash) with the
+      current rows only: unchanged rows are dropped, changed rows expire
+      the current version and are inserted as the new one, new keys are
+      inserted (one Delta MERGE, no full-table rewrite)
     - Handles NULL primary keys adaptively:
       * Full composite key if all PK cols non-NULL
       * Partial key if some PK cols NULL
@@ -90,128 +605,316 @@ def upsert_silver(
     pk_cols = list(silver_mapping.primary_keys)
     ts_col = silver_mapping.dedup_timestamp
 
-    # Separate rows by null patterns in primary keys
-    # Group 1: Rows with ALL keys non-NULL (use full composite key)
-    full_key_mask = cleaned_df[pk_cols].notna().all(axis=1)
-    full_key_df = cleaned_df[full_key_mask].copy()
-
-    # Group 2: Rows with SOME keys NULL (use adaptive partial keys)
-    partial_key_mask = ~full_key_mask & cleaned_df[pk_cols].notna().any(axis=1)
-    partial_key_df = cleaned_df[partial_key_mask].copy()
-
-    # Group 3: Rows with ALL keys NULL (skip)
-    all_null_mask = cleaned_df[pk_cols].isnull().all(axis=1)
-    if all_null_mask.any():
-        logger.warning(
-            f"Skipping {all_null_mask.sum()} rows with NULL in ALL primary keys "
-            f"for {silver_mapping.silver_table_name}"
-        )
-
-    # Process full-key rows
-    processed_df_list = []
-    if len(full_key_df) > 0:
-        dedup_full = full_key_df.sort_values(
-            by=ts_col, ascending=False).drop_duplicates(subset=pk_cols, keep="first")
-        processed_df_list.append(dedup_full)
-        logger.info(
-            f"Processing {len(dedup_full)} rows with full composite key")
-
-    # Process partial-key rows (adaptive dedup per null pattern)
-    if len(partial_key_df) > 0:
-        # Create null pattern identifier: convert boolean array to tuple of strings for grouping
-        partial_key_df = partial_key_df.copy()
-        partial_key_df['_null_pattern'] = partial_key_df[pk_cols].isnull().apply(
-            lambda row: tuple(row), axis=1)
-
-        partial_groups = []
-        for null_pattern, group in partial_key_df.groupby('_null_pattern'):
-            active_keys = [pk_cols[i]
-                           for i in range(len(pk_cols)) if not null_pattern[i]]
-            if active_keys:
-                dedup_group = group.drop(columns=['_null_pattern']).sort_values(
-                    by=ts_col, ascending=False).drop_duplicates(subset=active_keys, keep="first")
-                partial_groups.append(dedup_group)
-                logger.info(
-                    f"Processing {len(dedup_group)} rows with partial key {active_keys}"
-                )
-        if partial_groups:
-            processed_df_list.append(
-                pd.concat(partial_groups, ignore_index=True))
-
-    if not processed_df_list:
+    # Latest row per key, where the key is the PK columns that are non-NULL
+    # in that row (full composite key, partial key, or skip if all NULL)
+    incoming_df = _latest_per_key(cleaned_df, pk_cols, ts_col, silver_mapping.silver_table_name)
+    if incoming_df.empty:
         logger.warning(
             f"No valid records to upsert to {silver_mapping.silver_table_name}")
         return
 
-    incoming_df = pd.concat(processed_df_list, ignore_index=True)
-
     delta_log = silver_path / "_delta_log"
     table_exists = delta_log.exists()
 
+    incoming_df["is_current"] = True
+    incoming_df["is_current"] = incoming_df["is_current"].astype(bool)
+
+    partition_by = silver_mapping.partition_by
+    if partition_by is not None:
+        # Derived from the silver column; replaces any copy carried over from bronze
+        incoming_df[partition_by.name] = partition_values(
+            incoming_df[partition_by.source_column], partition_by)
+    # The dedup timestamp is hashed like any other column: unless it is the
+    # bronze ingested_at, a restated value is a change to the row
+    incoming_df[ROW_HASH] = row_hash(incoming_df, exclude={partition_by.name if partition_by is not None else None})
+
     if not table_exists:
         # First run: initialize table with is_current flag
-        incoming_df["is_current"] = True
-        incoming_df["is_current"] = incoming_df["is_current"].astype(bool)
         deltalake.write_deltalake(
-            silver_path, incoming_df.reset_index(drop=True), mode="overwrite", schema_mode="overwrite")
+            silver_path, incoming_df.reset_index(drop=True), mode="overwrite", schema_mode="overwrite",
+            partition_by=[partition_by.name] if partition_by is not None else None)
         logger.info(
             f"Created {silver_mapping.table_type} table {silver_mapping.silver_table_name}: {len(incoming_df)} rows")
     else:
-        # Merge upsert: deduplicate against existing table, apply SCD2 logic
-        existing_df = deltalake.DeltaTable(silver_path).to_pandas()
-        existing_df["is_current"] = existing_df["is_current"].astype(bool)
-
-        # Identify which incoming records are truly new or changed
-        # Merge on PK to find matches in existing table
-        merge_keys = pk_cols
-        incoming_with_flag = incoming_df.merge(
-            existing_df[merge_keys + ["is_current"]
-                        ].drop_duplicates(subset=merge_keys),
-            on=merge_keys,
-            how="left",
-            indicator=True,
-            suffixes=("", "_existing")
+        # Merge upsert: only files holding matching current rows are scanned,
+        # and only new files are written (no full-table rewrite)
+        metrics = _merge_into_silver(silver_path, incoming_df, pk_cols, partition_by)
+        if metrics is None:
+            logger.info(
+                f"Upserted {silver_mapping.table_type} {silver_mapping.silver_table_name}: "
+                f"0 new/updated rows, {len(incoming_df)} unchanged rows skipped")
+            return
+        rows_updated = metrics["num_target_rows_updated"]
+        rows_added = metrics["num_target_rows_inserted"] - rows_updated
+        unchanged = len(incoming_df) - rows_added - rows_updated
+
+        logger.info(
+            f"Upserted {silver_mapping.table_type} {silver_mapping.silver_table_name}: "
+            f"{rows_added} new rows, {rows_updated} changed rows versioned, {unchanged} unchanged rows skipped "
+            f"({metrics['num_target_files_scanned']} files scanned, "
+            f"{metrics['num_target_files_added']} files added, "
+            f"{metrics['num_target_files_removed']} files removed)"
         )
 
-        # Records to skip: identical record already exists (same PK + is_current=True)
-        if "is_current_existing" in incoming_with_flag.columns:
-            incoming_with_flag["_is_duplicate"] = (
-                incoming_with_flag["is_current_existing"] == True
-            )
-            records_to_add = incoming_with_flag[
-                incoming_with_flag["_is_duplicate"] == False
-            ].drop(columns=["_is_duplicate", "is_current_existing", "_merge"])
-            duplicates_skipped = incoming_with_flag["_is_duplicate"].sum()
+
+def _latest_per_key(df: pd.DataFrame, pk_cols: list[str], ts_col: str, table_name: str) -> pd.DataFrame:
+    """
+    Keep the latest row (by ts_col) per primary key, adapting to NULL key parts.
+
+    Each row's NULL pattern over pk_cols is encoded as a bitmask (bit i set
+    when pk_cols[i] is NULL). Rows only compete with rows of the same
+    pattern, keyed on the columns that are non-NULL in it: pattern 0 is the
+    full composite key, others are partial keys, and the all-NULL pattern
+    is skipped. One stable lexsort by (pattern, keys, ts_col descending)
+    puts each group's latest row first, and a comparison with the previous
+    sorted row marks the group starts, so there is no per-row Python or
+    per-pattern loop. Timestamp ties keep the earlier incoming row.
+
+    Args:
+        df: Cleaned frame with silver column names.
+        pk_cols: Primary key columns.
+        ts_col: Timestamp column; the latest non-NULL value wins.
+        table_name: Silver table name, for logging.
+
+    Returns:
+        The kept rows with a fresh RangeIndex, grouped by pattern and key.
+    """
+    nulls = df[pk_cols].isna().to_numpy()
+    pattern = nulls.astype(np.int64) @ (np.int64(1) << np.arange(len(pk_cols), dtype=np.int64))
+    all_null = (1 << len(pk_cols)) - 1
+
+    skipped = int(np.count_nonzero(pattern == all_null))
+    if skipped:
+        logger.warning(
+            f"Skipping {skipped} rows with NULL in ALL primary keys for {table_name}")
+
+    # Integer codes keep the sort and comparisons in numpy; NULL parts share
+    # code -1, and within a pattern they are NULL in every row anyway
+    key_codes = [pd.factorize(df[col])[0] for col in pk_cols]
+    ts_codes = pd.factorize(df[ts_col], sort=True)[0]
+    # Descending timestamp with NULLs last, as sort_values(ascending=False)
+    ts_order = np.where(ts_codes < 0, 1, -ts_codes)
+
+    order = np.lexsort([ts_order, *reversed(key_codes), pattern])
+    groups = np.vstack([pattern, *key_codes])[:, order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = (groups[:, 1:] != groups[:, :-1]).any(axis=0)
+    keep = order[first & (groups[0] != all_null)]
+
+    kept_patterns, counts = np.unique(pattern[keep], return_counts=True)
+    for bits, count in zip(kept_patterns, counts):
+        if bits == 0:
+            logger.info(f"Processing {count} rows with full composite key")
         else:
-            records_to_add = incoming_with_flag.drop(columns=["_merge"])
-            duplicates_skipped = 0
-
-        # Mark old versions of records being updated as not current
-        pks_being_updated = records_to_add[merge_keys].drop_duplicates()
-        existing_df = existing_df.merge(
-            pks_being_updated.assign(_is_updated=True),
-            on=merge_keys,
-            how="left"
-        )
-        existing_df.loc[
-            (existing_df["_is_updated"] == True) & (
-                existing_df["is_current"] == True),
-            "is_current"
-        ] = False
-        existing_df = existing_df.drop(columns=["_is_updated"])
+            active_keys = [col for i, col in enumerate(pk_cols) if not bits >> i & 1]
+            logger.info(f"Processing {count} rows with partial key {active_keys}")
 
-        # Add new records with is_current=True
-        records_to_add["is_current"] = True
-        records_to_add = records_to_add.astype(
-            {col: existing_df[col].dtype for col in records_to_add.columns if col in existing_df.columns})
+    return df.iloc[keep].reset_index(drop=True)
 
-        result_df = pd.concat([existing_df, records_to_add], ignore_index=True)
-        result_df["is_current"] = result_df["is_current"].astype(bool)
 
-        deltalake.write_deltalake(
-            silver_path, result_df.reset_index(drop=True), mode="overwrite", schema_mode="merge")
+def _merge_into_silver(
+    silver_path: Path,
+    incoming_df: pd.DataFrame,
+    pk_cols: list[str],
+    partition_by=None,
+) -> Optional[dict]:
+    """
+    SCD2 MERGE of deduplicated incoming rows into an existing silver table.
+
+    Incoming rows are first classified against an index of the table's
+    current rows (primary key and row_hash only, see _current_row_status).
+    NULL key parts compare equal, matching the pandas semantics of the
+    in-batch dedup. Unchanged rows are dropped before the MERGE. Each
+    changed row goes in twice: a copy with is_current=false that matches the
+    current version and expires it, and the new version, which matches
+    nothing and is inserted. New keys are inserted. All of it is a single
+    Delta MERGE commit, so cost scales with the files touched rather than
+    with the size of the table.
+
+    When the table is partitioned by partition_by and its source column is
+    part of the primary key, a matching row can only sit in one of the
+    incoming rows' partitions, so the index read and the MERGE predicate
+    name them and the other partitions are never scanned.
 
-        logger.info(
-            f"Upserted {silver_mapping.table_type} {silver_mapping.silver_table_name}: "
-            f"{len(records_to_add)} new/updated rows, {duplicates_skipped} duplicates skipped"
+    Args:
+        silver_path: Path to an existing silver delta table.
+        incoming_df: Deduplicated rows with is_current and row_hash columns.
+        pk_cols: Primary key columns.
+        partition_by: The silver mapping's PartitionSpec, if any.
+
+    Returns:
+        MERGE operation metrics reported by deltalake, or None when every
+        incoming row is unchanged and nothing was written.
+    """
+    dt = open_table(silver_path)
+    source = _align_to_table_schema(incoming_df, dt)
+
+    prune = (partition_by is not None and partition_by.source_column in pk_cols
+             and dt.metadata().partition_columns == [partition_by.name])
+    partitions = incoming_df[partition_by.name] if prune else None
+    matched, unchanged = _current_row_status(dt, source, pk_cols, partition_by, partitions)
+
+    changed = matched & ~unchanged
+    inserts = source.filter(pa.array(~unchanged))
+    if inserts.num_rows == 0:
+        return None
+    expiring = source.filter(pa.array(changed))
+    expiring = expiring.set_column(
+        expiring.schema.get_field_index("is_current"), "is_current",
+        pa.repeat(pa.scalar(False), expiring.num_rows))
+    source = pa.concat_tables([expiring, inserts])
+
+    key_match = " AND ".join(
+        f"(t.{_quote(c)} IS NOT DISTINCT FROM s.{_quote(c)})" for c in pk_cols)
+    predicate = f"{key_match} AND t.is_current = true AND s.is_current = false"
+    if prune:
+        predicate += " AND " + _partition_predicate(partition_by.name, partitions)
+
+    return (
+        dt.merge(
+            source,
+            predicate=predicate,
+            source_alias="s",
+            target_alias="t",
+            merge_schema=True,
         )
+        .when_matched_update(updates={"is_current": "false"})
+        .when_not_matched_insert_all(predicate="s.is_current = true")
+        .execute()
+    )
+
+
+def _current_row_status(
+    dt: deltalake.DeltaTable,
+    source: pa.Table,
+    pk_cols: list[str],
+    partition_by=None,
+    partitions: Optional[pd.Series] = None,
+) -> tuple:
+    """
+    Look incoming rows up in the table's current rows by primary key.
+
+    Only the key and row_hash columns of current rows are read, restricted
+    to the incoming partitions when given and to the incoming values of the
+    leading key column; the null-safe join runs in DuckDB. Rows whose current version has no row_hash (written before it
+    existed) count as changed, so they are versioned once and carry a hash
+    from then on.
+
+    Returns:
+        (matched, unchanged) boolean arrays aligned with source rows.
+    """
+    dataset = dt.to_pyarrow_dataset()
+    has_hash = ROW_HASH in dataset.schema.names
+    current = pads.field("is_current") == True  # noqa: E712
+    if partitions is not None:
+        current = current & _partition_filter(partition_by.name, partitions)
+    # Files whose statistics rule out every incoming value of the leading key are skipped
+    lead = source.column(pk_cols[0])
+    lead_filter = pads.field(pk_cols[0]).isin(pc.unique(lead.drop_null()))
+    if lead.null_count:
+        lead_filter = lead_filter | pads.field(pk_cols[0]).is_null()
+    current = current & lead_filter
+    index = dataset.to_table(
+        columns=pk_cols + ([ROW_HASH] if has_hash else []), filter=current)
+    if not has_hash:
+        index = index.append_column(ROW_HASH, pa.nulls(index.num_rows, pa.int64()))
+
+    keys = source.select(pk_cols + [ROW_HASH]).append_column(
+        "__row", pa.array(range(source.num_rows), pa.int64()))
+    key_match = " AND ".join(
+        f"t.{_quote(c)} IS NOT DISTINCT FROM s.{_quote(c)}" for c in pk_cols)
+    import duckdb
+
+    with duckdb.connect() as con:
+        con.register("s", keys)
+        con.register("t", index.append_column("__found", pa.repeat(pa.scalar(True), index.num_rows)))
+        status = con.execute(f"""
+            SELECT s.__row,
+                   coalesce(bool_or(t.__found), false) AS matched,
+                   coalesce(bool_or(t.{ROW_HASH} = s.{ROW_HASH}), false) AS unchanged
+            FROM s LEFT JOIN t ON {key_match}
+            GROUP BY s.__row
+            ORDER BY s.__row
+        """).arrow()
+    status = pa.table(status)
+    return (status.column("matched").to_numpy(zero_copy_only=False),
+            status.column("unchanged").to_numpy(zero_copy_only=False))
+
+
+def _partition_filter(column: str, values: pd.Series):
+    """Dataset filter on the partitions present in values (NULL partition included if any)."""
+    field = pads.field(column)
+    expression = field.isin(pa.array(values.dropna().unique(), pa.large_string()))
+    if values.isna().any():
+        expression = expression | field.is_null()
+    return expression
+
+
+def _align_to_table_schema(df: pd.DataFrame, dt: deltalake.DeltaTable) -> pa.Table:
+    """Convert df to Arrow, casting columns shared with the table to its types."""
+    table = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+    target_schema = pa.schema(dt.schema().to_arrow())
+    for target_field in target_schema:
+        idx = table.schema.get_field_index(target_field.name)
+        if idx == -1 or table.schema.field(idx).type == target_field.type:
+            continue
+        table = table.set_column(
+            idx, target_field.name, table.column(idx).cast(target_field.type))
+    return table.replace_schema_metadata(None)
+
+
+def row_hash(df: pd.DataFrame, exclude=()) -> pd.Series:
+    """
+    64-bit hash of each row's content, for SCD2 change detection.
+
+    Covers every column except the bronze metadata/SCD2 columns and
+    exclude, taken in name order so column order does not matter. Values
+    are hashed in a canonical form (see _canonical), so the same row hashes
+    the same whether a batch typed a column int64, Int64 or float64 (e.g.
+    float-mapped columns with or without nulls or fractions). Uses pandas'
+    fixed-key hashing, so the value is stable across runs; adding a column
+    to the hashed set changes every hash once.
+
+    Args:
+        df: Silver rows.
+        exclude: Further columns to leave out (e.g. the derived partition column).
+
+    Returns:
+        int64 Series aligned with df.
+    """
+    columns = sorted(c for c in df.columns if c not in ROW_HASH_EXCLUDED and c not in set(exclude))
+    canonical = pd.DataFrame({c: _canonical(df[c]) for c in columns}, index=df.index)
+    hashes = pd.util.hash_pandas_object(canonical, index=False).to_numpy()
+    return pd.Series(hashes.view(np.int64), index=df.index)
+
+
+def _canonical(column: pd.Series) -> pd.Series:
+    """
+    Dtype-independent form of a column for row_hash.
+
+    Numbers (and booleans) become float64 with NaN for nulls, timestamps
+    naive UTC datetime64[ns], and everything else str with None for nulls.
+    """
+    if pd.api.types.is_bool_dtype(column) or pd.api.types.is_numeric_dtype(column):
+        return pd.Series(column.to_numpy(dtype="float64", na_value=np.nan), index=column.index)
+    if isinstance(column.dtype, pd.DatetimeTZDtype):
+        column = column.dt.tz_convert("UTC").dt.tz_localize(None)
+    if pd.api.types.is_datetime64_dtype(column):
+        return column.astype("datetime64[ns]")
+    return column.astype(str).astype(object).where(column.notna(), None)
+
+
+def _partition_predicate(column: str, values: pd.Series) -> str:
+    """Target-side filter on the partitions present in values (NULL partition included if any)."""
+    target = f"t.{_quote(column)}"
+    literals = ", ".join(
+        "'" + str(v).replace("'", "''") + "'" for v in sorted(values.dropna().unique()))
+    conditions = [f"{target} IN ({literals})"] if literals else []
+    if values.isna().any():
+        conditions.append(f"{target} IS NULL")
+    return "(" + " OR ".join(conditions) + ")"
+
+
+def _quote(column: str) -> str:
+    """Quote a column name for use in a Delta SQL predicate."""
+    return '"' + column.replace('"', '""') + '"'
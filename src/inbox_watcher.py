@@ -0,0 +1,156 @@
+"""
+Inbox watching for main.py --watch.
+
+Filesystem notifications (the optional watchdog package) wake the watcher as
+soon as something changes in the inbox; without watchdog, or when the
+notifications stop arriving (e.g. on some network shares), it falls back to
+rescanning the directory every poll_interval seconds. Either way a file is
+only handed out once it is stable: its size and modification time have not
+changed for settle_seconds and it can be opened, so files still being copied
+in are left alone.
+"""
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+from src.utils.logger import get_logger
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # polling only
+    FileSystemEventHandler, Observer = object, None
+
+logger = get_logger(__name__)
+
+
+class _WakeHandler(FileSystemEventHandler):
+    """Sets an event on any change in the watched directory."""
+
+    def __init__(self, wake: threading.Event):
+        super().__init__()
+        self.wake = wake
+
+    def on_any_event(self, event) -> None:
+        self.wake.set()
+
+
+class InboxWatcher:
+    """
+    Hands out inbox files once they are stable, in arrival order.
+
+    Usage:
+        with InboxWatcher(INBOX_DIR) as watcher:
+            while True:
+                files = watcher.next_batch()
+                ...  # files must leave the inbox, or they are handed out again
+    """
+
+    def __init__(
+            self,
+            inbox_dir: Union[str, Path],
+            settle_seconds: float = 5.0,
+            poll_interval: float = 10.0,
+            use_notifications: bool = True):
+        """
+        Args:
+            inbox_dir: Directory to watch.
+            settle_seconds: How long size and mtime must stay unchanged.
+            poll_interval: Seconds between rescans when nothing wakes the watcher.
+            use_notifications: Use watchdog if it is installed.
+        """
+        self.inbox_dir = Path(inbox_dir)
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.use_notifications = use_notifications and Observer is not None
+        self._wake = threading.Event()
+        self._observer = None
+        # path -> (size, mtime_ns, monotonic time the pair was first seen)
+        self._seen: dict[Path, tuple[int, int, float]] = {}
+
+    def __enter__(self) -> "InboxWatcher":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        self.inbox_dir.mkdir(parents=True, exist_ok=True)
+        if self.use_notifications:
+            self._observer = Observer()
+            self._observer.schedule(_WakeHandler(self._wake), str(self.inbox_dir), recursive=False)
+            self._observer.start()
+        logger.info("Watching inbox | dir=%s | mode=%s | settle_seconds=%s | poll_interval=%s",
+                    self.inbox_dir, "notify" if self._observer else "poll",
+                    self.settle_seconds, self.poll_interval)
+
+    def stop(self) -> None:
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+
+    def next_batch(self, timeout: Optional[float] = None, max_files: Optional[int] = None) -> list[Path]:
+        """
+        Wait for stable inbox files.
+
+        Args:
+            timeout: Seconds to wait at most; None waits until a file is ready.
+            max_files: Hand out at most this many files (the oldest first).
+
+        Returns:
+            Stable files ordered by modification time; empty on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            ready = self._scan()
+            if ready:
+                ready = ready[:max_files]
+                for file_path in ready:
+                    del self._seen[file_path]
+                return ready
+
+            # Files still settling are rechecked soon; otherwise sleep until woken
+            wait = self.settle_seconds / 2 if self._seen else self.poll_interval
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return []
+                wait = min(wait, remaining)
+            self._wake.wait(wait)
+            self._wake.clear()
+
+    def _scan(self) -> list[Path]:
+        """Update size/mtime tracking for every inbox file and return the stable ones."""
+        now = time.monotonic()
+        present, ready = set(), []
+        with os.scandir(self.inbox_dir) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                file_path = Path(entry.path)
+                present.add(file_path)
+                seen = self._seen.get(file_path)
+                if seen is None or seen[:2] != (stat.st_size, stat.st_mtime_ns):
+                    self._seen[file_path] = (stat.st_size, stat.st_mtime_ns, now)
+                elif now - seen[2] >= self.settle_seconds and _readable(file_path):
+                    ready.append((stat.st_mtime_ns, file_path))
+        for file_path in self._seen.keys() - present:
+            del self._seen[file_path]
+        return [file_path for _, file_path in sorted(ready)]
+
+
+def _readable(file_path: Path) -> bool:
+    """False while another process holds the file open for writing (Windows share locks)."""
+    try:
+        with open(file_path, "rb"):
+            return True
+    except OSError:
+        return False
@@ -0,0 +1,230 @@
+"""
+Ingestion ledger: which inbox payloads have already been written to bronze.
+
+Moving files to PROCESSED_DIR only protects against the same path being seen
+twice. A redelivered file (often under a new name, or renamed again by
+mapping.rename) would be parsed, appended to bronze and upserted to silver a
+second time. The ledger records every ingested file by content hash, size and
+bronze table in a small DuckDB database, so main() can drop duplicates before
+parsing, and answers which files fed a given batch_id.
+"""
+import hashlib
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Optional, Union
+
+from src.utils.logger import get_logger
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = get_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingested_files (
+    content_hash VARCHAR NOT NULL,
+    size_bytes BIGINT NOT NULL,
+    bronze_table VARCHAR NOT NULL,
+    batch_id VARCHAR NOT NULL,
+    file_name VARCHAR NOT NULL,
+    ingested_at TIMESTAMP NOT NULL,  -- UTC
+    PRIMARY KEY (content_hash, size_bytes, bronze_table, batch_id)
+)
+"""
+
+
+def fingerprint_hash() -> "hashlib.blake2b":
+    """
+    Empty hash object of the ledger's content hash, for bytes hashed as they
+    stream past (see StateStreetMFTClient.open_stream); its hexdigest() is
+    the content_hash of file_fingerprint.
+    """
+    return hashlib.blake2b(digest_size=32)
+
+
+def file_fingerprint(file_path: Union[str, Path]) -> tuple[str, int]:
+    """
+    Content hash and size of a file.
+
+    Args:
+        file_path: File to fingerprint.
+
+    Returns:
+        (blake2b hex digest of the bytes, size in bytes)
+    """
+    digest = fingerprint_hash()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest(), Path(file_path).stat().st_size
+
+
+class IngestionLedger:
+    """
+    Persistent record of inbox files ingested into bronze.
+
+    A payload is identified by (content_hash, size_bytes, bronze_table): the
+    same bytes loaded into another bronze table count as a different payload.
+    Files are claimed while the inbox is collected and recorded once their
+    bronze commit succeeds; files that fail or are skipped are released, so a
+    file that fails can be dropped in again, even while the same ledger stays
+    open (main.watch).
+    Safe to share between the writer threads of one run: every use of the
+    connection and of the pending claims holds one lock.
+
+    Usage:
+        with IngestionLedger(LEDGER_FILE) as ledger:
+            previous = ledger.claim(file_path, "pcf_inav_baskets")
+            ...
+            ledger.record([file_path], batch_id)   # or ledger.release([file_path]) on failure
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Args:
+            path: DuckDB database file; created with its table if missing.
+        """
+        import duckdb  # only runs that have inbox files pay for it
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._con = duckdb.connect(str(self.path))
+        self._con.execute(_SCHEMA)
+        self._lock = threading.Lock()
+        # Claimed in this run but not yet recorded: {file_path: key} and {key: file_name}
+        self._pending: dict[Path, tuple[str, int, str]] = {}
+        self._pending_names: dict[tuple[str, int, str], str] = {}
+
+    def __enter__(self) -> "IngestionLedger":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._con.close()
+
+    def lookup(self, content_hash: str, size_bytes: int, bronze_table: str) -> Optional[dict]:
+        """
+        First recorded ingestion of a payload.
+
+        Returns:
+            {"file_name", "batch_id", "ingested_at" (UTC)}, or None if never ingested.
+        """
+        with self._lock:
+            return self._lookup(content_hash, size_bytes, bronze_table)
+
+    def claim(self, file_path: Path, bronze_table: str,
+              fingerprint: Optional[tuple[str, int]] = None) -> Optional[dict]:
+        """
+        Fingerprint an inbox file and reserve it for this run.
+
+        Args:
+            file_path: Inbox file, under the name it will be ingested with.
+            bronze_table: Bronze table the file is loaded into.
+            fingerprint: (content_hash, size_bytes) taken while the file was
+                         written (see fingerprint_hash), so it is not read
+                         back; by default the file is hashed.
+
+        Returns:
+            The earlier ingestion of the same payload, or of a file claimed
+            earlier in this run (batch_id None), or None if it is new.
+        """
+        content_hash, size_bytes = fingerprint or file_fingerprint(file_path)
+        key = (content_hash, size_bytes, bronze_table)
+        with self._lock:
+            self._pending[file_path] = key
+            if key in self._pending_names:
+                return {"file_name": self._pending_names[key], "batch_id": None, "ingested_at": None}
+            self._pending_names[key] = file_path.name
+            return self._lookup(*key)
+
+    def has_size(self, size_bytes: int, bronze_table: str) -> bool:
+        """
+        Whether any payload of this size was ingested into (or is claimed for)
+        the table: a file of another size cannot be a duplicate, so it can be
+        parsed before it is claimed.
+        """
+        with self._lock:
+            if any(key[1:] == (size_bytes, bronze_table) for key in self._pending_names):
+                return True
+            return self._con.execute(
+                "SELECT count(*) FROM ingested_files WHERE size_bytes = ? AND bronze_table = ?",
+                [size_bytes, bronze_table]).fetchone()[0] > 0
+
+    def record(self, file_paths: Iterable[Path], batch_id: str) -> int:
+        """
+        Record claimed files as ingested by batch_id.
+
+        Args:
+            file_paths: Files whose bronze commit succeeded.
+            batch_id: Batch that wrote them.
+
+        Returns:
+            Number of ledger rows added.
+        """
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        with self._lock:
+            rows = []
+            for file_path in file_paths:
+                key = self._pending.pop(file_path, None)
+                if key is None:
+                    continue
+                self._pending_names.pop(key, None)
+                rows.append([*key, batch_id, file_path.name, now])
+            if not rows:
+                return 0
+            before = self._count()
+            self._con.executemany(
+                "INSERT INTO ingested_files "
+                "(content_hash, size_bytes, bronze_table, batch_id, file_name, ingested_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT DO NOTHING", rows)
+            return self._count() - before
+
+    def release(self, file_paths: Iterable[Path]) -> None:
+        """
+        Drop the claims of files that will not be recorded (failed, or skipped
+        as duplicates), so the same payload can be claimed again later in the
+        life of the ledger. Files not claimed are ignored.
+
+        Args:
+            file_paths: Files as passed to claim().
+        """
+        with self._lock:
+            for file_path in file_paths:
+                key = self._pending.pop(file_path, None)
+                # A duplicate's release leaves the claim of the file it duplicates
+                if key is not None and self._pending_names.get(key) == file_path.name:
+                    del self._pending_names[key]
+
+    def files_for_batch(self, batch_id: str) -> "pd.DataFrame":
+        """
+        Files that fed a batch.
+
+        Args:
+            batch_id: batch_id as written to the bronze tables.
+
+        Returns:
+            DataFrame with file_name, bronze_table, content_hash, size_bytes
+            and ingested_at, one row per file.
+        """
+        with self._lock:
+            return self._con.execute(
+                "SELECT file_name, bronze_table, content_hash, size_bytes, ingested_at "
+                "FROM ingested_files WHERE batch_id = ? ORDER BY bronze_table, file_name",
+                [batch_id]).df()
+
+    def _lookup(self, content_hash: str, size_bytes: int, bronze_table: str) -> Optional[dict]:
+        row = self._con.execute(
+            "SELECT file_name, batch_id, ingested_at FROM ingested_files "
+            "WHERE content_hash = ? AND size_bytes = ? AND bronze_table = ? "
+            "ORDER BY ingested_at LIMIT 1",
+            [content_hash, size_bytes, bronze_table]).fetchone()
+        if row is None:
+            return None
+        return {"file_name": row[0], "batch_id": row[1], "ingested_at": row[2]}
+
+    def _count(self) -> int:
+        return self._con.execute("SELECT count(*) FROM ingested_files").fetchone()[0]
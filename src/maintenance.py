@@ -0,0 +1,154 @@
+"""
+Delta table maintenance: compaction, Z-ordering, checkpoints and vacuum.
+
+Every inbox batch is its own small append, so bronze and silver tables
+accumulate many small data files and log entries, which slows every
+DeltaTable open and delta_scan. maintain_table measures a table and only
+acts where a threshold says it is fragmented.
+"""
+from pathlib import Path
+from time import perf_counter
+import json
+from typing import Optional, Sequence, Union
+
+import deltalake
+import pyarrow as pa
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def table_stats(table_path: Union[str, Path], small_file_size: int) -> dict:
+    """
+    File and log counts for a Delta table.
+
+    Args:
+        table_path: Delta table directory.
+        small_file_size: Files below this many bytes count as small.
+
+    Returns:
+        {"version", "files", "small_files", "bytes", "commits_since_checkpoint"}
+    """
+    table_path = Path(table_path)
+    dt = deltalake.DeltaTable(str(table_path))
+    sizes = pa.table(dt.get_add_actions(flatten=True)).column("size_bytes").to_pylist()
+    version = dt.version()
+    return {
+        "version": version,
+        "files": len(sizes),
+        "small_files": sum(1 for size in sizes if size < small_file_size),
+        "bytes": sum(sizes),
+        "commits_since_checkpoint": version - _last_checkpoint_version(table_path),
+    }
+
+
+def _last_checkpoint_version(table_path: Path) -> int:
+    """Version of the latest checkpoint, or -1 if the table has none."""
+    last_checkpoint = table_path / "_delta_log" / "_last_checkpoint"
+    if not last_checkpoint.exists():
+        return -1
+    return json.loads(last_checkpoint.read_text())["version"]
+
+
+def maintain_table(
+        table_path: Union[str, Path],
+        z_order_columns: Optional[Sequence[str]] = None,
+        target_size: int = 128 * 1024 * 1024,
+        small_file_size: int = 16 * 1024 * 1024,
+        min_small_files: int = 16,
+        checkpoint_interval: int = 20,
+        vacuum_retention_hours: Optional[int] = None) -> dict:
+    """
+    Compact, vacuum and checkpoint one Delta table where it needs it.
+
+    - Compaction (bin-packing toward target_size, or Z-ordering on
+      z_order_columns) runs when at least min_small_files files are smaller
+      than small_file_size. Compaction commits carry no data change, so
+      read_bronze_changes ignores them.
+    - Vacuum deletes files no longer referenced by the table and older than
+      the retention period: vacuum_retention_hours if given, otherwise the
+      table's deletedFileRetentionDuration (7 days by default). A retention
+      shorter than the table's is refused by deltalake.
+    - A checkpoint is written last, when checkpoint_interval commits have
+      piled up since the previous one; log entries past the table's log
+      retention are then cleaned up.
+
+    Args:
+        table_path: Delta table directory.
+        z_order_columns: Columns to Z-order by when compacting (e.g. the
+                         silver primary keys). Partition columns and columns
+                         missing from the table are skipped.
+        target_size: Target data file size in bytes.
+        small_file_size: Files below this size count toward fragmentation.
+        min_small_files: Small files needed before compaction runs.
+        checkpoint_interval: Commits since the last checkpoint before a new one.
+        vacuum_retention_hours: Override of the table's file retention.
+
+    Returns:
+        {"table", "before", "after", "actions": {action: details}, "seconds"}
+    """
+    table_path = Path(table_path)
+    started = perf_counter()
+    before = table_stats(table_path, small_file_size)
+    actions = {}
+
+    dt = deltalake.DeltaTable(str(table_path))
+    if before["small_files"] >= min_small_files:
+        t0 = perf_counter()
+        columns = _z_order_columns(dt, z_order_columns)
+        if columns:
+            metrics = dt.optimize.z_order(columns, target_size=target_size)
+        else:
+            metrics = dt.optimize.compact(target_size=target_size)
+        actions["z_order" if columns else "compact"] = {
+            "columns": columns,
+            "files_removed": metrics["numFilesRemoved"],
+            "files_added": metrics["numFilesAdded"],
+            "seconds": round(perf_counter() - t0, 3),
+        }
+        dt = deltalake.DeltaTable(str(table_path))
+
+    t0 = perf_counter()
+    expired = dt.vacuum(retention_hours=vacuum_retention_hours, dry_run=True)
+    if expired:
+        deleted = dt.vacuum(retention_hours=vacuum_retention_hours, dry_run=False)
+        actions["vacuum"] = {
+            "files_deleted": len(deleted),
+            "seconds": round(perf_counter() - t0, 3),
+        }
+
+    commits_since_checkpoint = dt.version() - _last_checkpoint_version(table_path)
+    if commits_since_checkpoint >= checkpoint_interval:
+        t0 = perf_counter()
+        dt.create_checkpoint()
+        dt.cleanup_metadata()
+        actions["checkpoint"] = {
+            "version": dt.version(),
+            "seconds": round(perf_counter() - t0, 3),
+        }
+
+    after = table_stats(table_path, small_file_size) if actions else before
+    report = {
+        "table": table_path.name,
+        "before": before,
+        "after": after,
+        "actions": actions,
+        "seconds": round(perf_counter() - started, 3),
+    }
+    logger.info(
+        "Maintained table | table=%s | files=%s->%s | small_files=%s->%s | "
+        "commits_since_checkpoint=%s->%s | actions=%s | seconds=%s",
+        table_path.name, before["files"], after["files"], before["small_files"],
+        after["small_files"], before["commits_since_checkpoint"],
+        after["commits_since_checkpoint"], ",".join(actions) or "none", report["seconds"])
+    return report
+
+
+def _z_order_columns(dt: deltalake.DeltaTable, columns: Optional[Sequence[str]]) -> list[str]:
+    """Requested Z-order columns that exist in the table and are not partition columns."""
+    if not columns:
+        return []
+    partition_columns = set(dt.metadata().partition_columns)
+    names = set(pa.schema(dt.schema().to_arrow()).names)
+    return [c for c in columns if c in names and c not in partition_columns]
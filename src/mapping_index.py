@@ -0,0 +1,147 @@
+"""
+Filename dispatch for inbox files.
+
+INGESTION_MAPPINGS is keyed by filename regexes that are searched in config
+order, first match wins. MappingIndex compiles them once into a single
+regex, so a filename is usually dispatched with two regex calls instead of
+one per mapping, and checks at load time whether any two patterns match one
+of the known file names (SAMPLE_FILE_NAMES). It also pulls the business date
+out of the filename.
+"""
+import re
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Iterable, Optional
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 8-digit dates (20260224) or dashed/underscored ones (2026-02-24, 2026_02_24)
+_DATE_PATTERN = re.compile(r"(?<!\d)(\d{4})([-_]?)(\d{2})\2(\d{2})(?!\d)")
+_INLINE_FLAGS = {re.IGNORECASE: "i", re.MULTILINE: "m", re.DOTALL: "s", re.VERBOSE: "x"}
+
+
+@dataclass
+class MappingMatch:
+    mapping: object                   # IngestionMapping
+    pattern: re.Pattern               # INGESTION_MAPPINGS key that matched
+    file_date: Optional[date] = None  # date in the filename, if any
+
+
+class MappingIndex:
+    """
+    One-pass filename -> IngestionMapping lookup with the same result as
+    searching each pattern in config order.
+
+    Overlaps are found at load time by testing sample file names (one or
+    more real names per pattern, see SAMPLE_FILE_NAMES) against every
+    pattern. They are logged as warnings, or raise with strict=True; where
+    an earlier pattern takes a later pattern's files the later mapping can
+    never be reached.
+
+    All patterns are searched as one alternation of named groups. An
+    alternation finds the leftmost match in the name, which need not be the
+    first pattern in config order (a name outside the samples can still
+    match two patterns), so the match is then checked against an
+    alternation of the earlier patterns only, narrowing down until none of
+    them matches. A name matching a single pattern takes two regex calls.
+    """
+
+    def __init__(self, mappings: dict, examples: Iterable[str] = (), strict: bool = False):
+        """
+        Args:
+            mappings: INGESTION_MAPPINGS-style {re.Pattern: IngestionMapping}.
+                      Keys that are not compiled patterns are ignored.
+            examples: File names to check for overlapping patterns.
+            strict: Raise ValueError on overlapping patterns.
+        """
+        self.mappings = mappings
+        self.patterns = [p for p in mappings if isinstance(p, re.Pattern)]
+        self.ambiguities = self._find_overlaps(examples)
+        for earlier, later, example in self.ambiguities:
+            logger.warning(
+                "Overlapping filename patterns | first=%s | also=%s | example=%s | "
+                "the first pattern in config order wins",
+                earlier.pattern, later.pattern, example)
+        if strict and self.ambiguities:
+            raise ValueError(
+                f"{len(self.ambiguities)} overlapping filename pattern(s): " + "; ".join(
+                    f"{a.pattern!r} / {b.pattern!r} both match {example!r}"
+                    for a, b, example in self.ambiguities))
+
+        # searches[k]: alternation of the first k patterns, compiled on first use
+        self._searches = {len(self.patterns): _alternation(self.patterns)}
+
+    def match(self, filename: str) -> Optional[MappingMatch]:
+        """
+        Find the mapping for a filename.
+
+        Args:
+            filename: Inbox file name (not a path).
+
+        Returns:
+            MappingMatch with the mapping, its pattern and the filename's
+            date, or None if no pattern matches.
+        """
+        index = _matched(self._searches[len(self.patterns)](filename))
+        if index is None:
+            return None
+        # Any earlier pattern that also matches wins over the leftmost match
+        while index:
+            if index not in self._searches:
+                self._searches[index] = _alternation(self.patterns[:index])
+            earlier = _matched(self._searches[index](filename))
+            if earlier is None:
+                break
+            index = earlier
+        pattern = self.patterns[index]
+        return MappingMatch(self.mappings[pattern], pattern, filename_date(filename))
+
+    def _find_overlaps(self, examples: Iterable[str]) -> list[tuple[re.Pattern, re.Pattern, str]]:
+        """(earlier pattern, later pattern, example name) for every pair that matches one of the examples."""
+        overlaps = {}
+        for example in examples:
+            matching = [i for i, pattern in enumerate(self.patterns) if pattern.search(example)]
+            for n, i in enumerate(matching):
+                for j in matching[n + 1:]:
+                    overlaps.setdefault((i, j), example)
+        return [(self.patterns[i], self.patterns[j], example)
+                for (i, j), example in sorted(overlaps.items())]
+
+
+def filename_date(filename: str) -> Optional[date]:
+    """
+    First valid YYYYMMDD (or YYYY-MM-DD / YYYY_MM_DD) date in a filename.
+
+    Args:
+        filename: File name.
+
+    Returns:
+        The date, or None if the name holds no valid date.
+    """
+    for m in _DATE_PATTERN.finditer(filename):
+        try:
+            return datetime.strptime(m.group(1) + m.group(3) + m.group(4), "%Y%m%d").date()
+        except ValueError:
+            continue
+    return None
+
+
+def _alternation(patterns: list[re.Pattern]):
+    """search() of one regex matching any of the patterns; group m<i> is patterns[i]."""
+    return re.compile("|".join(f"(?P<m{i}>{_scoped(p)})" for i, p in enumerate(patterns))).search
+
+
+def _matched(m: Optional[re.Match]) -> Optional[int]:
+    """Index of the pattern an _alternation match came from."""
+    if m is None or m.lastgroup is None:
+        return None
+    # The pattern's own group closes last, so lastgroup names it
+    return int(m.lastgroup[1:])
+
+
+def _scoped(pattern: re.Pattern) -> str:
+    """Pattern source wrapped in a group carrying its own flags."""
+    flags = "".join(letter for flag, letter in _INLINE_FLAGS.items() if pattern.flags & flag)
+    return f"(?{flags}:{pattern.pattern})" if flags else f"(?:{pattern.pattern})"
@@ -1,6 +1,51 @@
 import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import csv
 from pathlib import Path
+from typing import Iterator, Optional
+
+
+def read_csv(file_path: Path, engine: str = "pyarrow", delimiter: str = ",") -> pa.Table:
+    """Multi-threaded reader for plain CSV files with a single header row.
+
+    Every column is read as a string and only empty fields become null (the
+    same missing-value rule as pd.read_csv(na_values="", keep_default_na=False)),
+    so typing is left to clean_and_cast. The Arrow table goes straight to
+    ingest_into_bronze without a pandas copy.
+
+    Args:
+        file_path: Path to the CSV file, or a buffered binary stream (e.g.
+                   StateStreetMFTClient.open_stream), which is read once.
+        engine: "pyarrow" (pyarrow.csv) or "polars" (polars.read_csv).
+        delimiter: Field delimiter.
+
+    Returns:
+        Arrow table with one string column per header field
+    """
+    if engine == "pyarrow":
+        parse_options = pacsv.ParseOptions(delimiter=delimiter)
+        # Peek at the header so every column can be typed as string up front
+        if hasattr(file_path, "peek"):
+            header = file_path.peek(1 << 16).split(b"\n", 1)[0].decode("utf-8-sig").rstrip("\r")
+            names = next(csv.reader([header], delimiter=delimiter))
+        else:
+            with pacsv.open_csv(file_path, parse_options=parse_options) as reader:
+                names = reader.schema.names
+        return pacsv.read_csv(
+            file_path,
+            parse_options=parse_options,
+            convert_options=pacsv.ConvertOptions(
+                column_types={name: pa.string() for name in names},
+                null_values=[""],
+                strings_can_be_null=True,
+            ),
+        )
+    if engine == "polars":
+        import polars as pl
+        return pl.read_csv(file_path, separator=delimiter, infer_schema=False).to_arrow()
+    raise ValueError(f"Unknown CSV engine '{engine}'. Use 'pyarrow' or 'polars'.")
 
 
 def extract_cil(file_path: Path) -> pd.DataFrame:
@@ -23,6 +68,12 @@ def extract_ucf(file_path: Path) -> pd.DataFrame:
         Single unified DataFrame with all UCF records
     """
     df = pd.read_csv(file_path, header=None, names=range(34))
+    result = _parse_blocks(df, _UCF_LAYOUT)
+    return result if result is not None else _extract_ucf_blocks(df)
+
+
+def _extract_ucf_blocks(df: pd.DataFrame) -> pd.DataFrame:
+    """Block-by-block UCF parse, used when blocks are too irregular for _parse_blocks."""
     blocks = _split_into_blocks(df, markers="FUND_NAME")
     holdings_list = []
     for block in blocks:
@@ -46,7 +97,9 @@ def extract_accounting_navs(file_path: Path) -> pd.DataFrame:
     Returns:
         Single unified DataFrame with all accounting nav records
     """
-    df = pd.read_excel(file_path, engine="xlrd", header=None)
+    # xlrd only reads legacy .xls; .xlsx drops go through openpyxl
+    engine = "xlrd" if Path(file_path).suffix.lower() == ".xls" else "openpyxl"
+    df = pd.read_excel(file_path, engine=engine, header=None)
     df_new = pd.DataFrame(
         data=df.values[4:], columns=df.iloc[3]).reset_index(drop=True)
     df_new[df.iloc[1, 6]] = df.iloc[1, 7]
@@ -61,6 +114,12 @@ def extract_pcf(file_path: Path) -> pd.DataFrame:
         Single unified DataFrame with holdings + metrics columns
     """
     df = pd.read_csv(file_path, header=None, names=range(25))
+    result = _parse_blocks(df, _PCF_LAYOUT)
+    return result if result is not None else _extract_pcf_blocks(df)
+
+
+def _extract_pcf_blocks(df: pd.DataFrame) -> pd.DataFrame:
+    """Block-by-block PCF parse, used when blocks are too irregular for _parse_blocks."""
     blocks = _split_into_blocks(df, markers="TRADE_DATE")
 
     enriched_holdings_list = []
@@ -83,6 +142,234 @@ def extract_pcf(file_path: Path) -> pd.DataFrame:
     return pd.concat(enriched_holdings_list, ignore_index=True) if enriched_holdings_list else pd.DataFrame()
 
 
+# Block layouts for multi-fund files. Row offsets are relative to the block's
+# marker row (negative offsets count back from the end of the block). Fixed
+# metrics map a key (a literal, or a (row, col) cell holding the key) to the
+# (row, col) of its value; pair rows hold key/value pairs in adjacent columns.
+_PCF_LAYOUT = {
+    "marker": "TRADE_DATE",
+    "header_row": 8,
+    "tail_rows": 0,
+    "fixed": [
+        ((0, 0), (0, 1)),
+        ("SS_LONG_CODE", (0, 2)),
+        ("FULL_NAME", (0, 4)),
+        ("TICKER_1", (0, 5)),
+        ("TICKER_2", (0, 6)),
+        ("BASE_CURRENCY", (0, 7)),
+        ((0, 8), (0, 9)),
+    ],
+    "pair_rows": list(range(1, 8)),
+    "cleared": [],
+}
+_UCF_LAYOUT = {
+    "marker": "FUND_NAME",
+    "header_row": 7,
+    "tail_rows": 16,
+    "fixed": [
+        ("ORDER_TYPE", (6, 0)),
+        ("BROKER_NAME", (3, 2)),
+    ],
+    "pair_rows": list(range(0, 6)) + list(range(-16, 0)),
+    # Broker name sits in a key column; it must not become a column header
+    "cleared": [(3, 2)],
+}
+
+
+def _parse_blocks(df: pd.DataFrame, layout: dict) -> Optional[pd.DataFrame]:
+    """
+    Columnar parse of a multi-block file (one block per fund).
+
+    Finds block boundaries, gathers every block's metric keys/values with array
+    indexing, and builds the output in one pass: holdings rows are taken from
+    the raw array in a single fancy-index and each metric becomes one column
+    repeated by block length. Produces the same frame as the block-by-block
+    parsers, including dtypes.
+
+    Returns None when the file does not fit the regular layout (differing
+    holdings headers or metric keys between blocks, empty or short blocks,
+    numeric raw columns, metric keys matching duplicated holdings columns);
+    callers then fall back to the block-by-block parse.
+    """
+    if not all(_is_text_column(df[c]) for c in df.columns):
+        return None
+
+    first_col = df[0].str.upper().str.startswith(layout["marker"].upper(), na=False)
+    starts = np.flatnonzero(first_col.to_numpy())
+    if len(starts) == 0:
+        return pd.DataFrame()
+    ends = np.append(starts[1:], len(df))
+
+    data_start = starts + layout["header_row"] + 1
+    data_end = ends - layout["tail_rows"]
+    lengths = data_end - data_start
+    if (lengths <= 0).any():
+        return None
+
+    values = df.to_numpy(dtype=object)
+    n_cols = values.shape[1]
+
+    # Holdings header must be identical across blocks
+    headers = values[starts + layout["header_row"]]
+    header_na = pd.isna(headers)
+    if not ((header_na == header_na[0]).all()
+            and (headers[:, ~header_na[0]] == headers[0, ~header_na[0]]).all()):
+        return None
+    header = headers[0].tolist()
+
+    # Gather metric keys/values for all blocks: fixed cells first, then pairs
+    def cell(offset, col):
+        rows = np.where(offset >= 0, starts + offset, ends + offset)
+        return values[rows, col]
+
+    key_cols, value_cols = [], []
+    for key, (row, col) in layout["fixed"]:
+        if isinstance(key, tuple):
+            key_cols.append(cell(*key))
+        else:
+            key_cols.append(np.full(len(starts), key, dtype=object))
+        value_cols.append(cell(row, col))
+    n_fixed = len(key_cols)
+
+    cleared = set(layout["cleared"])
+    for row in layout["pair_rows"]:
+        for col in range(0, n_cols - 1, 2):
+            keys = cell(row, col)
+            if (row, col) in cleared:
+                keys = np.full(len(starts), np.nan, dtype=object)
+            key_cols.append(keys)
+            value_cols.append(cell(row, col + 1))
+
+    keys = np.column_stack(key_cols)
+    metric_values = np.column_stack(value_cols)
+    keep = ~pd.isna(keys)
+    if not keep[:, :n_fixed].all():
+        return None
+    if not ((keep == keep[0]).all() and (keys[:, keep[0]] == keys[0, keep[0]]).all()):
+        return None
+
+    # dict semantics of the block parsers: first position, last value wins
+    positions = {}
+    for idx in np.flatnonzero(keep[0]):
+        positions[keys[0, idx]] = idx
+    if any(header.count(key) > 1 for key in positions):
+        return None
+
+    # Holdings rows for all blocks in one take
+    offsets = np.repeat(data_start - np.cumsum(np.append(0, lengths[:-1])), lengths)
+    row_idx = offsets + np.arange(lengths.sum())
+    holdings = values[row_idx]
+    block_starts = np.append(0, np.cumsum(lengths)[:-1])
+
+    columns = []
+    for j in range(n_cols):
+        column = holdings[:, j]
+        block_na = np.logical_and.reduceat(pd.isna(column), block_starts)
+        columns.append(_block_typed(column, block_na, all_na_dtype=object))
+    names = list(header)
+    for key, idx in positions.items():
+        per_block = metric_values[:, idx]
+        column = _block_typed(np.repeat(per_block, lengths),
+                              pd.isna(per_block), all_na_dtype="float64")
+        if key in header:
+            # Metric overwrites the holdings column of the same name in place
+            columns[header.index(key)] = column
+        else:
+            columns.append(column)
+            names.append(key)
+
+    out = pd.DataFrame(dict(enumerate(columns)))
+    out.columns = names
+    return out
+
+
+def _is_text_column(series: pd.Series) -> bool:
+    """True if a raw read_csv column holds only strings/missing values."""
+    return series.dtype == object or pd.api.types.is_string_dtype(series) or series.isna().all()
+
+
+def _block_typed(column: np.ndarray, block_na: np.ndarray, all_na_dtype) -> pd.Series:
+    """
+    Type a combined column the way per-block frames concatenate: text blocks
+    infer str, all-missing blocks keep all_na_dtype, and a mix of the two
+    concatenates to object.
+    """
+    if not block_na.any():
+        return pd.Series(column, dtype="str")
+    if block_na.all():
+        return pd.Series(column, dtype=all_na_dtype)
+    return pd.Series(column, dtype=object)
+
+
+def iter_pcf_blocks(file_path: Path, chunksize: int = 50_000) -> Iterator[pd.DataFrame]:
+    """Streaming counterpart of extract_pcf: yields one enriched holdings frame per fund block.
+
+    The file is read once in chunks of chunksize lines, so peak memory is about
+    one chunk plus one block rather than the whole file held twice. Raw cells
+    are read as text.
+
+    Returns:
+        Iterator of per-block DataFrames with holdings + metrics columns
+    """
+    return _iter_blocks(file_path, _PCF_LAYOUT, 25, _extract_pcf_blocks, chunksize)
+
+
+def iter_ucf_blocks(file_path: Path, chunksize: int = 50_000) -> Iterator[pd.DataFrame]:
+    """Streaming counterpart of extract_ucf: yields one enriched holdings frame per fund block.
+
+    Returns:
+        Iterator of per-block DataFrames with holdings + metrics columns
+    """
+    return _iter_blocks(file_path, _UCF_LAYOUT, 34, _extract_ucf_blocks, chunksize)
+
+
+def _iter_blocks(file_path: Path, layout: dict, width: int, by_block, chunksize: int) -> Iterator[pd.DataFrame]:
+    """
+    Read a multi-block file chunk by chunk and yield each block as soon as the
+    next marker (or end of file) closes it. The unfinished block at the end of
+    a chunk is carried into the next one; rows before the first marker are
+    dropped, as in _split_into_blocks.
+    """
+    marker = layout["marker"].upper()
+    pending = None
+    with pd.read_csv(file_path, header=None, names=range(width), dtype=str,
+                     chunksize=chunksize) as reader:
+        for chunk in reader:
+            if pending is not None:
+                chunk = pd.concat([pending, chunk], ignore_index=True)
+            starts = np.flatnonzero(
+                chunk[0].str.upper().str.startswith(marker, na=False).to_numpy())
+            if len(starts) == 0:
+                continue
+            yield from _parse_complete_blocks(chunk, starts, layout, by_block)
+            pending = chunk.iloc[starts[-1]:]
+    if pending is not None:
+        yield from _parse_complete_blocks(
+            pending.reset_index(drop=True), np.array([0, len(pending)]), layout, by_block)
+
+
+def _parse_complete_blocks(chunk: pd.DataFrame, bounds: np.ndarray, layout: dict,
+                           by_block) -> Iterator[pd.DataFrame]:
+    """
+    Parse the blocks between consecutive bounds of a chunk in one columnar
+    pass and yield them one at a time; irregular runs fall back to parsing
+    block by block.
+    """
+    if len(bounds) < 2:
+        return
+    run = chunk.iloc[bounds[0]:bounds[-1]].reset_index(drop=True)
+    result = _parse_blocks(run, layout)
+    if result is None:
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            block = chunk.iloc[start:end].reset_index(drop=True)
+            result = _parse_blocks(block, layout)
+            yield result if result is not None else by_block(block)
+        return
+    lengths = np.diff(bounds) - layout["header_row"] - 1 - layout["tail_rows"]
+    for offset, length in zip(np.append(0, np.cumsum(lengths)[:-1]), lengths):
+        yield result.iloc[offset:offset + length]
+
+
 def _split_into_blocks(df: pd.DataFrame, markers: str = "TRADE_DATE") -> list[pd.DataFrame]:
     """Split DataFrame into blocks based on TRADE_DATE marker."""
     # Find all row indices where TRADE_DATE appears
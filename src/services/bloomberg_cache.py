@@ -0,0 +1,314 @@
+"""
+Local cache of Bloomberg reference (BDP) and historical (BDH) data.
+
+Static reference fields (names, identifiers, sectors) and history already
+pulled do not need another trip to the terminal. The cache keeps both in a
+small DuckDB database:
+
+    reference_data      (ticker, field) -> value, fetched_at; served while
+                        younger than the field's BLOOMBERG_REFERENCE_TTL_HOURS
+    history_data        (ticker, field, frequency, date) -> value
+    history_coverage    date ranges per (ticker, field, frequency) already
+                        requested, so BloombergClient.BDH only asks for the gaps
+                        (DAILY history only; other frequencies bypass the cache)
+
+Coverage stops at yesterday: today's values are fetched on every call until
+the day is over. Hits and misses are counted in BloombergCache.stats and
+logged when the cache is closed.
+
+Usage:
+    with BloombergCache() as cache, BloombergClient(cache=cache) as client:
+        client.BDP(tickers, ["NAME", "GICS_SECTOR_NAME"])
+"""
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+from config import BLOOMBERG_CACHE_FILE, BLOOMBERG_REFERENCE_TTL_HOURS
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reference_data (
+    ticker VARCHAR NOT NULL,
+    field VARCHAR NOT NULL,
+    value VARCHAR,                  -- JSON, see _encode
+    fetched_at TIMESTAMP NOT NULL,  -- UTC
+    PRIMARY KEY (ticker, field)
+);
+CREATE TABLE IF NOT EXISTS history_data (
+    ticker VARCHAR NOT NULL,
+    field VARCHAR NOT NULL,
+    frequency VARCHAR NOT NULL,
+    date DATE NOT NULL,
+    value DOUBLE,
+    PRIMARY KEY (ticker, field, frequency, date)
+);
+CREATE TABLE IF NOT EXISTS history_coverage (
+    ticker VARCHAR NOT NULL,
+    field VARCHAR NOT NULL,
+    frequency VARCHAR NOT NULL,
+    start_date DATE NOT NULL,
+    end_date DATE NOT NULL,
+    fetched_at TIMESTAMP NOT NULL   -- UTC
+);
+"""
+
+DateRange = tuple[date, date]
+
+
+@dataclass
+class CacheStats:
+    """Lookups served from the cache vs. sent to the terminal since the cache was opened."""
+    reference_hits: int = 0     # (ticker, field) values served from the cache
+    reference_misses: int = 0   # (ticker, field) values requested from the terminal
+    history_hits: int = 0       # (ticker, field) histories fully covered by the cache
+    history_misses: int = 0     # (ticker, field) histories with at least one gap
+    requests: int = 0           # requests sent to the terminal for misses
+
+    @property
+    def hit_rate(self) -> Optional[float]:
+        lookups = self.reference_hits + self.reference_misses + self.history_hits + self.history_misses
+        return (self.reference_hits + self.history_hits) / lookups if lookups else None
+
+
+class BloombergCache:
+    """Persistent (ticker, field[, date]) cache for BloombergClient. Safe to share between threads."""
+
+    def __init__(self, path: Union[str, Path] = BLOOMBERG_CACHE_FILE, ttl_hours: Optional[dict] = None):
+        """
+        Args:
+            path: DuckDB database file; created with its tables if missing.
+            ttl_hours: Reference TTLs per field, as BLOOMBERG_REFERENCE_TTL_HOURS
+                       (the default).
+        """
+        import duckdb
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_hours = BLOOMBERG_REFERENCE_TTL_HOURS if ttl_hours is None else ttl_hours
+        self.stats = CacheStats()
+        self._con = duckdb.connect(str(self.path))
+        self._con.execute(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "BloombergCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        s = self.stats
+        if s.hit_rate is not None:
+            logger.info(f"Bloomberg cache: reference {s.reference_hits} hits / {s.reference_misses} misses, "
+                        f"history {s.history_hits} hits / {s.history_misses} misses, "
+                        f"{s.requests} requests sent, hit rate {s.hit_rate:.0%}")
+        self._con.close()
+
+    def ttl(self, field: str) -> Optional[timedelta]:
+        """How long a cached value of a reference field is served; None never expires."""
+        hours = self.ttl_hours.get(field, self.ttl_hours.get("default"))
+        return None if hours is None else timedelta(hours=hours)
+
+    def get_reference(self, tickers: Iterable[str], fields: Iterable[str]) -> tuple[dict, dict]:
+        """
+        Cached reference values that are still within their TTL.
+
+        Returns:
+            ({ticker: {field: value}} served from the cache,
+             {ticker: [fields]} to request from the terminal)
+        """
+        tickers, fields = list(dict.fromkeys(tickers)), list(dict.fromkeys(fields))
+        now = _utcnow()
+        with self._lock:
+            rows = self._con.execute(
+                "SELECT ticker, field, value, fetched_at FROM reference_data "
+                "WHERE list_contains(?, ticker) AND list_contains(?, field)", [tickers, fields]).fetchall()
+        fresh = {}
+        for ticker, field, value, fetched_at in rows:
+            ttl = self.ttl(field)
+            if ttl is None or fetched_at + ttl > now:
+                fresh[ticker, field] = _decode(value)
+        with self._lock:
+            self.stats.reference_hits += len(fresh)
+            self.stats.reference_misses += len(tickers) * len(fields) - len(fresh)
+
+        cached, missing = {}, {}
+        for ticker in tickers:
+            for field in fields:
+                if (ticker, field) in fresh:
+                    cached.setdefault(ticker, {})[field] = fresh[ticker, field]
+                else:
+                    missing.setdefault(ticker, []).append(field)
+        return cached, missing
+
+    def count_requests(self, requests: int) -> None:
+        """Count requests sent to the terminal for cache misses."""
+        with self._lock:
+            self.stats.requests += requests
+
+    def put_reference(self, rows: Iterable[dict], fields: Iterable[str]) -> None:
+        """
+        Store BDP rows ({"Ticker": ..., field: value}); fields with a TTL of 0 are not kept.
+
+        Empty (None) values are not kept either, so a field the terminal had
+        no value for is asked for again on the next lookup.
+        """
+        fields = [f for f in fields if self.ttl(f) != timedelta(0)]
+        now = _utcnow()
+        values = [[row["Ticker"], f, _encode(row[f]), now]
+                  for row in rows for f in fields if row.get(f) is not None]
+        if not values:
+            return
+        with self._lock:
+            self._con.executemany(
+                "INSERT OR REPLACE INTO reference_data (ticker, field, value, fetched_at) VALUES (?, ?, ?, ?)",
+                values)
+
+    def missing_ranges(self, tickers: Iterable[str], fields: Iterable[str], frequency: str,
+                       start: date, end: date) -> dict[tuple[str, str], list[DateRange]]:
+        """
+        Parts of [start, end] not yet fetched, per (ticker, field).
+
+        Returns:
+            {(ticker, field): [(gap_start, gap_end), ...]} for the pairs with gaps.
+        """
+        tickers, fields = list(dict.fromkeys(tickers)), list(dict.fromkeys(fields))
+        with self._lock:
+            rows = self._con.execute(
+                "SELECT ticker, field, start_date, end_date FROM history_coverage "
+                "WHERE list_contains(?, ticker) AND list_contains(?, field) AND frequency = ? "
+                "AND start_date <= ? AND end_date >= ?", [tickers, fields, frequency, end, start]).fetchall()
+        covered = {}
+        for ticker, field, range_start, range_end in rows:
+            covered.setdefault((ticker, field), []).append((range_start, range_end))
+
+        missing = {}
+        for ticker in tickers:
+            for field in fields:
+                gaps = _gaps(start, end, covered.get((ticker, field), []))
+                if gaps:
+                    missing[ticker, field] = gaps
+        with self._lock:
+            self.stats.history_misses += len(missing)
+            self.stats.history_hits += len(tickers) * len(fields) - len(missing)
+        return missing
+
+    def put_history(self, rows: list[dict], tickers: Iterable[str], fields: Iterable[str], frequency: str,
+                    start: date, end: date) -> None:
+        """
+        Store BDH rows ({"Ticker", "Date", field: value}) of a request that succeeded.
+
+        Every (ticker, field) of the request is marked as covered from start
+        to end (at most yesterday), including dates without a row (holidays).
+        """
+        import pandas as pd
+
+        tickers, fields = list(tickers), list(fields)
+        values = pd.DataFrame(
+            [(row["Ticker"], f, frequency, _as_date(row["Date"]), row.get(f)) for row in rows for f in fields],
+            columns=["ticker", "field", "frequency", "date", "value"])
+        covered_end = min(end, date.today() - timedelta(days=1))
+        with self._lock:
+            if not values.empty:
+                self._con.register("incoming_history", values)
+                try:
+                    self._con.execute("INSERT OR REPLACE INTO history_data SELECT * FROM incoming_history")
+                finally:
+                    self._con.unregister("incoming_history")
+            if start > covered_end:
+                return
+            existing = self._con.execute(
+                "SELECT ticker, field, start_date, end_date FROM history_coverage "
+                "WHERE list_contains(?, ticker) AND list_contains(?, field) AND frequency = ?",
+                [tickers, fields, frequency]).fetchall()
+            ranges = {(t, f): [(start, covered_end)] for t in tickers for f in fields}
+            for ticker, field, range_start, range_end in existing:
+                ranges[ticker, field].append((range_start, range_end))
+            now = _utcnow()
+            self._con.execute(
+                "DELETE FROM history_coverage "
+                "WHERE list_contains(?, ticker) AND list_contains(?, field) AND frequency = ?",
+                [tickers, fields, frequency])
+            self._con.executemany(
+                "INSERT INTO history_coverage VALUES (?, ?, ?, ?, ?, ?)",
+                [[t, f, frequency, s, e, now] for (t, f), r in ranges.items() for s, e in _merge_ranges(r)])
+
+    def get_history(self, tickers: Iterable[str], fields: Iterable[str], frequency: str,
+                    start: date, end: date) -> list[dict]:
+        """
+        Cached BDH rows between start and end.
+
+        Returns:
+            [{"Ticker", "Date", field: value}], by ticker (in the order given) and date.
+        """
+        tickers, fields = list(dict.fromkeys(tickers)), list(dict.fromkeys(fields))
+        with self._lock:
+            values = self._con.execute(
+                "SELECT ticker, date, field, value FROM history_data "
+                "WHERE list_contains(?, ticker) AND list_contains(?, field) AND frequency = ? "
+                "AND date BETWEEN ? AND ? ORDER BY date", [tickers, fields, frequency, start, end]).fetchall()
+        rows = {}
+        for ticker, day, field, value in values:
+            rows.setdefault(ticker, {}).setdefault(day, {"Ticker": ticker, "Date": day})[field] = value
+        return [row for ticker in tickers for row in rows.get(ticker, {}).values()]
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _as_date(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _gaps(start: date, end: date, ranges: list[DateRange]) -> list[DateRange]:
+    """Parts of [start, end] outside the given ranges."""
+    gaps, cursor = [], start
+    for range_start, range_end in sorted(ranges):
+        if range_end < cursor:
+            continue
+        if range_start > end:
+            break
+        if range_start > cursor:
+            gaps.append((cursor, range_start - timedelta(days=1)))
+        cursor = range_end + timedelta(days=1)
+        if cursor > end:
+            return gaps
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def _merge_ranges(ranges: list[DateRange]) -> list[DateRange]:
+    """Overlapping or adjacent ranges joined into one."""
+    merged = []
+    for range_start, range_end in sorted(ranges):
+        if merged and range_start <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], range_end))
+        else:
+            merged.append((range_start, range_end))
+    return merged
+
+
+def _encode(value) -> str:
+    """JSON for a BDP value; dates and times are tagged so they come back as such."""
+    for kind in (datetime, date, time):
+        if isinstance(value, kind):
+            return json.dumps({f"${kind.__name__}": value.isoformat()})
+    return json.dumps(value)
+
+
+def _decode(value: Optional[str]):
+    value = json.loads(value) if value is not None else None
+    if isinstance(value, dict) and len(value) == 1:
+        (tag, text), = value.items()
+        kind = {"$datetime": datetime, "$date": date, "$time": time}.get(tag)
+        if kind is not None:
+            return kind.fromisoformat(text)
+    return value
@@ -1,9 +1,35 @@
+import itertools
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Optional, Sequence, Union
+
 import pandas as pd
 import numpy as np
-import re
-from blpapi import Session, SessionOptions, Name, Event
-from typing import Sequence
-from datetime import datetime
+
+try:
+    import blpapi
+    from blpapi import Session, SessionOptions, Event
+except ImportError:  # terminals only; tests drive the client with a fake session
+    blpapi = None
+
+logger = logging.getLogger(__name__)
+
+# blpapi.Event types the client waits on (values as in blpapi, for sessions that are not blpapi's)
+RESPONSE = Event.RESPONSE if blpapi else 5
+PARTIAL_RESPONSE = Event.PARTIAL_RESPONSE if blpapi else 6
+SERVICE_STATUS = Event.SERVICE_STATUS if blpapi else 9
+REQUEST_STATUS = Event.REQUEST_STATUS if blpapi else 4
+
+# Securities x fields per request; larger ticker/field lists are split into chunks
+REFERENCE_CHUNK = (100, 50)     # BDP
+HISTORICAL_CHUNK = (25, 25)     # BDH: the API rejects more than 25 fields per request
+BULK_CHUNK_SECURITIES = 10      # BDS: bulk fields are large, one field per request
+MAX_IN_FLIGHT = 4               # requests outstanding on the session at once
+EVENT_TIMEOUT_MS = 500          # nextEvent() poll interval
+REQUEST_TIMEOUT = 300           # seconds without any response before giving up
 
 
 def _parse_element(elem):
@@ -37,32 +63,63 @@ def _parse_element(elem):
         return val_str
 
 
+@dataclass
+class _Chunk:
+    """One request of a split BDH/BDP/BDS call."""
+    securities: list[str]
+    fields: list[str]
+    rows: list = field(default_factory=list)
+    error: Optional[str] = None     # set when the request failed
+
+
 class BloombergClient:
     """Bloomberg API client for retrieving historical and reference data.
 
+    Ticker and field lists of any length are split into requests of at most
+    REFERENCE_CHUNK / HISTORICAL_CHUNK / BULK_CHUNK_SECURITIES securities x
+    fields. Up to max_in_flight requests are outstanding at once; responses
+    are matched to their request by correlation ID and the results are
+    returned in the order of the tickers passed in.
+
+    With a BloombergCache, BDP serves values still within their TTL and BDH
+    only requests the date ranges not fetched before (see
+    src.services.bloomberg_cache).
+
     Use as context manager:
         with BloombergClient() as client:
             df = client.BDP(["AAPL US Equity"], ["NAME", "SECTOR"])
     """
 
-    def __init__(self, host: str = "localhost", port: int = 8194):
+    def __init__(self, host: str = "localhost", port: int = 8194, session=None,
+                 max_in_flight: int = MAX_IN_FLIGHT, cache=None):
         """Initialize and connect to Bloomberg API.
 
         Args:
             host: Bloomberg server hostname (default: localhost)
             port: Bloomberg server port (default: 8194)
+            session: Session to use instead of a blpapi.Session on host:port
+                     (any object with the blpapi Session methods used here)
+            max_in_flight: Requests kept outstanding at once
+            cache: BloombergCache for BDP/BDH, or None to always ask the terminal
         """
-        options = SessionOptions()
-        options.setServerHost(host)
-        options.setServerPort(port)
-        self.session = Session(options)
+        if session is None:
+            if blpapi is None:
+                raise ImportError("blpapi is required to connect to Bloomberg")
+            options = SessionOptions()
+            options.setServerHost(host)
+            options.setServerPort(port)
+            session = Session(options)
+        self.session = session
+        self.max_in_flight = max(1, max_in_flight)
+        self.cache = cache
+        self._correlation_ids = itertools.count(1)
         self.session.start()
         self.session.openService("//blp/refdata")
 
         # Wait for service to be ready
         while True:
             event = self.session.nextEvent()
-            if event.eventType() == Event.SERVICE_STATUS:
+            if event.eventType() == SERVICE_STATUS:
                 break
 
     def __enter__(self):
@@ -86,49 +143,38 @@ class BloombergClient:
             fields: Data fields (e.g., ["PX_LAST", "VOLUME"])
             start_date: Start date YYYYMMDD format
             end_date: End date YYYYMMDD format
-            frequency: DAILY, WEEKLY, MONTHLY, QUARTERLY, YEARLY
+            frequency: DAILY, WEEKLY, MONTHLY, QUARTERLY, YEARLY. Only DAILY
+                       history goes through the cache: other periods are
+                       anchored on the request's dates, so gaps fetched on
+                       their own would not line up with what is cached.
         Returns:
             DataFrame with columns [Ticker, Date, *fields]
         """
-        service = self.session.getService("//blp/refdata")
-        request = service.createRequest("HistoricalDataRequest")
-
-        for ticker in tickers:
-            request.getElement("securities").appendValue(ticker)
-        for field in fields:
-            request.getElement("fields").appendValue(field)
-
-        request.set("startDate", start_date)
-        request.set("endDate", end_date)
-        request.set("periodicitySelection", frequency)
-
-        self.session.sendRequest(request)
-
-        rows = []
-        while True:
-            event = self.session.nextEvent()
-            for msg in event:
-                if msg.messageType() != Name("HistoricalDataResponse"):
-                    continue
-                security_data = msg.getElement("securityData")
-                ticker = security_data.getElementAsString("security")
-                field_data = security_data.getElement("fieldData")
-
-                for i in range(field_data.numValues()):
-                    entry = field_data.getValueAsElement(i)
-                    row = {"Ticker": ticker,
-                           "Date": entry.getElementAsDatetime("date")}
-                    for field in fields:
-                        row[field] = entry.getElementAsFloat(
-                            field) if entry.hasElement(field) else np.nan
-                    rows.append(row)
-
-            if event.eventType() == Event.RESPONSE:
-                break
-
-        df = pd.DataFrame(rows) if rows else pd.DataFrame()
-        df.columns = df.columns.astype(str)
-        return df
+        if self.cache is not None and frequency == "DAILY":
+            return self._cached_history(tickers, fields, start_date, end_date, frequency)
+        chunks = self._history_chunks(tickers, fields, start_date, end_date, frequency)
+        return _merge([row for chunk in chunks for row in chunk.rows], ["Ticker", "Date"], fields, np.nan)
+
+    def _history_chunks(self, tickers: Sequence[str], fields: Sequence[str], start_date: str, end_date: str,
+                        frequency: str) -> list[_Chunk]:
+        def read(msg, chunk):
+            if str(msg.messageType()) != "HistoricalDataResponse":
+                return
+            security_data = msg.getElement("securityData")
+            ticker = security_data.getElementAsString("security")
+            field_data = security_data.getElement("fieldData")
+
+            for i in range(field_data.numValues()):
+                entry = field_data.getValueAsElement(i)
+                row = {"Ticker": ticker,
+                       "Date": entry.getElementAsDatetime("date")}
+                for field in chunk.fields:
+                    row[field] = entry.getElementAsFloat(
+                        field) if entry.hasElement(field) else np.nan
+                chunk.rows.append(row)
+
+        return self._run("HistoricalDataRequest", tickers, fields, HISTORICAL_CHUNK, read,
+                         startDate=start_date, endDate=end_date, periodicitySelection=frequency)
 
     def BDP(self, tickers: Sequence[str], fields: Sequence[str]) -> pd.DataFrame:
         """Fetch reference data for tickers.
@@ -140,88 +186,206 @@ class BloombergClient:
         Returns:
             DataFrame with columns [Ticker, *fields]
         """
-        service = self.session.getService("//blp/refdata")
-        request = service.createRequest("ReferenceDataRequest")
+        if self.cache is not None:
+            return self._cached_reference(tickers, fields)
+        chunks = self._reference_chunks(tickers, fields)
+        return _merge([row for chunk in chunks for row in chunk.rows], ["Ticker"], fields, None)
+
+    def _reference_chunks(self, tickers: Sequence[str], fields: Sequence[str]) -> list[_Chunk]:
+        def read(msg, chunk):
+            if str(msg.messageType()) != "ReferenceDataResponse":
+                return
+            security_data_array = msg.getElement("securityData")
+            for i in range(security_data_array.numValues()):
+                security_data = security_data_array.getValueAsElement(i)
+                ticker = security_data.getElementAsString("security")
+                field_data = security_data.getElement("fieldData")
 
-        for ticker in tickers:
-            request.getElement("securities").appendValue(ticker)
-        for field in fields:
-            request.getElement("fields").appendValue(field)
+                row = {"Ticker": ticker}
+                for field in chunk.fields:
+                    if field_data.hasElement(field):
+                        row[field] = _parse_element(
+                            field_data.getElement(field))
+                    else:
+                        row[field] = None
+                chunk.rows.append(row)
 
-        self.session.sendRequest(request)
+        return self._run("ReferenceDataRequest", tickers, fields, REFERENCE_CHUNK, read)
 
-        rows = []
-        while True:
-            event = self.session.nextEvent()
-            for msg in event:
-                if msg.messageType() != Name("ReferenceDataResponse"):
-                    continue
-                security_data_array = msg.getElement("securityData")
-                for i in range(security_data_array.numValues()):
-                    security_data = security_data_array.getValueAsElement(i)
-                    ticker = security_data.getElementAsString("security")
-                    field_data = security_data.getElement("fieldData")
-
-                    row = {"Ticker": ticker}
-                    for field in fields:
-                        if field_data.hasElement(field):
-                            row[field] = _parse_element(
-                                field_data.getElement(field))
-                        else:
-                            row[field] = None
-                    rows.append(row)
-
-            if event.eventType() == Event.RESPONSE:
-                break
+    def BDS(self, tickers: Union[str, Sequence[str]], field: str) -> pd.DataFrame:
+        """Fetch bulk data for tickers and a field.
+
+        Args:
+            tickers: Security identifier(s) (e.g., "HHIS CN Equity")
+            field: Bulk data field (e.g., "DVD_HIST_ALL")
 
+        Returns:
+            DataFrame with columns [Ticker, *bulk data columns], one row per bulk entry
+        """
+        if isinstance(tickers, str):
+            tickers = [tickers]
+
+        def read(msg, chunk):
+            if str(msg.messageType()) != "ReferenceDataResponse":
+                return
+            security_data_array = msg.getElement("securityData")
+            for i in range(security_data_array.numValues()):
+                security_data = security_data_array.getValueAsElement(i)
+                ticker = security_data.getElementAsString("security")
+                field_data = security_data.getElement("fieldData")
+
+                if field_data.hasElement(field):
+                    bulk_data = field_data.getElement(field)
+                    for k in range(bulk_data.numValues()):
+                        entry = bulk_data.getValueAsElement(k)
+                        row = {"Ticker": ticker}
+                        for j in range(entry.numElements()):
+                            elem = entry.getElement(j)
+                            # Convert blpapi.Name objects to strings
+                            row[str(elem.name())] = elem.getValueAsString()
+                        chunk.rows.append(row)
+
+        chunks = self._run("ReferenceDataRequest", tickers, [field], (BULK_CHUNK_SECURITIES, 1), read)
+        rows = [row for chunk in chunks for row in chunk.rows]
         df = pd.DataFrame(rows) if rows else pd.DataFrame()
         df.columns = df.columns.astype(str)
         return df
 
-    def BDS(self, ticker: str, field: str) -> pd.DataFrame:
-        """Fetch bulk data for a ticker and field.
+    def _cached_reference(self, tickers: Sequence[str], fields: Sequence[str]) -> pd.DataFrame:
+        """BDP through the cache: only (ticker, field) values missing or past their TTL are requested."""
+        values, missing = self.cache.get_reference(tickers, fields)
+        # Tickers missing the same fields share requests
+        groups = {}
+        for ticker, missing_fields in missing.items():
+            groups.setdefault(tuple(missing_fields), []).append(ticker)
+        for group_fields, group_tickers in groups.items():
+            chunks = self._reference_chunks(group_tickers, group_fields)
+            self.cache.count_requests(len(chunks))
+            for chunk in chunks:
+                if chunk.error:
+                    continue
+                self.cache.put_reference(chunk.rows, chunk.fields)
+                for row in chunk.rows:
+                    values.setdefault(row["Ticker"], {}).update(row)
+        rows = [{"Ticker": ticker, **values[ticker]} for ticker in dict.fromkeys(tickers) if ticker in values]
+        return _merge(rows, ["Ticker"], fields, None)
+
+    def _cached_history(self, tickers: Sequence[str], fields: Sequence[str], start_date: str, end_date: str,
+                        frequency: str) -> pd.DataFrame:
+        """BDH through the cache: only the date ranges not covered yet are requested."""
+        start, end = (datetime.strptime(d, "%Y%m%d").date() for d in (start_date, end_date))
+        by_gap = {}
+        for (ticker, field), gaps in self.cache.missing_ranges(tickers, fields, frequency, start, end).items():
+            for gap in gaps:
+                by_gap.setdefault(gap, {}).setdefault(ticker, []).append(field)
+        # (gap, fields) -> tickers missing exactly that range of those fields, one set of requests each
+        groups = {}
+        for gap, missing in by_gap.items():
+            for ticker, missing_fields in missing.items():
+                groups.setdefault((gap, tuple(missing_fields)), []).append(ticker)
+
+        for ((gap_start, gap_end), group_fields), group_tickers in groups.items():
+            chunks = self._history_chunks(group_tickers, group_fields, gap_start.strftime("%Y%m%d"),
+                                          gap_end.strftime("%Y%m%d"), frequency)
+            self.cache.count_requests(len(chunks))
+            for chunk in chunks:
+                if not chunk.error:
+                    self.cache.put_history(chunk.rows, chunk.securities, chunk.fields, frequency,
+                                           gap_start, gap_end)
+        rows = self.cache.get_history(tickers, fields, frequency, start, end)
+        return _merge(rows, ["Ticker", "Date"], fields, np.nan)
+
+    def _run(self, operation: str, tickers: Sequence[str], fields: Sequence[str], chunk_size: tuple[int, int],
+             read: Callable, **settings) -> list[_Chunk]:
+        """Send one request per chunk of tickers x fields, keeping max_in_flight outstanding.
 
         Args:
-            ticker: Security identifier (e.g., "HHIS CN Equity")
-            field: Bulk data field (e.g., "DVD_HIST_ALL")
+            operation: refdata request type (e.g., "ReferenceDataRequest")
+            tickers: Security identifiers
+            fields: Data fields
+            chunk_size: (securities, fields) per request
+            read: Called with (message, chunk) for every response message of a chunk
+            **settings: Request elements set on every request (e.g., startDate)
 
         Returns:
-            DataFrame with bulk data rows
+            The chunks, in ticker order, with the rows read into them. A
+            chunk whose request failed is logged and has its error set.
         """
+        tickers, fields = list(dict.fromkeys(tickers)), list(dict.fromkeys(fields))
+        securities_per, fields_per = chunk_size
+        chunks = [_Chunk(securities, chunk_fields) for securities, chunk_fields in
+                  itertools.product(_batched(tickers, securities_per), _batched(fields, fields_per))]
         service = self.session.getService("//blp/refdata")
-        request = service.createRequest("ReferenceDataRequest")
-        request.getElement("securities").appendValue(ticker)
-        request.getElement("fields").appendValue(field)
-        self.session.sendRequest(request)
+        pending, in_flight = deque(chunks), {}
+        deadline = time.monotonic() + REQUEST_TIMEOUT
+
+        while pending or in_flight:
+            while pending and len(in_flight) < self.max_in_flight:
+                chunk = pending.popleft()
+                request = service.createRequest(operation)
+                for ticker in chunk.securities:
+                    request.getElement("securities").appendValue(ticker)
+                for field in chunk.fields:
+                    request.getElement("fields").appendValue(field)
+                for name, value in settings.items():
+                    request.set(name, value)
+                correlation_id = next(self._correlation_ids)
+                self.session.sendRequest(request, correlationId=_correlation_id(correlation_id))
+                in_flight[correlation_id] = chunk
+
+            event = self.session.nextEvent(EVENT_TIMEOUT_MS)
+            event_type = event.eventType()
+            if event_type not in (RESPONSE, PARTIAL_RESPONSE, REQUEST_STATUS):
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"{operation}: no response for {REQUEST_TIMEOUT}s "
+                                       f"({len(in_flight)} requests outstanding, {len(pending)} queued)")
+                continue
+            deadline = time.monotonic() + REQUEST_TIMEOUT
 
-        rows = []
-        while True:
-            event = self.session.nextEvent()
             for msg in event:
-                if msg.messageType() != Name("ReferenceDataResponse"):
+                correlation_id = _correlation_value(msg.correlationId())
+                chunk = in_flight.get(correlation_id)
+                if chunk is None:
+                    continue
+                if event_type == REQUEST_STATUS or msg.hasElement("responseError"):
+                    # RequestFailure, or the request was rejected (e.g., too many fields)
+                    chunk.error = str(msg)
+                    in_flight.pop(correlation_id)
+                    logger.error(f"{operation} failed for {len(chunk.securities)} securities "
+                                 f"x {len(chunk.fields)} fields: {chunk.error.strip()}")
                     continue
+                read(msg, chunk)
+                if event_type == RESPONSE:
+                    in_flight.pop(correlation_id)
 
-                security_data = msg.getElement(
-                    "securityData").getValueAsElement(0)
-                field_data = security_data.getElement("fieldData")
+        failed = sum(1 for chunk in chunks if chunk.error)
+        logger.info(f"{operation}: {len(tickers)} securities x {len(fields)} fields in "
+                    f"{len(chunks)} requests ({failed} failed)")
+        return chunks
 
-                if field_data.hasElement(field):
-                    bulk_data = field_data.getElement(field)
-                    for i in range(bulk_data.numValues()):
-                        entry = bulk_data.getValueAsElement(i)
-                        row = {}
-                        for j in range(entry.numElements()):
-                            elem = entry.getElement(j)
-                            row[elem.name()] = elem.getValueAsString()
-                        rows.append(row)
 
-            if event.eventType() == Event.RESPONSE:
-                break
+def _batched(items: list, size: int) -> list[list]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
 
-        df = pd.DataFrame(rows) if rows else pd.DataFrame()
-        # Convert blpapi.Name objects to strings
-        df.columns = df.columns.astype(str)
-        return df
+
+def _correlation_id(value: int):
+    return blpapi.CorrelationId(value) if blpapi else value
+
+
+def _correlation_value(correlation_id) -> int:
+    return correlation_id.value() if hasattr(correlation_id, "value") else correlation_id
+
+
+def _merge(rows: list[dict], keys: list[str], fields: Sequence[str], missing) -> pd.DataFrame:
+    """Join rows of requests that split the fields back into one row per key, in the order of the rows."""
+    merged = {}
+    for row in rows:
+        merged.setdefault(tuple(row[k] for k in keys), {}).update(row)
+    columns = keys + list(dict.fromkeys(fields))
+    rows = [{column: row.get(column, missing) for column in columns} for row in merged.values()]
+    df = pd.DataFrame(rows) if rows else pd.DataFrame()
+    df.columns = df.columns.astype(str)
+    return df
 
 
 if __name__ == "__main__":
@@ -238,7 +402,6 @@ if __name__ == "__main__":
         print(ref.head())
 
         # Bulk Data
-        bulk = client.BDS("HPYE CN Equity", "DVD_HIST_ALL")
-        bulk['Ticker'] = "HPYE CN Equity"
+        bulk = client.BDS(["HPYE CN Equity", "HTAE CN Equity"], "DVD_HIST_ALL")
         print("\nBulk Data:\n")
         print(bulk.head(20))
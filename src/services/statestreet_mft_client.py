@@ -1,17 +1,66 @@
 # State Street MFT client for file transfers.
 
+import hashlib
+import io
+import json
 import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
 from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
 import requests
 import urllib3
+from requests.adapters import HTTPAdapter
 
-from config import MFT_BASE_URL, MFT_USERNAME, MFT_PASSWORD, MFT_CERT_PATH, MFT_KEY_PATH, RAW_DATA_DIR
+from config import MFT_BASE_URL, MFT_USERNAME, MFT_PASSWORD, MFT_CERT_PATH, MFT_KEY_PATH, MFT_MANIFEST_FILE, \
+    RAW_DATA_DIR, INBOX_DIR
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024           # bytes per read/write while downloading
+DOWNLOAD_TIMEOUT = (10, 120)                # (connect, read) seconds
+DOWNLOAD_RETRIES = 3                        # resumed attempts after a dropped connection
+FILE_SIZE_ATTRIBUTE = "FSR_FILE_SYS_MD.FILE_SIZE"
+# list_files attributes ending in one of these names are checked as a hex digest of the file
+CHECKSUM_ALGORITHMS = ("sha256", "sha1", "md5")
+
+
+@dataclass
+class Transfer:
+    """Outcome of one file download."""
+    remote_path: str
+    local_path: Optional[Path] = None
+    bytes: int = 0                  # bytes received by this call
+    resumed_from: int = 0           # bytes already in the .part file when the transfer started
+    seconds: float = 0.0
+    skipped: bool = False           # already present with the expected size
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class SyncReport:
+    """What sync() found in a remote folder and did about it."""
+    remote_folder: str
+    listed: int = 0
+    new: list[str] = field(default_factory=list)        # fetched, not seen before
+    changed: list[str] = field(default_factory=list)    # fetched, size/mtime/checksum differ from the manifest
+    unchanged: int = 0
+    downloaded: list[str] = field(default_factory=list)   # written to the inbox
+    failed: dict[str, str] = field(default_factory=dict)  # filename -> error; retried next sync
+    bytes: int = 0
+    seconds: float = 0.0
+
 
 class StateStreetMFTClient:
     """Client for downloading and uploading files to State Street MFT."""
@@ -19,6 +68,7 @@ class StateStreetMFTClient:
     def __init__(self, download_dir: Path = None):
         self.download_dir = Path(download_dir or RAW_DATA_DIR)
         self.session = None
+        self._pool_size = 0
 
     def __enter__(self) -> "StateStreetMFTClient":
         self.session = self._login()
@@ -45,13 +95,23 @@ class StateStreetMFTClient:
         logger.info("Authenticated with MFT")
         return session
 
-    def download(self, remote_path: str, local_filename: str = None, skip_existing: bool = False) -> Path:
+    def download(self, remote_path: str, local_filename: str = None, skip_existing: bool = False,
+                 expected_size: int = None, checksum: tuple[str, str] = None) -> Path:
         """Download file from MFT.
 
+        The file is written to "<name>.part" and renamed into place once complete
+        and verified, so an interrupted transfer never leaves a truncated file
+        under the real name. A dropped connection is resumed with a Range
+        request; a .part file left by an earlier call is only resumed when a
+        checksum is given (it may belong to an earlier version of the file),
+        otherwise it is downloaded again.
+
         Args:
             remote_path: Remote file path (e.g., '/ETFGlobalHarvest/fromSSC/file.csv').
             local_filename: Local filename. Defaults to remote filename.
             skip_existing: If True, skip download when local file already exists.
+            expected_size: Size from the listing; the download must match it.
+            checksum: (algorithm, hex digest) the download must match, e.g. ("md5", "9e10...").
         """
         filename = local_filename or Path(remote_path).name
         file_path = self.download_dir / filename
@@ -60,18 +120,292 @@ class StateStreetMFTClient:
             logger.info(f"Skipped (exists): {filename}")
             return file_path
 
-        logger.info(f"Downloading: {filename}")
-        response = self.session.get(
-            f"{MFT_BASE_URL}/files{remote_path}?attachment=", timeout=30, stream=True)
+        transfer = self._fetch(remote_path, file_path, expected_size, checksum)
+        if not transfer.ok:
+            raise IOError(f"Download failed: {filename}: {transfer.error}")
+        return file_path
+
+    def download_many(self, remote_folder: str, files: list = None, workers: int = 4,
+                      skip_existing: bool = True, download_dir: Path = None,
+                      part_dir: Path = None) -> list[Transfer]:
+        """Download a folder listing concurrently.
+
+        Files are fetched by up to `workers` threads over one pooled session,
+        each as in download(): large chunks, resume of a previous .part file,
+        rename into place once the size (and checksum, when the listing has
+        one) matches the list_files attributes. A failed file does not stop
+        the others.
+
+        Args:
+            remote_folder: Folder path (e.g., '/ETFGlobalHarvest/fromSSC').
+            files: list_files entries to fetch. Defaults to the whole folder.
+            workers: Parallel downloads.
+            skip_existing: Skip files already downloaded with the listed size.
+            download_dir: Target directory. Defaults to the client's download_dir.
+            part_dir: Directory for the .part files (same filesystem as
+                      download_dir). Defaults to download_dir.
+
+        Returns:
+            One Transfer per file, in listing order.
+        """
+        download_dir = Path(download_dir or self.download_dir)
+        if files is None:
+            files = self.list_files(remote_folder)
+        entries = [entry for entry in files if not entry.get("directory")]
+        self._pool(workers)
+
+        def fetch(entry: dict) -> Transfer:
+            remote_path = f"{remote_folder.rstrip('/')}/{entry['filename']}"
+            file_path = download_dir / entry["filename"]
+            expected_size = listed_size(entry)
+            if skip_existing and file_path.exists() and expected_size in (None, file_path.stat().st_size):
+                return Transfer(remote_path, file_path, skipped=True)
+            return self._fetch(remote_path, file_path, expected_size, listed_checksum(entry), part_dir)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            transfers = list(pool.map(fetch, entries))
+
+        failed = [t for t in transfers if not t.ok]
+        received = sum(t.bytes for t in transfers)
+        seconds = time.perf_counter() - started
+        logger.info(
+            f"Downloaded {sum(1 for t in transfers if t.ok and not t.skipped)} files "
+            f"({received / 2**20:.1f} MB in {seconds:.1f}s), skipped "
+            f"{sum(1 for t in transfers if t.skipped)}, failed {len(failed)}: {remote_folder}")
+        for t in failed:
+            logger.error(f"Download failed: {t.remote_path}: {t.error}")
+        return transfers
+
+    def sync(self, remote_folder: str, inbox_dir: Path = None, workers: int = 4,
+             manifest_path: Path = None, seed: bool = False) -> SyncReport:
+        """Fetch new or restated files of a remote folder into the inbox.
+
+        A manifest (JSON, per remote folder) keeps the listed size,
+        modification stamp and checksum of every file already synced. A file
+        is fetched when it is not in the manifest or any of those differ, so
+        a file restated under the same name is pulled again. Files land in
+        the inbox only once complete: .part files are kept in a hidden
+        subfolder, which main() and the inbox watcher do not pick up. The
+        manifest is updated for successful files only, so failures are
+        retried on the next sync.
+
+        Args:
+            remote_folder: Folder path (e.g., '/ETFGlobalHarvest/fromSSC').
+            inbox_dir: Where fetched files go. Defaults to INBOX_DIR.
+            workers: Parallel downloads.
+            manifest_path: Manifest file. Defaults to MFT_MANIFEST_FILE.
+            seed: Record the current listing as synced without downloading
+                  (first sync of a folder whose history is already loaded).
+        """
+        inbox_dir = Path(inbox_dir or INBOX_DIR)
+        manifest_path = Path(manifest_path or MFT_MANIFEST_FILE)
+        started = time.perf_counter()
+        seen = _read_manifest(manifest_path).get(remote_folder, {})
+        report = SyncReport(remote_folder)
+
+        entries = [entry for entry in self.list_files(remote_folder) if not entry.get("directory")]
+        report.listed = len(entries)
+        fetch = []
+        for entry in entries:
+            name = entry["filename"]
+            if name not in seen:
+                report.new.append(name)
+            elif seen[name]["stamp"] != _listed_stamp(entry):
+                report.changed.append(name)
+            else:
+                report.unchanged += 1
+                continue
+            fetch.append(entry)
+
+        if seed:
+            transfers = [Transfer(f"{remote_folder.rstrip('/')}/{e['filename']}", skipped=True) for e in fetch]
+        else:
+            transfers = self.download_many(remote_folder, fetch, workers=workers, skip_existing=False,
+                                           download_dir=inbox_dir, part_dir=inbox_dir / ".mft_partial")
+        for entry, transfer in zip(fetch, transfers):
+            if transfer.ok and not transfer.skipped:
+                report.downloaded.append(entry["filename"])
+            elif not transfer.ok:
+                report.failed[entry["filename"]] = transfer.error
+            report.bytes += transfer.bytes
+        self.mark_synced(remote_folder, [e for e, t in zip(fetch, transfers) if t.ok], manifest_path)
+
+        report.seconds = time.perf_counter() - started
+        logger.info(
+            f"Synced {remote_folder}: {report.listed} listed, {len(report.new)} new, "
+            f"{len(report.changed)} changed, {report.unchanged} unchanged, {len(report.failed)} failed"
+            + (" (seeded, nothing downloaded)" if seed else ""))
+        return report
+
+    def changes(self, remote_folder: str, manifest_path: Path = None) -> list[dict]:
+        """list_files entries that sync() would fetch: not in the manifest, or restated since.
+
+        Args:
+            remote_folder: Folder path (e.g., '/ETFGlobalHarvest/fromSSC').
+            manifest_path: Manifest file. Defaults to MFT_MANIFEST_FILE.
+        """
+        seen = _read_manifest(Path(manifest_path or MFT_MANIFEST_FILE)).get(remote_folder, {})
+        return [entry for entry in self.list_files(remote_folder)
+                if not entry.get("directory")
+                and seen.get(entry["filename"], {}).get("stamp") != _listed_stamp(entry)]
+
+    def mark_synced(self, remote_folder: str, entries: list[dict], manifest_path: Path = None) -> None:
+        """Record list_files entries as synced in the manifest.
+
+        Args:
+            remote_folder: Folder the entries were listed from.
+            entries: list_files entries fetched successfully.
+            manifest_path: Manifest file. Defaults to MFT_MANIFEST_FILE.
+        """
+        manifest_path = Path(manifest_path or MFT_MANIFEST_FILE)
+        manifest = _read_manifest(manifest_path)
+        seen = manifest.setdefault(remote_folder, {})
+        synced_at = datetime.now().isoformat(timespec="seconds")
+        for entry in entries:
+            seen[entry["filename"]] = {"stamp": _listed_stamp(entry), "synced_at": synced_at}
+        _write_manifest(manifest_path, manifest)
+
+    @contextmanager
+    def open_stream(self, remote_path: str, archive_path: Path = None, expected_size: int = None,
+                    checksum: tuple[str, str] = None, fingerprint=None) -> Iterator[BinaryIO]:
+        """Open a remote file as a binary stream, archiving the bytes as they are read.
+
+        The stream can be handed to any parser that reads file objects
+        (pandas.read_csv, pyarrow.csv, src.parsers.read_csv). Every block read
+        is also written to archive_path + ".part" and hashed, so the file is
+        downloaded once and never read back from disk. When the block exits,
+        whatever the parser left unread is drained into the archive, the size
+        and checksum are verified, and the archive is renamed into place. If
+        the block raises or the verification fails, the partial archive is
+        removed and the error propagates.
+
+        Args:
+            remote_path: Remote file path (e.g., '/ETFGlobalHarvest/fromSSC/file.csv').
+            archive_path: Where to keep a copy of the file, or None for no copy.
+            expected_size: Size from the listing; the stream must match it.
+            checksum: (algorithm, hex digest) the stream must match.
+            fingerprint: hashlib-style object updated with every byte (e.g.
+                         src.ledger.fingerprint_hash()), complete once the
+                         block has exited without error.
+        """
+        response = self.session.get(f"{MFT_BASE_URL}/files{remote_path}?attachment=",
+                                    timeout=DOWNLOAD_TIMEOUT, stream=True)
         response.raise_for_status()
+        response.raw.decode_content = True
+        part_path = archive = None
+        if archive_path is not None:
+            archive_path = Path(archive_path)
+            archive_path.parent.mkdir(parents=True, exist_ok=True)
+            part_path = archive_path.with_name(archive_path.name + ".part")
+            archive = open(part_path, "wb")
+        tee = _TeeReader(response.raw, archive, checksum[0] if checksum else None, fingerprint)
+        completed = False
+        try:
+            yield io.BufferedReader(tee, buffer_size=DOWNLOAD_CHUNK_SIZE)
+            tee.drain()
+            if expected_size is not None and tee.bytes != expected_size:
+                raise IOError(f"{remote_path}: size {tee.bytes} != listed size {expected_size}")
+            if checksum is not None and tee.hash.hexdigest() != checksum[1].lower():
+                raise IOError(f"{remote_path}: {checksum[0]} {tee.hash.hexdigest()} != listed {checksum[1]}")
+            if archive is not None:
+                archive.close()
+                os.replace(part_path, archive_path)
+            completed = True
+            logger.info(f"Streamed: {Path(remote_path).name} ({tee.bytes} bytes)")
+        finally:
+            response.close()
+            if archive is not None:
+                archive.close()
+                if not completed:
+                    part_path.unlink(missing_ok=True)
 
-        self.download_dir.mkdir(parents=True, exist_ok=True)
-        with open(file_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+    def _pool(self, size: int) -> None:
+        """Let the session keep up to `size` connections open for concurrent downloads."""
+        if size > self._pool_size:
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size)
+            self.session.mount("https://", adapter)
+            self.session.mount("http://", adapter)
+            self._pool_size = size
 
-        logger.info(f"Downloaded: {filename}")
-        return file_path
+    def _fetch(self, remote_path: str, file_path: Path, expected_size: int = None,
+               checksum: tuple[str, str] = None, part_dir: Path = None) -> Transfer:
+        """Download to file_path + ".part", resuming it if present, verify, then rename into place."""
+        part_path = Path(part_dir or file_path.parent) / (file_path.name + ".part")
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        part_path.parent.mkdir(parents=True, exist_ok=True)
+        started = time.perf_counter()
+        transfer = Transfer(remote_path, file_path)
+        if part_path.exists() and not self._reusable_part(part_path, expected_size, checksum):
+            part_path.unlink()
+        transfer.resumed_from = part_path.stat().st_size if part_path.exists() else 0
+
+        logger.info(f"Downloading: {file_path.name}"
+                    + (f" (resuming at {transfer.resumed_from} bytes)" if transfer.resumed_from else ""))
+        try:
+            for attempt in range(DOWNLOAD_RETRIES + 1):
+                try:
+                    transfer.bytes += self._stream_to(remote_path, part_path, expected_size)
+                    break
+                except (requests.ConnectionError, requests.Timeout,
+                        requests.exceptions.ChunkedEncodingError) as e:
+                    if attempt == DOWNLOAD_RETRIES:
+                        raise
+                    logger.warning(f"Download interrupted, resuming: {file_path.name}: {e}")
+                    time.sleep(min(2 ** attempt, 30))
+
+            size = part_path.stat().st_size
+            if expected_size is not None and size != expected_size:
+                part_path.unlink()
+                raise IOError(f"size {size} != listed size {expected_size}")
+            if checksum is not None:
+                algorithm, expected = checksum
+                digest = _file_checksum(part_path, algorithm)
+                if digest != expected.lower():
+                    part_path.unlink()
+                    raise IOError(f"{algorithm} {digest} != listed {expected}")
+            os.replace(part_path, file_path)
+        except Exception as e:
+            transfer.error = str(e)
+        transfer.seconds = time.perf_counter() - started
+        if transfer.ok:
+            logger.info(f"Downloaded: {file_path.name}")
+        return transfer
+
+    @staticmethod
+    def _reusable_part(part_path: Path, expected_size: Optional[int], checksum: Optional[tuple[str, str]]) -> bool:
+        """Whether a .part file left by an earlier run can be resumed.
+
+        The file may be from an earlier version of a file restated under the
+        same name, so it is only kept when the result can be verified: with a
+        listed checksum, and matching it already if the .part is complete.
+        """
+        if checksum is None:
+            return False
+        size = part_path.stat().st_size
+        if expected_size is None or size < expected_size:
+            return True
+        return size == expected_size and _file_checksum(part_path, checksum[0]) == checksum[1].lower()
+
+    def _stream_to(self, remote_path: str, part_path: Path, expected_size: int = None) -> int:
+        """Append the rest of the remote file to part_path; returns the bytes received."""
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        if expected_size is not None and offset == expected_size:
+            return 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        with self.session.get(f"{MFT_BASE_URL}/files{remote_path}?attachment=", headers=headers,
+                              timeout=DOWNLOAD_TIMEOUT, stream=True) as response:
+            if response.status_code == 416:  # nothing past offset: the .part file is complete
+                return 0
+            response.raise_for_status()
+            if response.status_code != 206:  # Range ignored: start over
+                offset = 0
+            received = 0
+            with open(part_path, "ab" if offset else "wb") as f:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+                    received += len(chunk)
+        return received
 
     def list_files(self, remote_folder: str) -> list:
         """List files in MFT folder.
@@ -100,15 +434,89 @@ class StateStreetMFTClient:
         return True
 
 
+class _TeeReader(io.RawIOBase):
+    """Raw stream over an HTTP body that copies every block read into an archive file and hashes."""
+
+    def __init__(self, raw, archive=None, algorithm: str = None, fingerprint=None):
+        self.raw = raw
+        self.archive = archive
+        self.hash = hashlib.new(algorithm) if algorithm else None
+        self.fingerprint = fingerprint
+        self.bytes = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self.raw.read(len(buffer))
+        n = len(data)
+        buffer[:n] = data
+        if self.archive is not None:
+            self.archive.write(data)
+        if self.hash is not None:
+            self.hash.update(data)
+        if self.fingerprint is not None:
+            self.fingerprint.update(data)
+        self.bytes += n
+        return n
+
+    def drain(self) -> None:
+        """Read (and archive) the rest of the body."""
+        buffer = bytearray(DOWNLOAD_CHUNK_SIZE)
+        while self.readinto(buffer):
+            pass
+
+
+def _file_checksum(file_path: Path, algorithm: str) -> str:
+    digest = hashlib.new(algorithm)
+    with open(file_path, "rb") as f:
+        while chunk := f.read(DOWNLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def listed_size(entry: dict) -> Optional[int]:
+    """File size in bytes from a list_files entry, if the listing has one."""
+    size = entry.get("attributes", {}).get(FILE_SIZE_ATTRIBUTE)
+    return int(size) if size not in (None, "") else None
+
+
+def _listed_stamp(entry: dict) -> list:
+    """What identifies a version of a listed file: [size, modification stamp, checksum]."""
+    attributes = entry.get("attributes", {})
+    modified = next((value for name, value in attributes.items() if "MODIF" in name.upper()), None)
+    modified = modified or entry.get("lastModified") or entry.get("modified")
+    checksum = listed_checksum(entry)
+    return [listed_size(entry), modified, checksum[1].lower() if checksum else None]
+
+
+def _read_manifest(manifest_path: Path) -> dict:
+    if not manifest_path.exists():
+        return {}
+    return json.loads(manifest_path.read_text())
+
+
+def _write_manifest(manifest_path: Path, manifest: dict) -> None:
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = manifest_path.with_name(manifest_path.name + ".tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2))
+    tmp_path.replace(manifest_path)
+
+
+def listed_checksum(entry: dict) -> Optional[tuple[str, str]]:
+    """(algorithm, hex digest) from a list_files attribute named like "...MD5", if the listing has one."""
+    for name, value in entry.get("attributes", {}).items():
+        suffix = name.rsplit(".", 1)[-1].lower().replace("-", "")
+        for algorithm in CHECKSUM_ALGORITHMS:
+            if value and suffix.endswith(algorithm):
+                return algorithm, str(value)
+    return None
+
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
 
     with StateStreetMFTClient() as client:
-        files = client.list_files("/ETFGlobalHarvest/fromSSC")
-        for f in files:
-            if not f.get("directory"):
-                logger.info(
-                    f"  {f.get('filename')} ({f.get('attributes', {}).get('FSR_FILE_SYS_MD.FILE_SIZE', '?')} bytes)")
-
-        client.download(
-            "/ETFGlobalHarvest/fromSSC/Harvest_Preburst_INKIND_ALL.20260317.TXT")
+        report = client.sync("/ETFGlobalHarvest/fromSSC")
+        for filename in report.downloaded:
+            logger.info(f"  {filename}")
@@ -0,0 +1,308 @@
+"""
+Per-stage timing and row counts for pipeline runs.
+
+Stages run inside span(...) (or a function decorated with @traced), which
+measures wall time, CPU time and memory, and carries the rows going in and
+out. Spans are only kept while a run is being recorded:
+
+    with recording(batch_id, "main", RUN_METRICS_TABLE), span("run"):
+        ...  # parse, bronze, silver: nested spans, on any thread
+
+On exit the run's spans are summarised in the log and appended to the
+pipeline_runs Delta table, one row per span, so slow stages can be queried
+over time:
+
+    SELECT stage, table_name, avg(wall_seconds) FROM delta_scan('.../pipeline_runs')
+    GROUP BY ALL ORDER BY 3 DESC
+
+Outside recording() span and @traced only time nothing and cost a function
+call. A span finds its parent through a ContextVar, so work handed to a
+thread pool must run in a copy of the submitting context to nest under it:
+
+    pool.submit(contextvars.copy_context().run, write, mapping, parsed)
+
+Worker processes have no recorder of their own; run the function through
+collected() there and pass the spans it returns to adopt() in the parent.
+
+CPU time and memory are process-wide. process_peak_rss_mb is the process's
+high-water mark when the span closed, not the span's own peak;
+peak_rss_growth_mb is how far the span raised that mark (0 when it stayed
+below an earlier peak). With concurrent writers both include the other
+threads' work.
+"""
+import functools
+import inspect
+import itertools
+import sys
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter, process_time
+from typing import Callable, Iterator, Optional, Union
+
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class Span:
+    stage: str                          # e.g. "parse", "bronze_write", "clean"
+    table_name: Optional[str] = None    # bronze/silver table, inherited from the parent span
+    file_name: Optional[str] = None     # inbox file, inherited from the parent span
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    span_id: int = 0
+    parent_id: Optional[int] = None
+    started_at: Optional[datetime] = None   # UTC
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    process_peak_rss_mb: Optional[float] = None     # process high-water mark when the span closed
+    peak_rss_growth_mb: Optional[float] = None      # how far the span raised the high-water mark
+    status: str = "ok"                      # "ok" | "error"
+    error: Optional[str] = None
+
+
+class RunRecorder:
+    """Spans of one run (one batch_id), collected from every thread of the process."""
+
+    def __init__(self, batch_id: str, mode: str):
+        """
+        Args:
+            batch_id: batch_id of the run, as written to bronze.
+            mode: How the pipeline was started: "main", "watch", "silver", ...
+        """
+        self.batch_id = batch_id
+        self.mode = mode
+        self.started_at = datetime.now(timezone.utc)
+        self.spans: list[Span] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def summary(self) -> dict[str, dict]:
+        """Totals per stage: {stage: {"count", "seconds", "rows_in", "rows_out"}}."""
+        totals = {}
+        for span in self.spans:
+            total = totals.setdefault(span.stage, {"count": 0, "seconds": 0.0, "rows_in": 0, "rows_out": 0})
+            total["count"] += 1
+            total["seconds"] += span.wall_seconds
+            total["rows_in"] += span.rows_in or 0
+            total["rows_out"] += span.rows_out or 0
+        return totals
+
+    def rows(self) -> list[dict]:
+        """One pipeline_runs row per span."""
+        run = {"batch_id": self.batch_id, "mode": self.mode, "run_started_at": self.started_at}
+        return [{**run, **asdict(span)} for span in self.spans]
+
+    def write(self, table_path: Union[str, Path]) -> int:
+        """
+        Append the run's spans to the pipeline_runs Delta table.
+
+        Args:
+            table_path: Delta table directory; created on first write.
+
+        Returns:
+            Number of rows written.
+        """
+        import deltalake
+        import pyarrow as pa
+
+        rows = self.rows()
+        if rows:
+            deltalake.write_deltalake(
+                str(table_path), pa.Table.from_pylist(rows, schema=_run_schema()),
+                mode="append", schema_mode="merge")
+        return len(rows)
+
+
+_recorder: Optional[RunRecorder] = None
+_current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+@contextmanager
+def recording(batch_id: str, mode: str, table_path: Union[str, Path, None] = None) -> Iterator[RunRecorder]:
+    """
+    Record every span opened in this process until the block exits.
+
+    Args:
+        batch_id: batch_id of the run.
+        mode: How the pipeline was started ("main", "watch", "silver").
+        table_path: pipeline_runs Delta table to append the spans to on exit,
+                    or None to only log the summary. A failed write is logged,
+                    never raised.
+    """
+    global _recorder
+    previous, _recorder = _recorder, RunRecorder(batch_id, mode)
+    recorder = _recorder
+    try:
+        yield recorder
+    finally:
+        _recorder = previous
+        totals = recorder.summary()
+        if totals:
+            logger.info("Run stages | batch_id=%s | mode=%s | %s", batch_id, mode, " | ".join(
+                f"{stage}={t['seconds']:.2f}s/{t['count']}x/{t['rows_out'] or t['rows_in']} rows"
+                for stage, t in totals.items()))
+        if table_path is not None:
+            try:
+                recorder.write(table_path)
+            except Exception as e:
+                logger.warning("Could not write run metrics | batch_id=%s | table=%s | error=%s",
+                               batch_id, table_path, str(e))
+
+
+@contextmanager
+def span(stage: str, table_name: Optional[str] = None, file_name: Optional[str] = None,
+         rows_in: Optional[int] = None) -> Iterator[Span]:
+    """
+    Time a stage. Set rows_out (or rows_in) on the yielded Span inside the block.
+
+    Args:
+        stage: Stage name.
+        table_name: Table the stage works on; defaults to the enclosing span's.
+        file_name: Inbox file the stage works on; defaults to the enclosing span's.
+        rows_in: Rows going into the stage, if known up front.
+    """
+    recorder = _recorder
+    current = Span(stage, table_name, file_name, rows_in)
+    if recorder is None:
+        yield current
+        return
+
+    parent = _current.get()
+    if parent is not None:
+        current.parent_id = parent.span_id
+        current.table_name = current.table_name or parent.table_name
+        current.file_name = current.file_name or parent.file_name
+    current.span_id = next(recorder._ids)
+    current.started_at = datetime.now(timezone.utc)
+    token = _current.set(current)
+    wall, cpu, rss = perf_counter(), process_time(), peak_rss_mb()
+    try:
+        yield current
+    except BaseException as e:
+        current.status, current.error = "error", f"{type(e).__name__}: {e}"[:1000]
+        raise
+    finally:
+        current.wall_seconds = perf_counter() - wall
+        current.cpu_seconds = process_time() - cpu
+        current.process_peak_rss_mb = peak_rss_mb()
+        if rss is not None:
+            current.peak_rss_growth_mb = round(current.process_peak_rss_mb - rss, 1)
+        _current.reset(token)
+        recorder.add(current)
+
+
+def traced(stage: str, table_name: Optional[Callable[[dict], str]] = None,
+           rows_in: Optional[Callable[[dict], int]] = None,
+           rows_out: Optional[Callable[[object], int]] = None):
+    """
+    Decorator running a function inside span(stage).
+
+    Args:
+        stage: Stage name.
+        table_name: Table name from the call's arguments ({parameter: value}).
+        rows_in: Input row count from the call's arguments.
+        rows_out: Output row count from the return value.
+        A count that cannot be taken (e.g. len() of a stream) is left empty.
+    """
+    def decorate(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _recorder is None:
+                return fn(*args, **kwargs)
+            arguments = signature.bind(*args, **kwargs).arguments
+            with span(stage, _attempt(table_name, arguments), rows_in=_attempt(rows_in, arguments)) as s:
+                result = fn(*args, **kwargs)
+                s.rows_out = _attempt(rows_out, result)
+                return result
+        return wrapper
+    return decorate
+
+
+def collected(fn: Callable, *args, **kwargs) -> tuple[object, list[Span]]:
+    """
+    Call fn under a recorder of its own, for functions run in worker processes.
+
+    Returns:
+        (fn's return value, the spans it opened), to pass to adopt() in the
+        recording process. Spans of a call that raises are lost with it.
+    """
+    global _recorder
+    previous, _recorder = _recorder, RunRecorder("", "")
+    recorder = _recorder
+    token = _current.set(None)
+    try:
+        return fn(*args, **kwargs), recorder.spans
+    finally:
+        _current.reset(token)
+        _recorder = previous
+
+
+def adopt(spans: list[Span]) -> None:
+    """
+    Add spans returned by collected() to the run being recorded, renumbered and
+    nested under the current span. Does nothing outside recording().
+    """
+    recorder, parent = _recorder, _current.get()
+    if recorder is None:
+        return
+    ids = {s.span_id: next(recorder._ids) for s in spans}
+    for s in spans:
+        s.span_id = ids[s.span_id]
+        if s.parent_id in ids:
+            s.parent_id = ids[s.parent_id]
+        elif parent is not None:
+            s.parent_id = parent.span_id
+            s.table_name = s.table_name or parent.table_name
+            s.file_name = s.file_name or parent.file_name
+        recorder.add(s)
+
+
+def _attempt(fn: Optional[Callable], value):
+    if fn is None:
+        return None
+    try:
+        return fn(value)
+    except (TypeError, KeyError, AttributeError):
+        return None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB, or None where it cannot be read."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return round(psutil.Process().memory_info().peak_wset / 2**20, 1)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+def _run_schema():
+    import pyarrow as pa
+
+    utc = pa.timestamp("us", tz="UTC")
+    return pa.schema([
+        ("batch_id", pa.string()), ("mode", pa.string()), ("run_started_at", utc),
+        ("stage", pa.string()), ("table_name", pa.string()), ("file_name", pa.string()),
+        ("rows_in", pa.int64()), ("rows_out", pa.int64()),
+        ("span_id", pa.int64()), ("parent_id", pa.int64()), ("started_at", utc),
+        ("wall_seconds", pa.float64()), ("cpu_seconds", pa.float64()),
+        ("process_peak_rss_mb", pa.float64()), ("peak_rss_growth_mb", pa.float64()),
+        ("status", pa.string()), ("error", pa.string()),
+    ])
@@ -31,6 +31,7 @@ def get_logger(name: str) -> logging.Logger:
     if LOG_PATH is None:
         LOG_PATH = get_log_dir() / \
             f"pipeline_{date.today().strftime('%Y%m%d')}.log"
+        LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
 
     logger = logging.getLogger(name)
     if not logger.handlers:
@@ -0,0 +1,5 @@
+"""Shared test setup: keep pipeline logs out of the shared drive."""
+import os
+import tempfile
+
+os.environ.setdefault("LOG_DIR", tempfile.mkdtemp(prefix="pipeline_logs_"))
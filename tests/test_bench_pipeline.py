@@ -0,0 +1,15 @@
+import pytest
+
+from benchmarks.bench_pipeline import CASES, STAGES, run_case
+
+
+@pytest.mark.parametrize("case", list(CASES))
+def test_every_synthetic_shape_runs_through_the_pipeline(tmp_path, case):
+    result = run_case(case, scale=0.05, workdir=str(tmp_path))
+
+    assert list(result["stages"]) == STAGES
+    parsed = result["stages"]["parse"]["rows"]
+    assert parsed > 0
+    assert result["stages"]["bronze"]["rows"] == parsed
+    assert result["stages"]["read"]["rows"] == parsed
+    assert result["stages"]["silver"]["rows"] > 0
@@ -0,0 +1,78 @@
+from datetime import date, datetime, timedelta
+
+from src.services.bloomberg_cache import BloombergCache, _gaps
+from src.services.bloomberg_client import BloombergClient
+from tests.test_bloomberg_client import FakeSession
+
+TICKERS = ["HTAE CN Equity", "HPYE CN Equity"]
+
+
+def test_bdp_serves_fields_within_their_ttl(tmp_path):
+    session = FakeSession(reference={t: {"NAME": t[:4], "ID_ISIN": "CA0000000000", "PX_LAST": 10.0}
+                                     for t in TICKERS})
+    ttl = {"default": 24, "NAME": None, "PX_LAST": 0}
+
+    with BloombergCache(tmp_path / "cache.duckdb", ttl) as cache, \
+            BloombergClient(session=session, cache=cache) as client:
+        first = client.BDP(TICKERS, ["NAME", "ID_ISIN", "PX_LAST"])
+        second = client.BDP(TICKERS, ["NAME", "ID_ISIN", "PX_LAST"])
+
+        assert first.equals(second) and list(second["NAME"]) == ["HTAE", "HPYE"]
+        # PX_LAST (TTL 0) is requested every time, the static fields only once
+        assert [r.elements["fields"] for _, r in session.sent] == [["NAME", "ID_ISIN", "PX_LAST"], ["PX_LAST"]]
+        assert (cache.stats.reference_hits, cache.stats.reference_misses, cache.stats.requests) == (4, 8, 2)
+
+        # Once past its TTL, ID_ISIN is fetched again; NAME never expires
+        cache._con.execute("UPDATE reference_data SET fetched_at = fetched_at - INTERVAL 2 DAY")
+        client.BDP(TICKERS, ["NAME", "ID_ISIN"])
+        assert session.sent[-1][1].elements["fields"] == ["ID_ISIN"]
+
+    # A field without a value is not cached: it is asked for again
+    session = FakeSession(reference={"HTAE CN Equity": {"NAME": None}, "HPYE CN Equity": {"NAME": "HPYE"}})
+    with BloombergCache(tmp_path / "empty.duckdb", ttl) as cache, \
+            BloombergClient(session=session, cache=cache) as client:
+        for _ in range(2):
+            assert client.BDP(TICKERS, ["NAME"])["NAME"].isna().tolist() == [True, False]
+        assert [r.elements["securities"] for _, r in session.sent] == [TICKERS, ["HTAE CN Equity"]]
+
+    # Persisted across sessions
+    with BloombergCache(tmp_path / "cache.duckdb", ttl) as cache:
+        cached, missing = cache.get_reference(TICKERS, ["NAME", "PX_LAST"])
+        assert cached["HTAE CN Equity"] == {"NAME": "HTAE"} and missing == {t: ["PX_LAST"] for t in TICKERS}
+
+
+def test_bdh_requests_only_missing_date_ranges(tmp_path):
+    days = [datetime(2026, 4, 1) + timedelta(days=i) for i in range(30)]
+    session = FakeSession(history={t: [{"date": d, "PX_LAST": float(d.day)} for d in days] for t in TICKERS})
+
+    with BloombergCache(tmp_path / "cache.duckdb") as cache, \
+            BloombergClient(session=session, cache=cache) as client:
+        client.BDH(TICKERS[:1], ["PX_LAST"], "20260401", "20260410")
+        hist = client.BDH(TICKERS, ["PX_LAST"], "20260405", "20260420")
+
+        ranges = [(r.elements["securities"], r.settings["startDate"], r.settings["endDate"]) for _, r in session.sent]
+        assert ranges == [(["HTAE CN Equity"], "20260401", "20260410"),
+                          (["HTAE CN Equity"], "20260411", "20260420"),
+                          (["HPYE CN Equity"], "20260405", "20260420")]
+        assert list(hist.columns) == ["Ticker", "Date", "PX_LAST"]
+        assert list(hist["Ticker"]) == ["HTAE CN Equity"] * 16 + ["HPYE CN Equity"] * 16
+        assert list(hist["PX_LAST"][:16]) == [float(d) for d in range(5, 21)]
+
+        # Fully covered now: served without a request
+        sent = len(session.sent)
+        assert client.BDH(TICKERS[:1], ["PX_LAST"], "20260401", "20260420").shape == (20, 3)
+        assert len(session.sent) == sent
+        assert (cache.stats.history_hits, cache.stats.history_misses) == (1, 3)
+
+        # Weekly points depend on the requested range: always asked for in full
+        client.BDH(TICKERS[:1], ["PX_LAST"], "20260401", "20260420", "WEEKLY")
+        assert session.sent[-1][1].settings == {"startDate": "20260401", "endDate": "20260420",
+                                                "periodicitySelection": "WEEKLY"}
+        assert (cache.stats.history_hits, cache.stats.history_misses) == (1, 3)
+
+
+def test_gaps():
+    d = lambda day: date(2026, 4, day)
+    assert _gaps(d(1), d(30), []) == [(d(1), d(30))]
+    assert _gaps(d(1), d(30), [(d(5), d(10)), (d(8), d(12)), (d(20), d(30))]) == [(d(1), d(4)), (d(13), d(19))]
+    assert _gaps(d(5), d(10), [(d(1), d(30))]) == []
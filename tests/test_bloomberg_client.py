@@ -0,0 +1,226 @@
+from datetime import datetime
+
+import pandas as pd
+
+from src.services import bloomberg_client as bbg
+from src.services.bloomberg_client import BloombergClient
+
+
+class FakeElement:
+    """blpapi.Element over plain Python values: dicts are sequences of named elements, lists are arrays."""
+
+    def __init__(self, value, name=None):
+        self.value = value
+        self._name = name
+
+    def name(self):
+        return self._name
+
+    def isNull(self):
+        return self.value is None
+
+    def isDatetime(self):
+        return isinstance(self.value, datetime)
+
+    def isDate(self):
+        return False
+
+    def isTime(self):
+        return False
+
+    def isFloat(self):
+        return isinstance(self.value, float)
+
+    def isInt(self):
+        return isinstance(self.value, int) and not isinstance(self.value, bool)
+
+    def isBoolean(self):
+        return isinstance(self.value, bool)
+
+    def getValueAsDatetime(self):
+        return self.value
+
+    def getValueAsFloat(self):
+        return float(self.value)
+
+    def getValueAsInt(self):
+        return self.value
+
+    def getValueAsBoolean(self):
+        return self.value
+
+    def getValueAsString(self):
+        return str(self.value)
+
+    def hasElement(self, name):
+        return name in self.value
+
+    def getElement(self, name):
+        if isinstance(name, int):
+            name = list(self.value)[name]
+        return FakeElement(self.value[name], name)
+
+    def getElementAsString(self, name):
+        return str(self.value[name])
+
+    def getElementAsFloat(self, name):
+        return float(self.value[name])
+
+    def getElementAsDatetime(self, name):
+        return self.value[name]
+
+    def numValues(self):
+        return len(self.value)
+
+    def numElements(self):
+        return len(self.value)
+
+    def getValueAsElement(self, i):
+        return FakeElement(self.value[i])
+
+
+class FakeMessage(FakeElement):
+    def __init__(self, message_type, correlation_id, body):
+        super().__init__(body)
+        self.message_type, self.correlation_id = message_type, correlation_id
+
+    def messageType(self):
+        return self.message_type
+
+    def correlationId(self):
+        return self.correlation_id
+
+
+class FakeEvent:
+    def __init__(self, event_type, messages=()):
+        self.event_type, self.messages = event_type, list(messages)
+
+    def eventType(self):
+        return self.event_type
+
+    def __iter__(self):
+        return iter(self.messages)
+
+
+class FakeRequest:
+    def __init__(self, operation):
+        self.operation = operation
+        self.elements = {"securities": [], "fields": []}
+        self.settings = {}
+
+    def getElement(self, name):
+        values = self.elements[name]
+
+        class Array:
+            appendValue = values.append
+        return Array
+
+    def set(self, name, value):
+        self.settings[name] = value
+
+
+class FakeSession:
+    """Answers the most recently sent request first, in two events, to mimic interleaved responses."""
+
+    def __init__(self, reference=None, history=None, bulk=None, reject=()):
+        self.reference = reference or {}    # ticker -> {field: value}
+        self.history = history or {}        # ticker -> [{"date": ..., field: value}]
+        self.bulk = bulk or {}              # ticker -> {field: [{column: value}]}
+        self.reject = set(reject)           # tickers whose request comes back as a responseError
+        self.sent = []                      # (correlation id, FakeRequest)
+        self.outstanding = []
+        self.max_outstanding = 0
+        self.events = [FakeEvent(bbg.SERVICE_STATUS)]
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def openService(self, name):
+        pass
+
+    def getService(self, name):
+        return self
+
+    def createRequest(self, operation):
+        return FakeRequest(operation)
+
+    def sendRequest(self, request, correlationId=None):
+        self.sent.append((correlationId, request))
+        self.outstanding.append((correlationId, request))
+        self.max_outstanding = max(self.max_outstanding, len(self.outstanding))
+
+    def nextEvent(self, timeout=0):
+        if self.events:
+            return self.events.pop(0)
+        if not self.outstanding:
+            return FakeEvent(10)  # TIMEOUT
+        correlation_id, request = self.outstanding.pop()
+        securities, fields = request.elements["securities"], request.elements["fields"]
+        if self.reject & set(securities):
+            return FakeEvent(bbg.RESPONSE, [FakeMessage(
+                "ReferenceDataResponse", correlation_id, {"responseError": {"message": "rejected"}})])
+        if request.operation == "HistoricalDataRequest":
+            messages = [FakeMessage("HistoricalDataResponse", correlation_id, {"securityData": {
+                "security": ticker,
+                "fieldData": [{k: v for k, v in day.items() if k == "date" or k in fields}
+                              for day in self.history[ticker]
+                              if request.settings["startDate"] <= f"{day['date']:%Y%m%d}" <= request.settings["endDate"]]}})
+                for ticker in securities]
+        else:
+            data = {t: {**self.reference.get(t, {}), **self.bulk.get(t, {})} for t in securities}
+            messages = [FakeMessage("ReferenceDataResponse", correlation_id, {"securityData": [{
+                "security": ticker, "fieldData": {f: v for f, v in data[ticker].items() if f in fields}}]})
+                for ticker in securities]
+        # All but the last message as a partial response, then the final one
+        self.events.append(FakeEvent(bbg.RESPONSE, messages[-1:]))
+        return FakeEvent(bbg.PARTIAL_RESPONSE, messages[:-1])
+
+
+def test_bdp_splits_tickers_and_fields_and_keeps_requests_in_flight(monkeypatch):
+    monkeypatch.setattr(bbg, "REFERENCE_CHUNK", (3, 2))
+    tickers = [f"T{i} CN Equity" for i in range(10)]
+    fields = ["NAME", "PX_LAST", "CRNCY"]
+    session = FakeSession(reference={t: {"NAME": t[:3], "PX_LAST": float(i), "CRNCY": "CAD"}
+                                     for i, t in enumerate(tickers)})
+
+    with BloombergClient(session=session, max_in_flight=3) as client:
+        df = client.BDP(tickers, fields)
+
+    # 4 ticker chunks x 2 field chunks, at most 3 outstanding
+    assert len(session.sent) == 8 and session.max_outstanding == 3
+    assert all(len(r.elements["securities"]) <= 3 and len(r.elements["fields"]) <= 2 for _, r in session.sent)
+    assert list(df.columns) == ["Ticker", *fields]
+    assert list(df["Ticker"]) == tickers
+    assert list(df["PX_LAST"]) == [float(i) for i in range(10)]
+    assert set(df["CRNCY"]) == {"CAD"}
+
+
+def test_bdh_and_multi_ticker_bds(monkeypatch):
+    monkeypatch.setattr(bbg, "BULK_CHUNK_SECURITIES", 1)
+    days = [datetime(2026, 4, d) for d in (1, 2)]
+    session = FakeSession(
+        history={t: [{"date": d, "PX_LAST": 10.0 + i, "FUND_NET_ASSET_VAL": 9.5} for i, d in enumerate(days)]
+                 for t in ("HTAE CN Equity", "HPYE CN Equity")},
+        bulk={"HTAE CN Equity": {"DVD_HIST_ALL": [{"Ex-Date": "2026-03-31", "Dividend Amount": "0.1"}]},
+              "HPYE CN Equity": {"DVD_HIST_ALL": [{"Ex-Date": "2026-03-31", "Dividend Amount": "0.2"},
+                                                  {"Ex-Date": "2026-02-27", "Dividend Amount": "0.2"}]},
+              "BAD CN Equity": {"DVD_HIST_ALL": []}},
+        reject={"BAD CN Equity"})
+
+    with BloombergClient(session=session) as client:
+        hist = client.BDH(["HTAE CN Equity", "HPYE CN Equity"], ["PX_LAST", "FUND_NET_ASSET_VAL"],
+                          "20260401", "20260402")
+        bulk = client.BDS(["HTAE CN Equity", "BAD CN Equity", "HPYE CN Equity"], "DVD_HIST_ALL")
+
+    assert hist.shape == (4, 4) and hist["PX_LAST"].tolist() == [10.0, 11.0, 10.0, 11.0]
+    assert session.sent[0][1].settings == {"startDate": "20260401", "endDate": "20260402",
+                                           "periodicitySelection": "DAILY"}
+    # One request per ticker; the rejected one is dropped, the others keep their ticker order
+    assert [len(r.elements["securities"]) for _, r in session.sent[1:]] == [1, 1, 1]
+    pd.testing.assert_frame_equal(bulk, pd.DataFrame({
+        "Ticker": ["HTAE CN Equity", "HPYE CN Equity", "HPYE CN Equity"],
+        "Ex-Date": ["2026-03-31", "2026-03-31", "2026-02-27"],
+        "Dividend Amount": ["0.1", "0.2", "0.2"]}))
@@ -0,0 +1,146 @@
+import logging
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from benchmarks.synthetic import write_pcf, write_ucf
+from config import INGESTION_MAPPINGS, ColumnMapping, SilverMapping
+from src.cleaner import CastDiagnostics, clean_and_cast
+from src.parsers import extract_pcf, extract_ucf
+
+EDGE_MAPPING = SilverMapping(
+    silver_table_name="edge",
+    table_type="fact",
+    primary_keys="id",
+    columns={
+        "ID": ColumnMapping(str, "id"),
+        "Qty": ColumnMapping(int, "qty"),
+        "Px": ColumnMapping(float, "px"),
+        "AllInt": ColumnMapping(float, "all_int"),
+        "Wt": ColumnMapping("pct", "wt"),
+        "Flag": ColumnMapping(bool, "flag"),
+        "FlagAll": ColumnMapping(bool, "flag_all"),
+        "D": ColumnMapping(datetime, "d", "%Y%m%d"),
+        "DBad": ColumnMapping(datetime, "d_bad", "%Y%m%d"),
+        "F": ColumnMapping(float, "f_native"),
+        "Missing": ColumnMapping(str, "missing"),
+    },
+)
+
+
+def _edge_frame():
+    return pd.DataFrame({
+        "ID": [" a", "'b", "", None, "e", "a", " a"],
+        "Qty": ["1,000", "2.5", "3.5", "x", None, "'", "1,000"],
+        "Px": ["1.5", "nan", "", "1e3", "-2", "inf", "1.5"],
+        "AllInt": ["1", "2", "-3", "+4", "5", "6", "1"],
+        "Wt": ["5%", "1,0%", "x", None, "0.5", "", "5%"],
+        "Flag": ["Y", "n", "maybe", None, "TRUE", "0", "Y"],
+        "FlagAll": ["Y", "n", "yes", "no", "TRUE", "0", "Y"],
+        "D": ["20260224", "2026224", "260224", None, "bad", "20261301", "20260224"],
+        "DBad": ["x", None, "y", "z", "w", "q", "x"],
+        "F": [1.0, np.nan, 3.0, 4.0, 5.0, 6.0, 1.0],
+        "Other Col": [1, 2, 3, 4, 5, 6, 1],
+        "Text Col": [" x ", "''y", "", None, "z", "w", " x "],
+        "ingested_at": pd.Timestamp("2026-01-01", tz="UTC"),
+    }, index=[10, 11, 12, 13, 14, 15, 16])
+
+
+def _silver_mapping(bronze_table):
+    return next(m.silver_mapping for m in INGESTION_MAPPINGS.values() if m.bronze_table == bronze_table)
+
+
+def test_polars_engine_matches_pandas_on_edge_cases(caplog):
+    """Same frame, dtypes, index and null diagnostics as the pandas converters."""
+    df = _edge_frame()
+
+    pandas_diagnostics, polars_diagnostics = CastDiagnostics(seed=0), CastDiagnostics(seed=0)
+
+    with caplog.at_level(logging.INFO, logger="src.cleaner"):
+        expected = clean_and_cast(df, EDGE_MAPPING, diagnostics=pandas_diagnostics)
+        pandas_logs = [r.getMessage() for r in caplog.records]
+        caplog.clear()
+        result = clean_and_cast(df, EDGE_MAPPING, engine="polars", diagnostics=polars_diagnostics)
+        polars_logs = [r.getMessage() for r in caplog.records]
+
+    assert_frame_equal(result, expected)
+    assert polars_logs == pandas_logs
+    assert polars_diagnostics.report == pandas_diagnostics.report
+    assert result["all_int"].dtype == "int64"
+    assert result["flag"].dtype == object
+
+
+@pytest.mark.parametrize("bronze_table, write, extract", [
+    ("pcf_inav_baskets", write_pcf, extract_pcf),
+    ("ucf_records", write_ucf, extract_ucf),
+])
+def test_polars_engine_matches_pandas_on_baskets(tmp_path, bronze_table, write, extract):
+    df = extract(write(tmp_path / "basket.csv", funds=4, holdings=5))
+    df["ingested_at"] = pd.Timestamp("2026-02-24", tz="America/New_York")
+    df["source_file"] = "basket.csv"
+    silver_mapping = _silver_mapping(bronze_table)
+
+    assert_frame_equal(clean_and_cast(df, silver_mapping, engine="polars"),
+                       clean_and_cast(df, silver_mapping))
+
+
+def test_polars_engine_falls_back_to_pandas_for_unplanned_casts():
+    """A datetime mapping without a format is left to pandas' inference."""
+    df = pd.DataFrame({"D": ["2026-02-24", "02/25/2026", None]})
+    silver_mapping = SilverMapping("t", "fact", "d", columns={"D": ColumnMapping(datetime, "d")})
+
+    assert_frame_equal(clean_and_cast(df, silver_mapping, engine="polars"),
+                       clean_and_cast(df, silver_mapping))
+
+
+def test_clean_and_cast_rejects_unknown_engine():
+    with pytest.raises(ValueError, match="Unknown engine"):
+        clean_and_cast(_edge_frame(), EDGE_MAPPING, engine="spark")
+
+
+def test_diagnostics_report_counts_per_column():
+    diagnostics = CastDiagnostics("counts")
+
+    clean_and_cast(_edge_frame(), EDGE_MAPPING, diagnostics=diagnostics)
+
+    qty = diagnostics.report["qty"]
+    assert (qty.source, qty.before, qty.after, qty.lost, qty.empty) == ("Qty", 5, 3, 2, 1)
+    assert qty.samples == []
+    assert diagnostics.report["all_int"].lost == 0
+    assert "missing" not in diagnostics.report
+
+
+def test_diagnostics_off_records_and_logs_nothing(caplog):
+    diagnostics = CastDiagnostics("off")
+
+    with caplog.at_level(logging.INFO, logger="src.cleaner"):
+        clean_and_cast(_edge_frame(), EDGE_MAPPING, diagnostics=diagnostics)
+
+    assert diagnostics.report == {}
+    assert not any("values nulled" in r.getMessage() for r in caplog.records)
+
+
+@pytest.mark.parametrize("engine", ["pandas", "polars"])
+def test_diagnostics_sample_is_bounded_across_frames(engine):
+    """The reservoir keeps sample_size lost values however many frames are recorded."""
+    silver_mapping = SilverMapping("t", "fact", "qty", columns={"Qty": ColumnMapping(int, "qty")})
+    diagnostics = CastDiagnostics(sample_size=3, seed=1)
+
+    for batch in range(4):
+        df = pd.DataFrame({"Qty": [f"bad{batch}-{i}" for i in range(50)] + ["1"]})
+        clean_and_cast(df, silver_mapping, engine=engine, diagnostics=diagnostics)
+
+    qty = diagnostics.report["qty"]
+    assert (qty.before, qty.lost, qty.lost_seen) == (204, 200, 200)
+    assert len(qty.samples) == 3
+    assert all(value.startswith("bad") for value in qty.samples)
+    # Later frames get their share of the reservoir, not just the first one
+    assert any(not value.startswith("bad0-") for value in qty.samples)
+
+
+def test_diagnostics_rejects_unknown_level():
+    with pytest.raises(ValueError, match="Unknown diagnostics level"):
+        CastDiagnostics("verbose")
@@ -0,0 +1,325 @@
+import pandas as pd
+import polars as pl
+import pyarrow as pa
+import deltalake
+
+from config import PartitionSpec, SilverMapping
+from src.deltalake_writer import (
+    ingest_into_bronze, ingest_blocks_into_bronze, upsert_silver, read_bronze_changes, read_watermark, write_watermark,
+    row_hash)
+
+
+MAPPING = SilverMapping(
+    silver_table_name="test_positions",
+    table_type="fact",
+    primary_keys=("record_date", "ticker"),
+)
+
+
+def _batch(rows, ingested_at="2026-03-02"):
+    df = pd.DataFrame(rows, columns=["record_date", "ticker", "shares"])
+    df["ingested_at"] = pd.Timestamp(ingested_at, tz="America/New_York")
+    return df
+
+
+def _read(path):
+    return deltalake.DeltaTable(path).to_pandas().sort_values(
+        ["record_date", "ticker"], na_position="last").reset_index(drop=True)
+
+
+def test_upsert_silver_inserts_only_new_keys(tmp_path):
+    """Existing current keys are skipped, new keys are appended via MERGE."""
+    silver_path = tmp_path / "silver"
+    upsert_silver(_batch([
+        ("2026-03-02", "AAA", 10),
+        ("2026-03-02", "BBB", 20),
+    ]), MAPPING, silver_path)
+
+    upsert_silver(_batch([
+        ("2026-03-02", "AAA", 10),
+        ("2026-03-03", "AAA", 11),
+    ], ingested_at="2026-03-03"), MAPPING, silver_path)
+
+    result = _read(silver_path)
+    assert len(result) == 3
+    assert result["is_current"].all()
+    assert result["shares"].tolist() == [10, 20, 11]
+
+    history = deltalake.DeltaTable(silver_path).history(1)[0]
+    assert history["operation"] == "MERGE"
+
+
+def test_upsert_silver_versions_changed_rows(tmp_path):
+    """A changed row expires the current version; unchanged rows write nothing."""
+    silver_path = tmp_path / "silver"
+    upsert_silver(_batch([
+        ("2026-03-02", "AAA", 10),
+        ("2026-03-02", "BBB", 20),
+    ]), MAPPING, silver_path)
+
+    upsert_silver(_batch([
+        ("2026-03-02", "AAA", 10),
+        ("2026-03-02", "BBB", 25),
+    ], ingested_at="2026-03-03"), MAPPING, silver_path)
+
+    result = _read(silver_path).sort_values(["ticker", "is_current"]).reset_index(drop=True)
+    assert result[["ticker", "shares", "is_current"]].values.tolist() == [
+        ["AAA", 10, True], ["BBB", 20, False], ["BBB", 25, True]]
+    assert result.groupby("ticker")["row_hash"].nunique().tolist() == [1, 2]
+
+    version = deltalake.DeltaTable(silver_path).version()
+    upsert_silver(_batch([("2026-03-02", "BBB", 25)], ingested_at="2026-03-04"), MAPPING, silver_path)
+    assert deltalake.DeltaTable(silver_path).version() == version
+
+
+def test_row_hash_ignores_numeric_dtype():
+    """The same values hash alike whether a batch typed them int64 or float64 (nullable or not)."""
+    ints = pd.DataFrame({"ticker": ["AAA", "BBB"], "shares": [10, 20]})
+    floats = pd.DataFrame({"ticker": ["AAA", "BBB"], "shares": [10.0, 20.0]})
+    nullable = pd.DataFrame({"ticker": ["AAA", "BBB", "CCC"], "shares": pd.array([10, 20, None], dtype="Int64")})
+    with_nan = pd.DataFrame({"ticker": ["AAA", "BBB", "CCC"], "shares": [10.0, 20.0, float("nan")]})
+
+    assert ints["shares"].dtype == "int64" and floats["shares"].dtype == "float64"
+    assert row_hash(ints).tolist() == row_hash(floats).tolist()
+    assert row_hash(nullable).tolist() == row_hash(with_nan).tolist()
+    assert row_hash(ints).tolist() != row_hash(floats.assign(shares=[10.5, 20.0])).tolist()
+
+
+def test_upsert_silver_does_not_version_rows_retyped_between_batches(tmp_path):
+    silver_path = tmp_path / "silver"
+    upsert_silver(_batch([("2026-03-02", "AAA", 10), ("2026-03-02", "BBB", 20)]), MAPPING, silver_path)
+    version = deltalake.DeltaTable(silver_path).version()
+
+    retyped = _batch([("2026-03-02", "AAA", 10), ("2026-03-02", "BBB", 20)], ingested_at="2026-03-03")
+    retyped["shares"] = retyped["shares"].astype("float64")
+    upsert_silver(retyped, MAPPING, silver_path)
+
+    assert deltalake.DeltaTable(silver_path).version() == version
+    assert len(_read(silver_path)) == 2
+
+
+def test_upsert_silver_versions_restated_dedup_timestamp(tmp_path):
+    """A dedup_timestamp outside the primary key is row content: a restated value is a new version."""
+    mapping = SilverMapping(silver_table_name="test_transactions", table_type="fact",
+                            primary_keys=("record_date", "ticker"), dedup_timestamp="trade_date")
+    silver_path = tmp_path / "silver"
+    upsert_silver(_batch([("2026-03-02", "AAA", 10)]).assign(trade_date=pd.Timestamp("2026-02-27")),
+                  mapping, silver_path)
+    upsert_silver(_batch([("2026-03-02", "AAA", 10)], ingested_at="2026-03-03").assign(
+        trade_date=pd.Timestamp("2026-03-02")), mapping, silver_path)
+
+    result = _read(silver_path).sort_values("is_current")
+    assert result["is_current"].tolist() == [False, True]
+    assert result["trade_date"].dt.strftime("%Y-%m-%d").tolist() == ["2026-02-27", "2026-03-02"]
+
+
+def test_upsert_silver_versions_rows_written_without_hash(tmp_path):
+    """Current rows from before row_hash existed are versioned once, then compared by hash."""
+    silver_path = tmp_path / "silver"
+    legacy = _batch([("2026-03-02", "AAA", 10)])
+    legacy["is_current"] = True
+    deltalake.write_deltalake(silver_path, legacy)
+
+    upsert_silver(_batch([("2026-03-02", "AAA", 10)], ingested_at="2026-03-03"), MAPPING, silver_path)
+    upsert_silver(_batch([("2026-03-02", "AAA", 10)], ingested_at="2026-03-04"), MAPPING, silver_path)
+
+    result = _read(silver_path)
+    assert result["is_current"].sum() == 1
+    assert len(result) == 2
+    assert result.loc[result["is_current"], "row_hash"].notna().all()
+
+
+def test_upsert_silver_matches_null_key_parts(tmp_path):
+    """Rows with NULL key parts are treated as duplicates of the same partial key."""
+    silver_path = tmp_path / "silver"
+    upsert_silver(_batch([("2026-03-02", None, 5)]), MAPPING, silver_path)
+    upsert_silver(_batch([
+        ("2026-03-02", None, 5),
+        (None, None, 7),
+    ], ingested_at="2026-03-03"), MAPPING, silver_path)
+
+    result = _read(silver_path)
+    assert len(result) == 1
+    assert result.loc[0, "shares"] == 5
+
+
+def test_upsert_silver_keeps_latest_row_per_null_pattern(tmp_path):
+    """Within one batch, rows compete only with rows sharing their NULL key pattern."""
+    silver_path = tmp_path / "silver"
+    df = _batch([
+        ("2026-03-02", "AAA", 1),
+        ("2026-03-02", "AAA", 2),
+        ("2026-03-02", None, 3),
+        ("2026-03-02", None, 4),
+        (None, "AAA", 5),
+        (None, "AAA", 6),
+        (None, "BBB", 7),
+        (None, None, 8),
+    ])
+    df["ingested_at"] = pd.to_datetime([
+        "2026-03-02", "2026-03-03", "2026-03-04", "2026-03-01",
+        "2026-03-02", "2026-03-02", "2026-03-01", "2026-03-05"]).tz_localize("America/New_York")
+
+    upsert_silver(df, MAPPING, silver_path)
+
+    result = _read(silver_path)
+    # Latest full key, latest partial key per pattern, timestamp ties keep the
+    # first incoming row, and the all-NULL row is skipped
+    assert result["shares"].tolist() == [2, 3, 5, 7]
+
+
+def test_upsert_silver_casts_to_existing_schema(tmp_path):
+    """Incoming all-null columns are cast to the table's existing types."""
+    silver_path = tmp_path / "silver"
+    upsert_silver(_batch([("2026-03-02", "AAA", 10)]), MAPPING, silver_path)
+
+    incoming = _batch([("2026-03-03", "BBB", None)], ingested_at="2026-03-03")
+    incoming["shares"] = incoming["shares"].astype(object)
+    upsert_silver(incoming, MAPPING, silver_path)
+
+    result = _read(silver_path)
+    assert len(result) == 2
+    assert pd.isna(result.loc[1, "shares"])
+
+
+def test_read_bronze_changes_returns_only_new_rows(tmp_path):
+    """Rows appended after the watermark version are read; compaction is ignored."""
+    bronze_path = tmp_path / "bronze"
+    now = pd.Timestamp("2026-03-02", tz="America/New_York")
+    ingest_into_bronze(pd.DataFrame({"TICKER": ["AAA", "BBB"]}), "f1.csv",
+                       now, bronze_path, batch_id="b1")
+    _, version = read_bronze_changes(bronze_path)
+
+    ingest_into_bronze(pd.DataFrame({"TICKER": ["CCC"], "NEW_COL": ["x"]}), "f2.csv",
+                       now, bronze_path, batch_id="b2")
+    deltalake.DeltaTable(bronze_path).optimize.compact()
+
+    changes, new_version = read_bronze_changes(bronze_path, version)
+    assert new_version > version
+    assert changes["TICKER"].tolist() == ["CCC"]
+    assert changes["NEW_COL"].tolist() == ["x"]
+
+    unchanged, _ = read_bronze_changes(bronze_path, new_version)
+    assert unchanged.empty
+
+
+def test_watermark_round_trip(tmp_path):
+    assert read_watermark(tmp_path / "silver") is None
+    write_watermark(tmp_path / "silver", "bronze_table", 7)
+    assert read_watermark(tmp_path / "silver") == 7
+
+
+def test_ingest_blocks_into_bronze_streams_one_commit(tmp_path):
+    """Blocks land in one commit; a block with a new column starts a second."""
+    bronze_path = tmp_path / "bronze"
+    now = pd.Timestamp("2026-03-02 09:00", tz="America/New_York")
+    blocks = [
+        pd.DataFrame({"ticker": ["AAA", "BBB"], "shares": ["10", None]}),
+        pd.DataFrame({"ticker": ["CCC"], "shares": ["30"]}),
+        pd.DataFrame({"ticker": ["DDD"], "nav": ["1.5"]}),
+    ]
+
+    rows = ingest_blocks_into_bronze(iter(blocks), "f.csv", now, bronze_path, "b1")
+
+    dt = deltalake.DeltaTable(bronze_path)
+    assert rows == 4
+    assert dt.version() == 1
+    result = dt.to_pandas().sort_values("ticker").reset_index(drop=True)
+    assert result["shares"].isna().tolist() == [False, True, False, True]
+    assert result["nav"].iloc[3] == "1.5"
+    assert (result["source_file"] == "f.csv").all()
+
+
+def test_ingest_arrow_table_keeps_existing_bronze_types(tmp_path):
+    """String Arrow columns are cast to the types an existing table already has."""
+    bronze_path = tmp_path / "bronze"
+    now = pd.Timestamp("2026-03-02 09:00", tz="America/New_York")
+    ingest_into_bronze(
+        pd.DataFrame({"ticker": ["AAA"], "shares": [10]}), "day1.csv", now, bronze_path, "b1")
+
+    out = ingest_into_bronze(
+        pa.table({"ticker": ["BBB", "CCC"], "shares": ["-20", None], "note": ["x", None]}),
+        "day2.csv", now, bronze_path, "b2")
+
+    assert out.num_rows == 2
+    dt = deltalake.DeltaTable(bronze_path)
+    schema = pa.schema(dt.schema().to_arrow())
+    assert schema.field("shares").type == pa.int64()
+    result = dt.to_pandas().sort_values("ticker").reset_index(drop=True)
+    assert result["shares"].tolist()[:2] == [10, -20]
+    assert result["source_file"].tolist() == ["day1.csv", "day2.csv", "day2.csv"]
+
+
+def test_ingest_into_bronze_streams_record_batch_reader(tmp_path):
+    """Readers are written batch by batch; constant metadata stays dictionary-encoded."""
+    bronze_path = tmp_path / "bronze"
+    now = pd.Timestamp("2026-03-02 09:00", tz="America/New_York")
+    out = ingest_into_bronze(pl.DataFrame({"ticker": ["AAA"]}), "day1.csv", now, bronze_path, "b1")
+    assert pa.types.is_dictionary(out.schema.field("source_file").type)
+
+    schema = pa.schema([("ticker", pa.string())])
+    reader = pa.RecordBatchReader.from_batches(schema, [
+        pa.record_batch([pa.array(["BBB", "CCC"])], schema=schema),
+        pa.record_batch([pa.array(["DDD"])], schema=schema),
+    ])
+    rows = ingest_into_bronze(reader, "day2.csv", now, bronze_path, "b2")
+
+    assert rows == 3
+    dt = deltalake.DeltaTable(bronze_path)
+    assert dt.version() == 1
+    result = dt.to_pandas().sort_values("ticker").reset_index(drop=True)
+    assert result["source_file"].tolist() == ["day1.csv", "day2.csv", "day2.csv", "day2.csv"]
+    assert (result["ingested_at"] == now).all()
+
+
+PARTITIONED = SilverMapping(
+    silver_table_name="test_positions",
+    table_type="fact",
+    primary_keys=("record_date", "ticker"),
+    partition_by=PartitionSpec("record_month", "record_date"),
+)
+
+
+def test_upsert_silver_prunes_to_incoming_partitions(tmp_path, caplog):
+    """A partitioned table is created as such, and the MERGE only scans the incoming months."""
+    silver_path = tmp_path / "silver"
+    upsert_silver(_batch([
+        ("2026-01-30", "AAA", 1),
+        ("2026-02-27", "AAA", 2),
+        ("2026-03-02", "AAA", 3),
+    ]), PARTITIONED, silver_path)
+    assert deltalake.DeltaTable(silver_path).metadata().partition_columns == ["record_month"]
+
+    upsert_silver(_batch([
+        ("2026-03-02", "AAA", 3),
+        ("2026-03-03", "AAA", 4),
+        (None, "BBB", 5),
+    ], ingested_at="2026-03-03"), PARTITIONED, silver_path)
+
+    result = _read(silver_path)
+    assert result["shares"].tolist() == [1, 2, 3, 4, 5]
+    assert result["record_month"].tolist()[:4] == ["2026-01", "2026-02", "2026-03", "2026-03"]
+    assert pd.isna(result["record_month"].iloc[4])
+    assert "(1 files scanned" in caplog.text
+
+
+def test_ingest_into_bronze_partitions_new_tables_only(tmp_path):
+    spec = PartitionSpec("trade_month", "TRADE_DATE", datetime_format="%Y%m%d")
+    df = pd.DataFrame({"TRADE_DATE": ["20260224", "'20260301", "bad"], "X": ["1", "2", "3"]})
+    now = pd.Timestamp("2026-03-02", tz="America/New_York")
+
+    ingest_into_bronze(df, "a.csv", now, tmp_path / "pandas", "b1", partition_by=spec)
+    ingest_into_bronze(pa.Table.from_pandas(df), "a.csv", now, tmp_path / "arrow", "b1", partition_by=spec)
+    ingest_blocks_into_bronze(iter([df.iloc[:2], df.iloc[2:]]), "a.csv", now, tmp_path / "stream", "b1",
+                              partition_by=spec)
+    ingest_into_bronze(df, "a.csv", now, tmp_path / "legacy", "b1")
+    ingest_into_bronze(df, "a.csv", now, tmp_path / "legacy", "b2", partition_by=spec)
+
+    for name in ("pandas", "arrow", "stream"):
+        dt = deltalake.DeltaTable(tmp_path / name)
+        assert dt.metadata().partition_columns == ["trade_month"]
+        months = dt.to_pandas().sort_values("X")["trade_month"].tolist()
+        assert months[:2] == ["2026-02", "2026-03"] and pd.isna(months[2])
+    legacy = deltalake.DeltaTable(tmp_path / "legacy")
+    assert legacy.metadata().partition_columns == []
+    assert legacy.to_pandas()["trade_month"].notna().sum() == 2
@@ -0,0 +1,90 @@
+import csv
+
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from benchmarks.synthetic import write_pcf, write_ucf, write_positions
+from src.parsers import (
+    read_csv, extract_pcf, extract_ucf, iter_pcf_blocks, _parse_blocks, _extract_pcf_blocks,
+    _extract_ucf_blocks, _PCF_LAYOUT, _UCF_LAYOUT)
+
+
+def _read_raw(path, width):
+    return pd.read_csv(path, header=None, names=range(width))
+
+
+def test_extract_pcf_broadcasts_metrics_per_block(tmp_path):
+    path = write_pcf(tmp_path / "Harvest_INAVBSKT_ALL.20260224.csv", funds=3, holdings=4)
+
+    df = extract_pcf(path)
+
+    assert len(df) == 12
+    assert df["TICKER_1"].tolist() == ["'H000"] * 4 + ["'H001"] * 4 + ["'H002"] * 4
+    assert (df["TRADE_DATE"] == "20260224").all()
+    assert (df["CREATION_UNIT_SIZE"] == "50000").all()
+    assert "NAV" in df.columns
+
+
+def test_pcf_columnar_engine_matches_block_parser(tmp_path):
+    """The columnar engine reproduces the block-by-block frame, dtypes included."""
+    path = write_pcf(tmp_path / "pcf.csv", funds=5, holdings=6)
+    rows = list(csv.reader(open(path, newline="")))
+    rows[0][6] = ""   # first fund has no second ticker
+    rows[9][5] = ""   # one blank holding value
+    with open(path, "w", newline="") as f:
+        csv.writer(f).writerows(rows)
+
+    raw = _read_raw(path, 25)
+    fast = _parse_blocks(raw, _PCF_LAYOUT)
+
+    assert fast is not None
+    assert_frame_equal(fast, _extract_pcf_blocks(raw))
+
+
+def test_ucf_columnar_engine_matches_block_parser(tmp_path):
+    path = write_ucf(tmp_path / "Harvest_UCF_ALL.20260224.csv", funds=4, holdings=5)
+
+    raw = _read_raw(path, 34)
+    fast = _parse_blocks(raw, _UCF_LAYOUT)
+
+    assert fast is not None
+    assert_frame_equal(fast, _extract_ucf_blocks(raw))
+    assert fast["BROKER_NAME"].iloc[0] == "BROKER 0"
+    assert assert_frame_equal(extract_ucf(path), fast) is None
+
+
+def test_irregular_blocks_fall_back_to_block_parser(tmp_path):
+    """Blocks with differing metric keys are left to the block-by-block parser."""
+    path = write_pcf(tmp_path / "pcf.csv", funds=2, holdings=3)
+    rows = list(csv.reader(open(path, newline="")))
+    rows[1][0] = "OTHER_KEY"
+    with open(path, "w", newline="") as f:
+        csv.writer(f).writerows(rows)
+
+    assert _parse_blocks(_read_raw(path, 25), _PCF_LAYOUT) is None
+
+
+def test_iter_pcf_blocks_matches_extract_pcf_across_chunks(tmp_path):
+    """Blocks split over chunk boundaries come out whole and in order."""
+    path = write_pcf(tmp_path / "pcf.csv", funds=6, holdings=5)
+
+    blocks = list(iter_pcf_blocks(path, chunksize=7))
+
+    assert len(blocks) == 6
+    assert_frame_equal(pd.concat(blocks, ignore_index=True), extract_pcf(path))
+
+
+@pytest.mark.parametrize("engine", ["pyarrow", "polars"])
+def test_read_csv_engines_keep_strings_and_empty_as_null(tmp_path, engine):
+    """Same cells as pd.read_csv(dtype=str, na_values="", keep_default_na=False)."""
+    path = write_positions(tmp_path / "PLF_Positions20260324.csv", rows=200)
+
+    table = read_csv(path, engine=engine)
+
+    expected = pd.read_csv(path, dtype=str, na_values="", keep_default_na=False)
+    result = table.to_pandas()
+    assert list(result.columns) == list(expected.columns)
+    assert all(str(t) in ("string", "large_string") for t in table.schema.types)
+    assert (result.isna() == expected.isna()).all().all()
+    assert (result.fillna("") == expected.fillna("")).all().all()
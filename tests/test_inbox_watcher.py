@@ -0,0 +1,42 @@
+import os
+import time
+
+from src.inbox_watcher import InboxWatcher
+
+
+def test_files_are_handed_out_once_stable(tmp_path):
+    growing = tmp_path / "growing.csv"
+    growing.write_text("a\n")
+    with InboxWatcher(tmp_path, settle_seconds=0.2, poll_interval=0.05, use_notifications=False) as watcher:
+        assert watcher.next_batch(timeout=0.05) == []
+
+        done = tmp_path / "done.csv"
+        done.write_text("a\n1\n")
+        os.utime(done, ns=(1, 1))
+        deadline = time.monotonic() + 0.5
+        while time.monotonic() < deadline:
+            # Still being written to: never stable
+            with open(growing, "a") as f:
+                f.write("1\n")
+            batch = watcher.next_batch(timeout=0.05)
+            if batch:
+                break
+
+        assert batch == [done]
+        # Handed-out files are not repeated while they stay put, until they settle again
+        assert watcher.next_batch(timeout=0.05) == []
+
+
+def test_next_batch_orders_by_mtime_and_caps_size(tmp_path):
+    for i, name in enumerate(["c.csv", "a.csv", "b.csv"]):
+        path = tmp_path / name
+        path.write_text(name)
+        os.utime(path, ns=(i * 10**9, i * 10**9))
+
+    with InboxWatcher(tmp_path, settle_seconds=0, poll_interval=0.05, use_notifications=False) as watcher:
+        watcher.next_batch(timeout=0)
+        first = watcher.next_batch(timeout=0.5, max_files=2)
+        rest = watcher.next_batch(timeout=0.5)
+
+    assert [p.name for p in first] == ["c.csv", "a.csv"]
+    assert [p.name for p in rest] == ["b.csv"]
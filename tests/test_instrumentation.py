@@ -0,0 +1,65 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+
+import deltalake
+import pytest
+
+from src.utils.instrumentation import adopt, collected, recording, span, traced
+
+
+@traced("double", table_name=lambda a: a["table"], rows_in=lambda a: len(a["rows"]), rows_out=len)
+def double(rows, table):
+    return rows * 2
+
+
+def test_spans_are_only_kept_while_recording():
+    with span("parse") as s:
+        s.rows_out = 3
+    assert double([1], "t") == [1, 1]
+
+    with recording("batch-1", "test") as run:
+        with span("run"):
+            with span("silver", table_name="positions"):
+                double([1, 2, 3], "positions")
+            with pytest.raises(ValueError), span("parse", file_name="a.csv"):
+                raise ValueError("bad file")
+
+    by_stage = {s.stage: s for s in run.spans}
+    assert set(by_stage) == {"run", "silver", "double", "parse"}
+    assert by_stage["double"].parent_id == by_stage["silver"].span_id
+    assert by_stage["silver"].parent_id == by_stage["run"].span_id
+    assert (by_stage["double"].rows_in, by_stage["double"].rows_out) == (3, 6)
+    assert by_stage["double"].table_name == "positions"
+    assert by_stage["parse"].status == "error"
+    assert by_stage["parse"].error == "ValueError: bad file"
+    assert all(s.wall_seconds >= 0 and s.started_at is not None for s in run.spans)
+    assert run.summary()["double"] == {"count": 1, "seconds": by_stage["double"].wall_seconds,
+                                       "rows_in": 3, "rows_out": 6}
+
+
+def test_recording_appends_spans_to_pipeline_runs(tmp_path):
+    table_path = tmp_path / "pipeline_runs"
+    for batch_id in ("b1", "b2"):
+        with recording(batch_id, "main", table_path), span("run"):
+            double([1], "positions")
+
+    runs = deltalake.DeltaTable(str(table_path)).to_pyarrow_table().to_pylist()
+    assert sorted((r["batch_id"], r["stage"]) for r in runs) == [
+        ("b1", "double"), ("b1", "run"), ("b2", "double"), ("b2", "run")]
+    assert {r["table_name"] for r in runs if r["stage"] == "double"} == {"positions"}
+
+
+def test_thread_and_worker_spans_nest_under_the_submitting_span():
+    with recording("batch-1", "test") as run, span("run") as root:
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pool.submit(copy_context().run, double, [1], "positions").result()
+        # As a process pool worker would run it: no recorder of its own
+        result, spans = collected(double, [1, 2], "holdings")
+        adopt(spans)
+
+    assert result == [1, 2, 1, 2]
+    doubles = sorted((s for s in run.spans if s.stage == "double"), key=lambda s: s.table_name)
+    assert [s.table_name for s in doubles] == ["holdings", "positions"]
+    assert all(s.parent_id == root.span_id for s in doubles)
+    assert len({s.span_id for s in run.spans}) == 3
+    assert all(s.process_peak_rss_mb is None or s.peak_rss_growth_mb >= 0 for s in run.spans)
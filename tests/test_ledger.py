@@ -0,0 +1,65 @@
+from src.ledger import IngestionLedger, file_fingerprint
+
+
+def _write(path, text):
+    path.write_text(text)
+    return path
+
+
+def test_ledger_detects_renamed_redelivery(tmp_path):
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    first = _write(inbox / "positions_0302.csv", "a,b\n1,2\n")
+
+    with IngestionLedger(tmp_path / "ledger.duckdb") as ledger:
+        assert ledger.claim(first, "positions") is None
+        assert ledger.record([first], "batch-1") == 1
+
+    redelivered = _write(inbox / "positions_0302_resent.csv", "a,b\n1,2\n")
+    changed = _write(inbox / "positions_0303.csv", "a,b\n1,3\n")
+    with IngestionLedger(tmp_path / "ledger.duckdb") as ledger:
+        previous = ledger.claim(redelivered, "positions")
+        assert (previous["file_name"], previous["batch_id"]) == ("positions_0302.csv", "batch-1")
+        # Same bytes for another bronze table, or new bytes, are new payloads
+        assert ledger.claim(redelivered, "positions_archive") is None
+        assert ledger.claim(changed, "positions") is None
+
+
+def test_ledger_flags_duplicates_within_a_run(tmp_path):
+    a = _write(tmp_path / "a.csv", "x\n1\n")
+    b = _write(tmp_path / "b.csv", "x\n1\n")
+
+    with IngestionLedger(tmp_path / "ledger.duckdb") as ledger:
+        assert ledger.claim(a, "t") is None
+        assert ledger.claim(b, "t") == {"file_name": "a.csv", "batch_id": None, "ingested_at": None}
+
+
+def test_files_for_batch(tmp_path):
+    files = [_write(tmp_path / f"f{i}.csv", f"x\n{i}\n") for i in range(3)]
+
+    with IngestionLedger(tmp_path / "ledger.duckdb") as ledger:
+        for path in files:
+            ledger.claim(path, "t")
+        ledger.record(files[:2], "batch-1")
+        ledger.record(files[2:], "batch-2")
+
+        result = ledger.files_for_batch("batch-1")
+
+    assert result["file_name"].tolist() == ["f0.csv", "f1.csv"]
+    assert result["content_hash"].tolist() == [file_fingerprint(p)[0] for p in files[:2]]
+    assert result["size_bytes"].tolist() == [4, 4]
+
+
+def test_released_claims_can_be_claimed_again(tmp_path):
+    a = _write(tmp_path / "a.csv", "x\n1\n")
+    b = _write(tmp_path / "b.csv", "x\n1\n")
+
+    with IngestionLedger(tmp_path / "ledger.duckdb") as ledger:
+        assert ledger.claim(a, "t") is None
+        assert ledger.claim(b, "t")["file_name"] == "a.csv"
+        # Releasing the duplicate keeps the claim it duplicated
+        ledger.release([b])
+        assert ledger.claim(b, "t")["file_name"] == "a.csv"
+        ledger.release([a, b])
+        assert ledger.claim(b, "t") is None
+        assert ledger.record([a], "batch-1") == 0
@@ -0,0 +1,195 @@
+from pathlib import Path
+
+from config import IngestionMapping
+from main import _plan_batches
+from tests.test_statestreet_mft_client import FOLDER, mft_server  # noqa: F401
+
+
+def test_plan_batches_coalesces_append_files_per_table():
+    """Append files for one table share a batch; overwrite files stay separate."""
+    positions = IngestionMapping(parser=None, bronze_table="positions")
+    cash = IngestionMapping(parser=None, bronze_table="cash", load_type="overwrite")
+    jobs = [
+        (Path("positions_1.csv"), positions),
+        (Path("cash_1.csv"), cash),
+        (Path("positions_2.csv"), positions),
+        (Path("cash_2.csv"), cash),
+    ]
+
+    batches = _plan_batches(jobs)
+
+    assert [[p.name for p, _ in batch] for batch in batches] == [
+        ["positions_1.csv", "positions_2.csv"],
+        ["cash_1.csv"],
+        ["cash_2.csv"],
+    ]
+
+
+def test_only_large_files_are_streamed(monkeypatch):
+    import config
+
+    monkeypatch.setattr(config, "STREAM_MIN_FILE_SIZE", 1000)
+    pcf = IngestionMapping(parser="src.parsers.extract_pcf", stream_parser="src.parsers.iter_pcf_blocks",
+                           bronze_table="pcf")
+
+    assert pcf.for_file(999) is pcf and not pcf.stream
+    large = pcf.for_file(1000)
+    assert large.stream and large.load_parser().__name__ == "iter_pcf_blocks"
+    # Streamed and whole-file files of one table are written in separate batches
+    batches = _plan_batches([(Path("small.csv"), pcf), (Path("large.csv"), large), (Path("small_2.csv"), pcf)])
+    assert [[p.name for p, _ in batch] for batch in batches] == [["small.csv", "small_2.csv"], ["large.csv"]]
+
+
+def test_collect_inbox_skips_already_ingested_content(tmp_path, monkeypatch):
+    import re
+
+    import main
+    from src.ledger import IngestionLedger
+
+    inbox, processed = tmp_path / "inbox", tmp_path / "processed"
+    inbox.mkdir()
+    monkeypatch.setattr(main, "INBOX_DIR", inbox)
+    monkeypatch.setattr(main, "PROCESSED_DIR", processed)
+    monkeypatch.setattr(main, "INGESTION_MAPPINGS", {
+        re.compile(r"^positions"): IngestionMapping(parser=None, bronze_table="positions")})
+
+    (inbox / "positions_1.csv").write_text("a\n1\n")
+    with IngestionLedger(tmp_path / "ledger.duckdb") as ledger:
+        jobs = main._collect_inbox("b1", ledger)
+        ledger.record([path for path, _ in jobs], "b1")
+        (inbox / "positions_1.csv").unlink()
+
+        (inbox / "positions_1_resent.csv").write_text("a\n1\n")
+        (inbox / "positions_2.csv").write_text("a\n2\n")
+        jobs = main._collect_inbox("b2", ledger)
+
+    assert [path.name for path, _ in jobs] == ["positions_2.csv"]
+    assert [p.name for p in processed.rglob("*.csv")] == ["positions_1_resent.csv"]
+
+
+def test_ingest_from_mft_writes_only_verified_new_payloads(tmp_path, mft_server, monkeypatch):
+    import hashlib
+    import json
+    import re
+
+    import deltalake
+    import pytest
+
+    import main
+    from src import ledger as ledger_module
+    from src.services import statestreet_mft_client as mft
+
+    monkeypatch.setattr(main, "INGESTION_MAPPINGS", {re.compile(r"^positions_\d\.csv$"): IngestionMapping(
+        parser="src.parsers.read_csv", remote_stream=True, bronze_table="positions")})
+    monkeypatch.setattr(main, "BRONZE_DIR", tmp_path / "bronze")
+    monkeypatch.setattr(main, "LEDGER_FILE", tmp_path / "ledger.duckdb")
+    monkeypatch.setattr(main, "RUN_METRICS_TABLE", None)
+    monkeypatch.setattr(mft, "RAW_DATA_DIR", tmp_path / "raw")
+    monkeypatch.setattr(mft, "MFT_MANIFEST_FILE", tmp_path / "manifest.json")
+    # Streamed archives are fingerprinted on the way in, never read back
+    monkeypatch.setattr(ledger_module, "file_fingerprint", lambda path: pytest.fail(f"read back {path}"))
+    parsed = []
+    parse_file = main._parse_file
+    monkeypatch.setattr(main, "_parse_file", lambda *args: parsed.append(args[2]) or parse_file(*args))
+
+    data = b"fund,shares\nHRVST,1\nHRVST,2\n"
+    mft_server.files = {"positions_1.csv": data, "positions_2.csv": data}
+    mft_server.attributes = {"positions_1.csv": {"FSR_FILE_SYS_MD.MD5": hashlib.md5(data).hexdigest()},
+                             "positions_2.csv": {"FSR_FILE_SYS_MD.MD5": "0" * 32}}
+    main.ingest_from_mft(FOLDER)
+
+    # The stream that fails its checksum is neither written nor marked synced
+    bronze = deltalake.DeltaTable(str(tmp_path / "bronze" / "positions"))
+    assert bronze.to_pyarrow_table().num_rows == 2
+    assert list(json.loads((tmp_path / "manifest.json").read_text())[FOLDER]) == ["positions_1.csv"]
+    assert sorted(p.name for p in (tmp_path / "raw").iterdir()) == ["positions_1.csv"]
+
+    # Once it verifies, the same payload under another name is skipped as a duplicate
+    mft_server.attributes["positions_2.csv"] = mft_server.attributes["positions_1.csv"]
+    main.ingest_from_mft(FOLDER)
+
+    bronze = deltalake.DeltaTable(str(tmp_path / "bronze" / "positions"))
+    assert bronze.version() == 0 and bronze.to_pyarrow_table().num_rows == 2
+    # A payload of a size already in the table is claimed before it is parsed
+    assert parsed == ["positions_1.csv"]
+    assert sorted(json.loads((tmp_path / "manifest.json").read_text())[FOLDER]) == [
+        "positions_1.csv", "positions_2.csv"]
+
+
+def _run_pipeline(warehouse: Path, workers: int, monkeypatch) -> dict:
+    """Run main() over a synthetic inbox in its own warehouse; bronze/silver row counts and ledger rows."""
+    import deltalake
+    import duckdb
+
+    import main
+    from benchmarks import synthetic
+
+    inbox = warehouse / "inbox"
+    inbox.mkdir(parents=True)
+    synthetic.write_pcf(inbox / "Harvest_INAVBSKT_ALL.20260224.csv", funds=5, holdings=10)
+    synthetic.write_cil(inbox / "Harvest_CIL_ALL.20260224.csv", funds=5, holdings=5)
+    synthetic.write_inkind(inbox / "Harvest_INKIND.20260224.txt", rows=200)
+    for day in ("20260224", "20260225"):
+        synthetic.write_positions(inbox / f"All_Positions{day}.csv", rows=500, seed=int(day))
+    monkeypatch.setattr(main, "INBOX_DIR", inbox)
+    for name in ("PROCESSED_DIR", "FAILED_DIR", "BRONZE_DIR", "SILVER_DIR"):
+        monkeypatch.setattr(main, name, warehouse / name.lower())
+    monkeypatch.setattr(main, "LEDGER_FILE", warehouse / "ledger.duckdb")
+    monkeypatch.setattr(main, "RUN_METRICS_TABLE", None)
+
+    main.main(workers=workers)
+
+    def row_counts(layer):
+        return {path.name: deltalake.DeltaTable(str(path)).to_pyarrow_table().num_rows
+                for path in sorted((warehouse / layer).iterdir())}
+
+    with duckdb.connect(str(warehouse / "ledger.duckdb"), read_only=True) as con:
+        files = con.execute(
+            "SELECT bronze_table, content_hash, size_bytes FROM ingested_files ORDER BY ALL").fetchall()
+    return {"bronze": row_counts("bronze_dir"), "silver": row_counts("silver_dir"), "ledger": files,
+            "failed": list((warehouse / "failed_dir").rglob("*"))}
+
+
+def test_concurrent_run_matches_serial_run(tmp_path, monkeypatch):
+    serial = _run_pipeline(tmp_path / "serial", 1, monkeypatch)
+    concurrent = _run_pipeline(tmp_path / "concurrent", 2, monkeypatch)
+
+    assert set(serial["bronze"]) == {"pcf_inav_baskets", "cash_in_lieu_records", "inkind_orders",
+                                     "all_positions"}
+    assert not serial["failed"] and len(serial["ledger"]) == 5
+    assert concurrent == serial
+
+
+def test_watch_batch_can_retry_a_file_that_failed(tmp_path, monkeypatch):
+    """Under watch() one ledger outlives the micro-batches: a failed file must not block its redelivery."""
+    import re
+
+    import deltalake
+
+    import main
+    from src.ledger import IngestionLedger
+
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    monkeypatch.setattr(main, "INBOX_DIR", inbox)
+    for name in ("PROCESSED_DIR", "FAILED_DIR", "BRONZE_DIR"):
+        monkeypatch.setattr(main, name, tmp_path / name.lower())
+    mapping = IngestionMapping(parser="src.parsers.read_csv", bronze_table="positions")
+    monkeypatch.setattr(main, "INGESTION_MAPPINGS", {re.compile(r"^positions"): mapping})
+
+    with IngestionLedger(tmp_path / "ledger.duckdb") as ledger:
+        # First delivery: the bronze write fails
+        (inbox / "positions_1.csv").write_text("fund,shares\nHRVST,1\n")
+        with monkeypatch.context() as m:
+            m.setattr(main, "_write_bronze", lambda *args: (_ for _ in ()).throw(IOError("disk full")))
+            main._run_jobs(main._collect_inbox("b1", ledger), "b1", False, 1, ledger)
+        assert [p.name for p in (tmp_path / "failed_dir").rglob("*.csv")] == ["positions_1.csv"]
+
+        # Same bytes dropped in again, in a later micro-batch of the same watch
+        (inbox / "positions_1_resent.csv").write_text("fund,shares\nHRVST,1\n")
+        jobs = main._collect_inbox("b2", ledger)
+        assert [p.name for p, _ in jobs] == ["positions_1_resent.csv"]
+        main._run_jobs(jobs, "b2", False, 1, ledger)
+        assert ledger.files_for_batch("b2")["file_name"].tolist() == ["positions_1_resent.csv"]
+
+    assert deltalake.DeltaTable(str(tmp_path / "bronze_dir" / "positions")).to_pyarrow_table().num_rows == 1
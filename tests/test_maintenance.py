@@ -0,0 +1,51 @@
+import deltalake
+import pandas as pd
+import pyarrow as pa
+
+from src.maintenance import maintain_table, table_stats
+
+
+def _fragmented_table(path, appends=12):
+    """A table built from many one-row appends; removed files are vacuumable at once."""
+    for i in range(appends):
+        deltalake.write_deltalake(
+            path, pa.table({"ticker": [f"T{i % 3}"], "shares": [i]}), mode="append",
+            configuration={"delta.deletedFileRetentionDuration": "interval 0 hours"})
+    return path
+
+
+def test_maintain_table_compacts_checkpoints_and_vacuums(tmp_path):
+    path = _fragmented_table(tmp_path / "bronze")
+
+    report = maintain_table(path, min_small_files=10, checkpoint_interval=5)
+
+    assert set(report["actions"]) == {"compact", "checkpoint", "vacuum"}
+    assert (report["before"]["files"], report["after"]["files"]) == (12, 1)
+    assert report["after"]["commits_since_checkpoint"] == 0
+    assert report["actions"]["vacuum"]["files_deleted"] == 12
+    rows = deltalake.DeltaTable(path).to_pandas().sort_values("shares")
+    assert rows["shares"].tolist() == list(range(12))
+
+
+def test_maintain_table_leaves_healthy_tables_alone(tmp_path):
+    path = _fragmented_table(tmp_path / "bronze", appends=3)
+    version = deltalake.DeltaTable(path).version()
+
+    report = maintain_table(path, min_small_files=10, checkpoint_interval=5)
+
+    assert report["actions"] == {}
+    assert report["after"] == report["before"]
+    assert deltalake.DeltaTable(path).version() == version
+
+
+def test_maintain_table_z_orders_on_non_partition_keys(tmp_path):
+    path = tmp_path / "silver"
+    for i in range(4):
+        deltalake.write_deltalake(
+            path, pd.DataFrame({"month": ["2026-03"], "ticker": [f"T{i}"], "shares": [i]}),
+            mode="append", partition_by=["month"])
+
+    report = maintain_table(path, z_order_columns=["month", "ticker", "missing"], min_small_files=2)
+
+    assert report["actions"]["z_order"]["columns"] == ["ticker"]
+    assert table_stats(path, small_file_size=1 << 20)["files"] == 1
@@ -0,0 +1,70 @@
+import re
+from datetime import date
+
+import pytest
+
+from config import INGESTION_MAPPINGS, SAMPLE_FILE_NAMES
+from src.mapping_index import MappingIndex, filename_date
+
+
+def _linear(mappings, filename):
+    for pattern, mapping in mappings.items():
+        if pattern.search(filename):
+            return mapping
+    return None
+
+
+NAMES = SAMPLE_FILE_NAMES + ["random.csv", "x_securities.csv", "HARVEST_inkind.20260224.TXT"]
+
+
+def test_sample_file_names_cover_every_pattern():
+    assert [p.pattern for p in INGESTION_MAPPINGS if not any(p.search(n) for n in SAMPLE_FILE_NAMES)] == []
+
+
+def test_index_matches_config_order_scan():
+    index = MappingIndex(INGESTION_MAPPINGS, SAMPLE_FILE_NAMES, strict=True)
+
+    assert index.ambiguities == []
+    for name in NAMES:
+        match = index.match(name)
+        assert (match.mapping if match else None) is _linear(INGESTION_MAPPINGS, name), name
+
+
+def test_overlapping_patterns_keep_first_match_and_are_reported():
+    mappings = {
+        re.compile(r"Harvest_INKIND", re.IGNORECASE): "inkind",
+        re.compile(r"Harvest_(INKIND|NAV)_ALL\.\d{8}\.txt", re.IGNORECASE): "all",
+        re.compile(r"\.csv$"): "csv",
+        re.compile(r"^positions\.csv$"): "positions",
+    }
+
+    examples = ["Harvest_INKIND_ALL.20260224.txt", "Harvest_NAV_ALL.20260224.txt", "positions.csv"]
+    index = MappingIndex(mappings, examples)
+
+    assert [(a.pattern, b.pattern) for a, b, _ in index.ambiguities] == [
+        (r"Harvest_INKIND", r"Harvest_(INKIND|NAV)_ALL\.\d{8}\.txt"),
+        (r"\.csv$", r"^positions\.csv$"),
+    ]
+    for name in ["positions.csv", "Harvest_NAV_ALL.20260224.txt", "harvest_inkind_x.txt", "x.txt"]:
+        match = index.match(name)
+        assert (match.mapping if match else None) == _linear(mappings, name)
+    with pytest.raises(ValueError, match="overlapping"):
+        MappingIndex(mappings, examples, strict=True)
+
+
+def test_names_outside_the_samples_follow_config_order():
+    index = MappingIndex(INGESTION_MAPPINGS, SAMPLE_FILE_NAMES)
+
+    # Matches custody_positions and, further left in the name, the unanchored Harvest_UCF
+    name = "Harvest_UCF_Custody_Positions.csv"
+    assert index.match(name).mapping is _linear(INGESTION_MAPPINGS, name)
+    assert index.match(name).mapping.bronze_table == "custody_positions"
+
+
+def test_match_extracts_filename_date():
+    index = MappingIndex(INGESTION_MAPPINGS)
+
+    assert index.match("Harvest_INAVBSKT_ALL.20260224.csv").file_date == date(2026, 2, 24)
+    assert index.match("Harvest_2026-02-24.xlsx").file_date == date(2026, 2, 24)
+    assert index.match("Branch_Mapping.csv").file_date is None
+    assert filename_date("report_20261332_20260101.csv") == date(2026, 1, 1)
@@ -0,0 +1,31 @@
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY = ["pandas", "polars", "pyarrow", "deltalake", "duckdb", "numpy"]
+
+
+def _run(code, tmp_path):
+    env = {**os.environ, "LOG_DIR": str(tmp_path / "logs"), "PYTHONPATH": str(ROOT)}
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+
+
+def test_importing_main_loads_no_dataframe_libraries(tmp_path):
+    result = _run(f"import sys, main; print([m for m in {HEAVY!r} if m in sys.modules])", tmp_path)
+    assert result.stdout.strip() == "[]"
+
+
+@pytest.mark.parametrize("module, budget_seconds", [("main", 0.3)])
+def test_import_time_budget(tmp_path, module, budget_seconds):
+    result = _run(f"import {module}", tmp_path)
+    # -X importtime lines: "import time: self [us] | cumulative | imported package"
+    cumulative = {m.group(2).strip(): int(m.group(1))
+                  for m in re.finditer(r"import time:\s+\d+ \|\s+(\d+) \| (.+)", result.stderr)}
+    assert cumulative[module] / 1e6 < budget_seconds
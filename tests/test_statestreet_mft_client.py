@@ -0,0 +1,220 @@
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+import pytest
+
+from src.services import statestreet_mft_client as mft
+from src.services.statestreet_mft_client import FILE_SIZE_ATTRIBUTE, StateStreetMFTClient
+
+FOLDER = "/ETFGlobalHarvest/fromSSC"
+
+
+class FakeMFT:
+    """Stand-in for the MFT REST API: login, folder listing, and file downloads with Range support."""
+
+    def __init__(self):
+        self.files = {}           # name -> bytes
+        self.attributes = {}      # name -> extra listing attributes
+        self.truncate_once = set()  # names whose next download is cut off halfway
+        self.requests = []        # (path, Range header)
+
+    def listing(self):
+        return {"files": [{"filename": "archive", "directory": True}] + [
+            {"filename": name, "directory": False,
+             "attributes": {FILE_SIZE_ATTRIBUTE: str(len(data)), **self.attributes.get(name, {})}}
+            for name, data in self.files.items()]}
+
+    def handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                self.send_response(200 if self.path == "/auth/login" else 404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                path = unquote(url.path)
+                fake.requests.append((path, self.headers.get("Range")))
+                if path == f"/files{FOLDER}":
+                    return self._send(200, json.dumps(fake.listing()).encode())
+                name = path.rsplit("/", 1)[-1]
+                if name not in fake.files:
+                    return self._send(404, b"")
+                data = fake.files[name]
+                start = 0
+                if self.headers.get("Range"):
+                    start = int(self.headers["Range"].split("=")[1].rstrip("-"))
+                    if start >= len(data):
+                        return self._send(416, b"")
+                body = data[start:]
+                self.send_response(206 if start else 200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if name in fake.truncate_once:
+                    fake.truncate_once.discard(name)
+                    self.wfile.write(body[:len(body) // 2])
+                    self.wfile.flush()
+                    self.connection.close()
+                    return
+                self.wfile.write(body)
+
+            def _send(self, status, body):
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+@pytest.fixture
+def mft_server(tmp_path, monkeypatch):
+    fake = FakeMFT()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), fake.handler())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    cert, key = tmp_path / "client.crt", tmp_path / "client.key"
+    cert.write_text("")
+    key.write_text("")
+    monkeypatch.setattr(mft, "MFT_BASE_URL", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setattr(mft, "MFT_CERT_PATH", cert)
+    monkeypatch.setattr(mft, "MFT_KEY_PATH", key)
+    monkeypatch.setattr(mft.time, "sleep", lambda seconds: None)
+    yield fake
+    server.shutdown()
+    server.server_close()
+
+
+def test_download_many_resumes_and_verifies(tmp_path, mft_server, monkeypatch):
+    monkeypatch.setattr(mft, "DOWNLOAD_CHUNK_SIZE", 64 * 1024)
+    mft_server.files = {f"Harvest_CIL_ALL.2026020{i}.CSV": bytes([i]) * (300_000 + i) for i in range(1, 6)}
+    mft_server.truncate_once = {"Harvest_CIL_ALL.20260201.CSV"}
+    good = mft_server.files["Harvest_CIL_ALL.20260202.CSV"]
+    mft_server.attributes = {
+        "Harvest_CIL_ALL.20260202.CSV": {"FSR_FILE_SYS_MD.MD5": hashlib.md5(good).hexdigest()},
+        "Harvest_CIL_ALL.20260203.CSV": {"FSR_FILE_SYS_MD.MD5": "0" * 32},
+    }
+    download_dir = tmp_path / "raw"
+
+    with StateStreetMFTClient(download_dir) as client:
+        transfers = {t.remote_path.rsplit("/", 1)[-1]: t for t in client.download_many(FOLDER, workers=3)}
+
+    assert len(transfers) == 5
+    bad = transfers.pop("Harvest_CIL_ALL.20260203.CSV")
+    assert not bad.ok and "md5" in bad.error
+    assert not (download_dir / "Harvest_CIL_ALL.20260203.CSV").exists()
+    assert all(t.ok for t in transfers.values())
+    for name in transfers:
+        assert (download_dir / name).read_bytes() == mft_server.files[name]
+    assert not list(download_dir.glob("*.part"))
+    # The cut-off transfer resumed after the last whole chunk it wrote, not from scratch
+    ranges = [r for path, r in mft_server.requests if path.endswith("Harvest_CIL_ALL.20260201.CSV")]
+    assert ranges == [None, f"bytes={2 * 64 * 1024}-"]
+
+
+def test_download_resumes_a_leftover_part_file(tmp_path, mft_server):
+    data = b"x" * 100_000
+    checksum = ("md5", hashlib.md5(data).hexdigest())
+    mft_server.files = {"Harvest_BSKT.20260410.CSV": data}
+    mft_server.attributes = {"Harvest_BSKT.20260410.CSV": {"FSR_FILE_SYS_MD.MD5": checksum[1]}}
+    download_dir = tmp_path / "raw"
+    download_dir.mkdir()
+    (download_dir / "Harvest_BSKT.20260410.CSV.part").write_bytes(data[:40_000])
+
+    with StateStreetMFTClient(download_dir) as client:
+        path = client.download(f"{FOLDER}/Harvest_BSKT.20260410.CSV", expected_size=len(data), checksum=checksum)
+
+        assert path.read_bytes() == data
+        assert mft_server.requests[-1][1] == "bytes=40000-"
+
+        # Unchanged files are not fetched again
+        requests_before = len(mft_server.requests)
+        [transfer] = client.download_many(FOLDER)
+        assert transfer.skipped and len(mft_server.requests) == requests_before + 1  # the listing
+
+
+def test_download_does_not_trust_an_unverifiable_part_file(tmp_path, mft_server):
+    # A complete .part of an earlier version of a file restated under the same name
+    data = b"y" * 50_000
+    mft_server.files = {"Harvest_BSKT.20260410.CSV": data}
+    download_dir = tmp_path / "raw"
+    download_dir.mkdir()
+    (download_dir / "Harvest_BSKT.20260410.CSV.part").write_bytes(b"x" * 50_000)
+
+    with StateStreetMFTClient(download_dir) as client:
+        path = client.download(f"{FOLDER}/Harvest_BSKT.20260410.CSV", expected_size=len(data))
+
+    assert path.read_bytes() == data
+    assert mft_server.requests[-1][1] is None
+
+
+def test_sync_fetches_only_new_and_restated_files(tmp_path, mft_server):
+    inbox, manifest = tmp_path / "inbox", tmp_path / "mft_manifest.json"
+    mft_server.files = {"Harvest_CIL_ALL.20260406.CSV": b"old,history\n"}
+
+    with StateStreetMFTClient(tmp_path / "raw") as client:
+        seeded = client.sync(FOLDER, inbox, manifest_path=manifest, seed=True)
+        assert seeded.new == ["Harvest_CIL_ALL.20260406.CSV"] and seeded.downloaded == []
+        assert not inbox.exists() or not any(inbox.iterdir())
+
+        mft_server.files["Harvest_CIL_ALL.20260407.CSV"] = b"a,b\n1,2\n"
+        first = client.sync(FOLDER, inbox, manifest_path=manifest)
+        assert (first.new, first.changed, first.unchanged) == (["Harvest_CIL_ALL.20260407.CSV"], [], 1)
+        assert [p.name for p in inbox.iterdir() if p.is_file()] == ["Harvest_CIL_ALL.20260407.CSV"]
+
+        # Restated under the same name: pulled again, straight over the inbox copy
+        mft_server.files["Harvest_CIL_ALL.20260407.CSV"] = b"a,b\n1,2\n3,4\n"
+        second = client.sync(FOLDER, inbox, manifest_path=manifest)
+        assert (second.new, second.changed, second.unchanged) == ([], ["Harvest_CIL_ALL.20260407.CSV"], 1)
+        assert (inbox / "Harvest_CIL_ALL.20260407.CSV").read_bytes() == b"a,b\n1,2\n3,4\n"
+
+        assert client.sync(FOLDER, inbox, manifest_path=manifest).downloaded == []
+
+
+def test_sync_retries_failed_files(tmp_path, mft_server):
+    inbox, manifest = tmp_path / "inbox", tmp_path / "mft_manifest.json"
+    mft_server.files = {"Harvest_BSKT.20260410.CSV": b"x" * 1000}
+    mft_server.attributes = {"Harvest_BSKT.20260410.CSV": {"FSR_FILE_SYS_MD.MD5": "0" * 32}}
+
+    with StateStreetMFTClient(tmp_path / "raw") as client:
+        failed = client.sync(FOLDER, inbox, manifest_path=manifest)
+        assert list(failed.failed) == ["Harvest_BSKT.20260410.CSV"] and failed.downloaded == []
+
+        mft_server.attributes = {}
+        retried = client.sync(FOLDER, inbox, manifest_path=manifest)
+        assert retried.new == ["Harvest_BSKT.20260410.CSV"] and not retried.failed
+        assert (inbox / "Harvest_BSKT.20260410.CSV").stat().st_size == 1000
+
+
+def test_open_stream_parses_and_archives_in_one_pass(tmp_path, mft_server):
+    from src.parsers import read_csv
+
+    data = b"\xef\xbb\xbfFund,Cusip,Shares\n" + b"".join(b"HRVST,%09d,%d\n" % (i, i) for i in range(20_000))
+    mft_server.files = {"All_Positions20260410.csv": data}
+    mft_server.attributes = {"All_Positions20260410.csv": {"FSR_FILE_SYS_MD.MD5": hashlib.md5(data).hexdigest()}}
+    archive = tmp_path / "raw" / "All_Positions20260410.csv"
+
+    with StateStreetMFTClient(tmp_path / "raw") as client:
+        with client.open_stream(f"{FOLDER}/All_Positions20260410.csv", archive, expected_size=len(data),
+                                checksum=("md5", hashlib.md5(data).hexdigest())) as stream:
+            table = read_csv(stream)
+
+        assert table.column_names == ["Fund", "Cusip", "Shares"] and table.num_rows == 20_000
+        assert archive.read_bytes() == data
+        assert len([r for p, r in mft_server.requests if p.endswith(".csv")]) == 1
+
+        # A stream that does not match the listing leaves no archive behind
+        archive.unlink()
+        with pytest.raises(IOError, match="md5"):
+            with client.open_stream(f"{FOLDER}/All_Positions20260410.csv", archive,
+                                    checksum=("md5", "0" * 32)) as stream:
+                stream.read(10)
+        assert not list(archive.parent.iterdir())